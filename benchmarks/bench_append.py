@@ -0,0 +1,95 @@
+"""Добавление новых операций в хранилище с дополнением индексов и агрегатов и полное перестроение.
+
+Хранилище строится по rows операциям (без --batch последних по дате), индексы и агрегаты строятся
+заранее, как при запуске сервиса. Затем последние операции добавляются по одной и пачкой, после
+каждого добавления вызываются information_for_each_card, top_five_transactions и spending_by_category.
+
+Запуск: python -m benchmarks.bench_append --rows 1000000 --batch 1000
+"""
+
+import argparse
+import statistics
+import time
+from typing import List, Optional
+from unittest.mock import patch
+
+import pandas as pd
+
+from benchmarks.synthetic import SyntheticStore, generate_operations
+from src.reports import REPORT_CACHE, spending_by_category
+from src.store import TransactionStore, normalize_operations
+from src.utils import information_for_each_card, top_five_transactions
+
+SINGLE_APPENDS = 20
+
+
+def warm_up(store: TransactionStore) -> float:
+    """Построение всех производных структур хранилища; возвращает время в секундах."""
+    start = time.perf_counter()
+    store.get_dataframe()
+    store.get_operation_records()
+    store.get_search_index()
+    store.get_card_aggregates()
+    store.get_top_transactions()
+    query = store.get_query()
+    query.key_index("Категория")
+    query.key_index("Номер карты")
+    return time.perf_counter() - start
+
+
+def read_functions(store: TransactionStore, data_time: pd.Timestamp) -> float:
+    """Время вызова функций главной страницы и отчета по категории по текущим данным хранилища."""
+    start = time.perf_counter()
+    with patch("src.utils.get_store", lambda path=None: store), patch.dict("src.store._stores", {store.path: store}):
+        information_for_each_card(data_time)
+        top_five_transactions(data_time)
+        spending_by_category(store.get_dataframe(), "Супермаркеты", data_time.strftime("%d.%m.%Y"))
+    return time.perf_counter() - start
+
+
+def run(rows: int, batch: int) -> None:
+    """Замер добавления операций по одной и пачкой batch на rows операциях."""
+    df = normalize_operations(generate_operations(rows))
+    df = df.sort_values("Дата операции", kind="stable", ignore_index=True)
+    data_time = df["Дата операции"].iloc[-1]
+    first, end = rows - batch - SINGLE_APPENDS, rows - batch
+    store = SyntheticStore(df.iloc[:first])
+    print(f"{rows} операций, построение индексов и агрегатов: {warm_up(store):.3f} с")
+    REPORT_CACHE.clear()
+    print(f"функции до добавления операций: {read_functions(store, data_time):.4f} с")
+
+    appends, reads = [], []
+    for record in df.iloc[first:end].to_dict(orient="records"):
+        start = time.perf_counter()
+        store.append(record, persist=False)
+        appends.append(time.perf_counter() - start)
+        reads.append(read_functions(store, data_time))
+    print(
+        f"добавление одной операции: медиана {statistics.median(appends):.4f} с, "
+        f"функции после добавления: медиана {statistics.median(reads):.4f} с"
+    )
+
+    start = time.perf_counter()
+    store.append(df.iloc[end:], persist=False)
+    print(f"добавление пачки из {batch} операций: {time.perf_counter() - start:.4f} с")
+    print(f"функции после добавления пачки: {read_functions(store, data_time):.4f} с")
+
+    rebuilt = SyntheticStore(df)
+    print(f"полное перестроение индексов и агрегатов: {warm_up(rebuilt):.3f} с")
+    with patch("src.utils.get_store", lambda path=None: rebuilt):
+        expected = information_for_each_card(data_time)
+    with patch("src.utils.get_store", lambda path=None: store):
+        assert information_for_each_card(data_time) == expected
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=1_000)
+    args = parser.parse_args(argv)
+    run(args.rows, args.batch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Сравнение отчетов spending_by_category по одному и сводного отчета spending_by_categories.
+
+Запуск: python -m benchmarks.bench_batch_spending --rows 1000000 --categories 50 --months 36
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+from benchmarks.synthetic import category_names, generate_operations
+from src.reports import spending_by_categories, spending_by_category
+from src.store import normalize_operations
+
+
+def run(rows: int, categories: int, months: int, sample: int) -> None:
+    """Замер сводного отчета по всем парам и отчетов по одному на выборке пар (с пересчетом на все пары)."""
+    df = normalize_operations(generate_operations(rows, categories=categories))
+    month_ends = pd.date_range("2018-02-01", periods=months, freq="MS") - pd.Timedelta(seconds=1)
+    requests: List[Tuple[str, str]] = [
+        (category, month_end.strftime("%d.%m.%Y %H:%M:%S"))
+        for category in category_names(categories)
+        for month_end in month_ends
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            start = time.perf_counter()
+            result = spending_by_categories(df, requests)
+            batch_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for category, date in requests[:: max(1, len(requests) // sample)][:sample]:
+                spending_by_category(df, category, date)
+            single_time = (time.perf_counter() - start) / sample * len(requests)
+        finally:
+            os.chdir(cwd)
+
+    assert len(result) == len(requests) and "error" not in result[0]
+    print(f"{rows} операций, {categories} категорий x {months} дат = {len(requests)} отчетов")
+    print(f"по одному (оценка по {sample} отчетам): {single_time:8.2f} с")
+    print(f"сводный отчет:                        {batch_time:8.2f} с")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--months", type=int, default=36)
+    parser.add_argument("--sample", type=int, default=50)
+    args = parser.parse_args(argv)
+    run(args.rows, args.categories, args.months, args.sample)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Сравнение времени загрузки operations.xlsx через openpyxl и из колоночного кэша.
+
+Запуск: python -m benchmarks.bench_cache --sizes 10000 100000 1000000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import List, Optional
+
+import pandas as pd
+
+from benchmarks.synthetic import generate_operations
+from src.cache import file_signature, load_cache, save_cache
+from src.store import normalize_operations
+
+
+def run(sizes: List[int]) -> None:
+    """Замер загрузки XLSX и кэша для каждого размера."""
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            path = os.path.join(directory, f"operations_{size}.xlsx")
+            generate_operations(size).to_excel(path, index=False)
+
+            start = time.perf_counter()
+            df = normalize_operations(pd.read_excel(path))
+            xlsx_time = time.perf_counter() - start
+
+            signature = file_signature(path)
+            save_cache(path, signature, df)
+            start = time.perf_counter()
+            load_cache(path, signature)
+            cache_time = time.perf_counter() - start
+
+            print(
+                f"{size:>9} строк: xlsx {xlsx_time:8.3f} с, кэш {cache_time:8.4f} с, "
+                f"ускорение x{xlsx_time / cache_time:.0f}"
+            )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10_000, 100_000, 1_000_000])
+    run(parser.parse_args(argv).sizes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Сравнение information_for_each_card по всему DataFrame и по дневным суммам по картам.
+
+Запуск: python -m benchmarks.bench_card_aggregates --rows 1000000 --cards 10000
+"""
+
+import argparse
+import time
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from benchmarks.synthetic import generate_operations
+from src.aggregates import CardDailyAggregates
+from src.store import normalize_operations
+
+QUERY_DATES = ["2019-03-15 00:00:00", "2020-07-31 12:00:00", "2021-11-30 23:59:59"]
+
+
+def full_scan(df: pd.DataFrame, data_time: pd.Timestamp) -> List[Dict[str, Any]]:
+    """Прежний расчет: маска по всему DataFrame и groupby по картам."""
+    df_filtered = df[(df["Дата операции"] >= data_time.replace(day=1)) & (df["Дата операции"] <= data_time)].copy()
+    df_filtered["кэшбек"] = df_filtered["Сумма операции с округлением"] * 0.01
+    grouped = (
+        df_filtered.groupby("Номер карты")
+        .agg(total_spent=("Сумма операции с округлением", "sum"), cashback=("кэшбек", "sum"))
+        .reset_index()
+    )
+    grouped["last_digits"] = grouped["Номер карты"].astype(str).str[-4:]
+    result: List[Dict] = grouped.sort_values(by="total_spent", ascending=False)[
+        ["last_digits", "total_spent", "cashback"]
+    ].to_dict("records")
+    for item in result:
+        item["total_spent"] = round(item["total_spent"], 2)
+        item["cashback"] = round(item["cashback"], 2)
+    return result
+
+
+def run(rows: int, cards: int) -> None:
+    """Замер построения агрегатов, запросов и добавления операций."""
+    df = normalize_operations(generate_operations(rows, cards=cards))
+
+    start = time.perf_counter()
+    aggregates = CardDailyAggregates.from_dataframe(df)
+    print(f"Построение дневных сумм для {rows} операций и {cards} карт: {time.perf_counter() - start:.3f} с")
+
+    for data_time in map(pd.Timestamp, QUERY_DATES):
+        start = time.perf_counter()
+        expected = full_scan(df, data_time)
+        scan_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = aggregates.month_to_date(data_time)
+        aggregate_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        aggregates.window_totals(data_time.replace(day=1), data_time)
+        totals_time = time.perf_counter() - start
+
+        assert result == expected
+        print(
+            f"{data_time}: полный проход {scan_time:7.3f} с, дневные суммы {aggregate_time:7.4f} с "
+            f"(из них суммирование {totals_time:7.4f} с, {len(result)} карт в ответе)"
+        )
+
+    new_operations = normalize_operations(generate_operations(1000, cards=cards, seed=7, start="2022-01-01"))
+    start = time.perf_counter()
+    aggregates.append(new_operations)
+    print(f"Добавление 1000 новых операций: {time.perf_counter() - start:.4f} с")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--cards", type=int, default=10_000)
+    args = parser.parse_args(argv)
+    run(args.rows, args.cards)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Расчет кэшбэка по набору правил: построчно на Python, маской на каждое правило и скомпилированными правилами.
+
+Запуск: python -m benchmarks.bench_cashback --rows 1000000 --rules 100
+"""
+
+import argparse
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import category_names, generate_operations
+from src.cashback import CashbackRule, CashbackRules
+from src.store import normalize_operations
+
+PYTHON_SAMPLE = 20_000
+
+
+def make_rules(count: int, cards: List[str], categories: List[str], seed: int = 1) -> CashbackRules:
+    """Набор правил: по картам и категориям, по категориям, ступенчатые и с ограничениями за месяц."""
+    rng = np.random.default_rng(seed)
+    rules = []
+    for number in range(count):
+        kind = number % 4
+        category = str(rng.choice(categories))
+        if kind == 0:
+            rules.append(CashbackRule(rate=0.05, category=category, card=str(rng.choice(cards)), monthly_cap=500))
+        elif kind == 1:
+            rules.append(CashbackRule(rate=float(rng.choice([0.02, 0.03, 0.05])), category=category))
+        elif kind == 2:
+            rules.append(CashbackRule(rate=0.01, card=str(rng.choice(cards)), tiers=[(30_000, 0.015), (80_000, 0.02)]))
+        else:
+            rules.append(CashbackRule(rate=0.1, category=list(rng.choice(categories, 3)), monthly_cap=1_000))
+    return CashbackRules(rules, monthly_cap=10_000)
+
+
+def per_row(
+    rules: CashbackRules, dates: np.ndarray, cards: np.ndarray, categories: np.ndarray, amounts: np.ndarray
+) -> List[float]:
+    """Расчет по строкам: поиск первого подходящего правила и счетчики месяца в словарях."""
+    spent: Dict[Tuple, float] = {}
+    by_rule: Dict[Tuple, float] = {}
+    by_card: Dict[Tuple, float] = {}
+    result = []
+    for date, card, category, amount in zip(dates.astype("datetime64[M]").tolist(), cards, categories, amounts):
+        month = (date, card)
+        spent[month] = spent.get(month, 0.0) + amount
+        number = next(
+            (
+                number
+                for number, rule in enumerate(rules.rules)
+                if (rule.cards is None or card in rule.cards)
+                and (rule.categories is None or category in rule.categories)
+            ),
+            None,
+        )
+        if number is None:
+            value = amount * rules.default_rate
+        else:
+            rule = rules.rules[number]
+            rate = rule.rate
+            for threshold, tier_rate in rule.tiers:
+                if spent[month] >= threshold:
+                    rate = tier_rate
+            value = amount * rate
+            if rule.monthly_cap is not None:
+                used = by_rule.get(month + (number,), 0.0)
+                value = max(0.0, min(value, rule.monthly_cap - used))
+                by_rule[month + (number,)] = used + value
+        if rules.monthly_cap is not None:
+            used = by_card.get(month, 0.0)
+            value = max(0.0, min(value, rules.monthly_cap - used))
+            by_card[month] = used + value
+        result.append(value)
+    return result
+
+
+def mask_per_rule(rules: CashbackRules, cards: np.ndarray, categories: np.ndarray) -> np.ndarray:
+    """Выбор правила булевой маской по всем операциям для каждого правила (без компиляции в таблицу)."""
+    numbers = np.full(len(cards), len(rules.rules), dtype=np.int64)
+    unassigned = np.ones(len(cards), dtype=bool)
+    card_series, category_series = pd.Series(cards), pd.Series(categories)
+    for number, rule in enumerate(rules.rules):
+        mask = unassigned.copy()
+        if rule.cards is not None:
+            mask &= card_series.isin(rule.cards).to_numpy()
+        if rule.categories is not None:
+            mask &= category_series.isin(rule.categories).to_numpy()
+        numbers[mask] = number
+        unassigned &= ~mask
+    return numbers
+
+
+def run(rows: int, rules_count: int) -> None:
+    """Замер на rows операциях и rules_count правилах."""
+    df = normalize_operations(generate_operations(rows, categories=100))
+    df = df.sort_values("Дата операции", kind="stable", ignore_index=True)
+    dates = df["Дата операции"].to_numpy()
+    cards = df["Номер карты"].to_numpy()
+    categories = df["Категория"].to_numpy()
+    amounts = df["Сумма операции с округлением"].to_numpy()
+    rules = make_rules(rules_count, sorted(set(cards)), category_names(100))
+    print(f"{rows} операций, {len(rules.rules)} правил")
+
+    sample = min(rows, PYTHON_SAMPLE)
+    start = time.perf_counter()
+    expected = per_row(rules, dates[:sample], cards[:sample], categories[:sample], amounts[:sample])
+    python_time = (time.perf_counter() - start) * rows / sample
+    print(f"построчно на Python (оценка по {sample} строкам): {python_time:8.3f} с")
+
+    start = time.perf_counter()
+    mask_per_rule(rules, cards, categories)
+    print(f"маска на каждое правило (только выбор правила):   {time.perf_counter() - start:8.3f} с")
+
+    start = time.perf_counter()
+    cashback = rules.evaluate(dates, cards, categories, amounts)
+    print(f"скомпилированные правила (полный расчет):          {time.perf_counter() - start:8.3f} с")
+
+    assert np.allclose(rules.evaluate(dates[:sample], cards[:sample], categories[:sample], amounts[:sample]), expected)
+    print(f"кэшбэк всего: {cashback.sum():.2f}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--rules", type=int, default=100)
+    args = parser.parse_args(argv)
+    run(args.rows, args.rules)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Задержка нечеткого поиска по описанию: p50, p95 и p99 по запросам с опечатками.
+
+Запросы — названия магазинов и имена из синтетических данных с одной или двумя опечатками (пропуск,
+замена, перестановка соседних букв). Для каждого запроса проверяется, что первым найдено задуманное
+описание. Для сравнения выводится время простого поиска по индексу подстрок на тех же запросах.
+
+Запуск: python -m benchmarks.bench_fuzzy_search --rows 1000000 --queries 500 --p99-ms 20
+"""
+
+import argparse
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from benchmarks.synthetic import MERCHANTS, NAMES, generate_operations
+from src.records import OperationRecords
+from src.search_index import FuzzyIndex, SearchIndex
+from src.services import iter_fuzzy_search, iter_simple_search
+from src.store import normalize_operations
+
+LETTERS = "абвгдежзиклмнопрстуфхцчшэюя"
+
+
+def misspell(word: str, rng: np.random.Generator, typos: int) -> str:
+    """Слово с typos опечатками: пропуск, замена или перестановка соседних букв."""
+    for _ in range(typos):
+        position = int(rng.integers(1, len(word) - 1))
+        head, letter, tail = word[:position], word[position], word[position:][1:]
+        kind = int(rng.integers(0, 3))
+        if kind == 0:
+            word = head + tail
+        elif kind == 1:
+            word = head + str(rng.choice(list(LETTERS))) + tail
+        else:
+            word = head[:-1] + letter + head[-1] + tail
+    return word
+
+
+def make_queries(count: int, seed: int = 1) -> List[Tuple[str, str]]:
+    """Пары (запрос с опечатками, задуманное описание в нижнем регистре)."""
+    rng = np.random.default_rng(seed)
+    targets = [name for name in MERCHANTS + NAMES if len(name) >= 5]
+    queries = []
+    for _ in range(count):
+        target = str(rng.choice(targets)).lower()
+        queries.append((misspell(target, rng, 1 + int(rng.random() < 0.3)), target))
+    return queries
+
+
+def percentiles(latencies: List[float]) -> str:
+    """p50, p95, p99 и максимум в миллисекундах."""
+    values = np.percentile(np.array(latencies) * 1000, [50, 95, 99, 100])
+    return "p50 {:.2f} мс, p95 {:.2f} мс, p99 {:.2f} мс, максимум {:.2f} мс".format(*values)
+
+
+def run(rows: int, queries_count: int, top_k: int, p99_ms: float, budget_ms: Optional[float]) -> None:
+    """Замер нечеткого и простого поиска на rows операциях."""
+    df = normalize_operations(generate_operations(rows))
+    records = OperationRecords.from_dataframe(df)
+
+    start = time.perf_counter()
+    index = FuzzyIndex.from_dataframe(df)
+    build_time = time.perf_counter() - start
+    print(f"{rows} операций, {len(index.values)} различных описаний, построение индекса: {build_time:.3f} с")
+    search_index = SearchIndex.from_dataframe(df)
+    budget = None if budget_ms is None else budget_ms / 1000
+
+    latencies, simple_latencies, hits, incomplete = [], [], 0, 0
+    for query, target in make_queries(queries_count):
+        start = time.perf_counter()
+        found = list(iter_fuzzy_search(query, records, index, top_k=top_k, budget=budget))
+        latencies.append(time.perf_counter() - start)
+        hits += bool(found) and str(found[0]["Описание"]).lower().startswith(target)
+        incomplete += not index.search(query, top_k, budget=budget)[2]
+
+        start = time.perf_counter()
+        for _ in iter_simple_search(query, records, search_index):
+            pass
+        simple_latencies.append(time.perf_counter() - start)
+
+    p99 = float(np.percentile(latencies, 99)) * 1000
+    print(f"нечеткий поиск (top-{top_k}): {percentiles(latencies)}")
+    print(f"простой поиск по индексу:    {percentiles(simple_latencies)}")
+    print(f"задуманное описание первым: {hits} из {queries_count}; неполных результатов: {incomplete}")
+    print(f"цель p99 {p99_ms:.1f} мс: {'выполнена' if p99 <= p99_ms else 'не выполнена'} ({p99:.2f} мс)")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--p99-ms", type=float, default=20.0)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args(argv)
+    run(args.rows, args.queries, args.top_k, args.p99_ms, args.budget_ms)
+
+
+if __name__ == "__main__":
+    main()
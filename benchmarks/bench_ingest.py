@@ -0,0 +1,72 @@
+"""Пиковая память чтения файла операций целиком (read_excel/read_csv + to_dict) и пачками с накопителями.
+
+Запуск: python -m benchmarks.bench_ingest --rows 100000 --batch-size 50000 --formats csv xlsx
+Под tracemalloc разбор XLSX идет в десятки раз медленнее, поэтому время для xlsx только для сравнения между собой.
+"""
+
+import argparse
+import os
+import tempfile
+from typing import Any, List, Optional
+
+import pandas as pd
+
+from benchmarks.bench_streaming import measure
+from benchmarks.synthetic import generate_operations
+from src.store import normalize_operations
+from src.streaming import (
+    CardSpendingAccumulator,
+    CategorySpendingAccumulator,
+    TopNAccumulator,
+    consume,
+    iter_operation_batches,
+)
+
+DATA_TIME = pd.Timestamp("2021-09-29 00:00:00")
+
+
+def whole_file(path: str) -> Any:
+    """Прежнее чтение: весь лист в DataFrame и затем в список словарей."""
+    df = pd.read_excel(path) if path.endswith(".xlsx") else pd.read_csv(path)
+    records = df.to_dict(orient="records")
+    return normalize_operations(df), records
+
+
+def batched(path: str, batch_size: int) -> Any:
+    """Чтение пачками: карты, траты по категории и топ-10 за один проход."""
+    accumulators: List[Any] = [
+        CardSpendingAccumulator(DATA_TIME),
+        CategorySpendingAccumulator("ЖКХ", DATA_TIME),
+        TopNAccumulator(DATA_TIME, n=10, window="year"),
+    ]
+    consume(iter_operation_batches(path, batch_size), accumulators)
+    return [accumulator.result() for accumulator in accumulators]
+
+
+def run(rows: int, batch_size: int, formats: List[str]) -> None:
+    """Замер для CSV и XLSX одного размера."""
+    raw = generate_operations(rows)
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt in formats:
+            path = os.path.join(directory, f"operations.{fmt}")
+            if fmt == "xlsx":
+                raw.to_excel(path, index=False)
+            else:
+                raw.to_csv(path, index=False)
+            print(f"{fmt}: {rows} операций, {os.path.getsize(path) / 2**20:.1f} МБ")
+            measure("целиком + to_dict", lambda: whole_file(path))
+            measure(f"пачками по {batch_size}", lambda: batched(path, batch_size))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--formats", nargs="+", default=["csv", "xlsx"])
+    args = parser.parse_args(argv)
+    run(args.rows, args.batch_size, args.formats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Пиковый RSS процесса при полном запуске main() на синтетических операциях.
+
+Операции в том виде, в котором их возвращает read_excel (даты строками), генерируются один раз и
+сохраняются в pickle; main() запускается в отдельном процессе, который читает pickle, поэтому
+пик генерации не попадает в замер. Внешние API котировок заменяются локальной заглушкой,
+строка поиска подставляется вместо input().
+
+Запуск: python -m benchmarks.bench_main_memory --rows 1000000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Optional
+from unittest.mock import patch
+
+import pandas as pd
+
+from benchmarks.synthetic import SyntheticStore, generate_operations
+
+SEARCH_STRING = "колхоз"
+
+
+def rss_mb() -> float:
+    """Текущий RSS процесса, МБ."""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def peak_rss_mb() -> float:
+    """Пиковый RSS процесса, МБ (ru_maxrss в КБ на Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(path: str) -> None:
+    """Запуск main() по операциям из pickle и вывод RSS до и после."""
+    from benchmarks.stub_quotes import StubQuotesServer
+    from src import quotes
+    from src.main import main
+
+    raw = pd.read_pickle(path)
+    store = SyntheticStore(raw)
+    del raw
+    loaded = rss_mb()
+    stub = StubQuotesServer(delay=0.0)
+    start = time.perf_counter()
+    try:
+        with (
+            tempfile.TemporaryDirectory() as directory,
+            contextlib.chdir(directory),
+            patch.dict("src.store._stores", {store.path: store}),
+            patch("src.store.path_excel_file", store.path),
+            patch.object(quotes, "CURRENCY_URL", stub.currency_url),
+            patch.object(quotes, "STOCK_URL", stub.stock_url),
+            patch("builtins.input", return_value=SEARCH_STRING),
+            contextlib.redirect_stdout(io.StringIO()),
+        ):
+            main()
+    finally:
+        stub.close()
+    elapsed = time.perf_counter() - start
+    print(f"RSS после чтения операций: {loaded:8.1f} МБ")
+    print(f"пиковый RSS за main():    {peak_rss_mb():8.1f} МБ (прирост {peak_rss_mb() - loaded:.1f} МБ)")
+    print(f"время main():              {elapsed:8.2f} с")
+
+
+def run(rows: int) -> None:
+    """Генерация операций и замер в отдельном процессе."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "operations.pkl")
+        generate_operations(rows).to_pickle(path)
+        print(f"{rows} операций")
+        subprocess.run([sys.executable, "-m", "benchmarks.bench_main_memory", "--child", path], check=True)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        child(args.child)
+    else:
+        run(args.rows)
+
+
+if __name__ == "__main__":
+    main()
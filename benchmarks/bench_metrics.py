@@ -0,0 +1,55 @@
+"""Накладные расходы сбора метрик и отключенных по уровню сообщений лога на один вызов.
+
+Запуск: python -m benchmarks.bench_metrics --calls 200000
+"""
+
+import argparse
+import logging
+import time
+from typing import Any, Callable, List, Optional
+
+from src.metrics import MetricsRegistry, instrumented
+
+
+def per_call(func: Callable[[], Any], calls: int) -> float:
+    """Среднее время одного вызова func, мкс."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def run(calls: int) -> None:
+    """Сравнение пустой функции без метрик, с декоратором instrumented и с отключенным реестром,
+    и сообщений лога ниже уровня логгера с форматированием f-строкой и аргументами."""
+    rows = list(range(100))
+    registry = MetricsRegistry()
+    disabled = MetricsRegistry(enabled=False)
+
+    def plain() -> List[int]:
+        return rows
+
+    measured = instrumented("plain", registry=registry)(plain)
+    switched_off = instrumented("plain", registry=disabled)(plain)
+
+    base = per_call(plain, calls)
+    print(f"без метрик:            {base:6.3f} мкс")
+    print(f"instrumented:          {per_call(measured, calls):6.3f} мкс")
+    print(f"реестр отключен:       {per_call(switched_off, calls):6.3f} мкс")
+
+    logger = logging.getLogger("bench_metrics")
+    logger.setLevel(logging.INFO)
+    value = {"Категория": "Супермаркеты", "Описание": "Колхоз"}
+    print(f"debug с f-строкой:     {per_call(lambda: logger.debug(f'Операция {value}'), calls):6.3f} мкс")
+    print(f"debug с аргументами:   {per_call(lambda: logger.debug('Операция %s', value), calls):6.3f} мкс")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200_000)
+    run(parser.parse_args(argv).calls)
+
+
+if __name__ == "__main__":
+    main()
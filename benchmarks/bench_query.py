@@ -0,0 +1,66 @@
+"""Сравнение отбора операций за период масками по всему DataFrame и по индексу OperationsQuery.
+
+Запуск: python -m benchmarks.bench_query --rows 1000000
+"""
+
+import argparse
+import time
+from typing import Any, List, Optional, Tuple
+
+import pandas as pd
+
+from benchmarks.synthetic import generate_operations
+from src.query import OperationsQuery
+from src.store import normalize_operations
+
+REPEATS = 20
+
+
+def masks(df: pd.DataFrame, start: pd.Timestamp, end: pd.Timestamp, category: Optional[str]) -> pd.DataFrame:
+    """Прежний отбор: маски по категории и датам по всем строкам."""
+    filtered = df[df["Категория"] == category] if category is not None else df
+    return filtered[(filtered["Дата операции"] >= start) & (filtered["Дата операции"] <= end)]
+
+
+def timed(func: Any, *args: Any) -> Tuple[Any, float]:
+    """Результат и среднее время вызова за REPEATS повторов."""
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        result = func(*args)
+    return result, (time.perf_counter() - start) / REPEATS
+
+
+def run(rows: int) -> None:
+    """Замер запросов за месяц, за 90 дней по категории и за год."""
+    df = normalize_operations(generate_operations(rows))
+    start = time.perf_counter()
+    query = OperationsQuery(df)
+    query.key_index("Категория")
+    print(f"Построение индекса по {rows} операциям: {time.perf_counter() - start:.3f} с")
+
+    data_time = pd.Timestamp("2021-09-29 00:00:00")
+    cases = [
+        ("месяц", data_time.replace(day=1), None),
+        ("90 дней, ЖКХ", data_time - pd.Timedelta(days=90), "ЖКХ"),
+        ("90 дней, Супермаркеты", data_time - pd.Timedelta(days=90), "Супермаркеты"),
+        ("год", data_time - pd.Timedelta(days=365), None),
+    ]
+    for name, window_start, category in cases:
+        expected, mask_time = timed(masks, df, window_start, data_time, category)
+        result, query_time = timed(query.frame, window_start, data_time, category)
+        pd.testing.assert_frame_equal(result, expected)
+        print(
+            f"{name:>22}: {len(result):>7} строк, маски {mask_time * 1000:8.2f} мс, "
+            f"индекс {query_time * 1000:8.2f} мс"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    run(parser.parse_args(argv).rows)
+
+
+if __name__ == "__main__":
+    main()
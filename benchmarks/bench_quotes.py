@@ -0,0 +1,56 @@
+"""Сравнение последовательных запросов котировок и QuoteFetcher на локальном сервере с задержкой.
+
+Запуск: python -m benchmarks.bench_quotes --symbols 2 5 20 50 --delay 0.1
+"""
+
+import argparse
+import time
+from typing import List, Optional
+
+import requests
+
+from benchmarks.stub_quotes import StubQuotesServer
+from src.quotes import QuoteFetcher
+
+
+def run(symbols: List[int], delay: float) -> None:
+    """Замер времени получения N котировок последовательно, параллельно и из кэша."""
+    server = StubQuotesServer(delay)
+    try:
+        for count in symbols:
+            urls = [server.stock_url.format(api_key="key", symbol=f"S{i}") for i in range(count)]
+
+            start = time.perf_counter()
+            for url in urls:
+                requests.get(url).json()
+            serial_time = time.perf_counter() - start
+
+            fetcher = QuoteFetcher()
+            start = time.perf_counter()
+            fetcher.fetch_json(urls)
+            parallel_time = time.perf_counter() - start
+
+            requests_before = server.requests_count
+            start = time.perf_counter()
+            fetcher.fetch_json(urls)
+            cached_time = time.perf_counter() - start
+
+            print(
+                f"N={count:>3}: последовательно {serial_time:7.3f} с, параллельно {parallel_time:7.3f} с, "
+                f"из кэша {cached_time:8.5f} с ({server.requests_count - requests_before} запросов)"
+            )
+    finally:
+        server.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", nargs="+", type=int, default=[2, 5, 20, 50])
+    parser.add_argument("--delay", type=float, default=0.1)
+    args = parser.parse_args(argv)
+    run(args.symbols, args.delay)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Память и скорость сервисов на списке словарей и на OperationRecords.
+
+Запуск: python -m benchmarks.bench_records --rows 1000000
+"""
+
+import argparse
+import time
+import tracemalloc
+from typing import Any, Callable, List, Optional, Tuple
+
+from benchmarks.synthetic import generate_operations
+from src.records import OperationRecords
+from src.services import find_physical_transfers, iter_physical_transfers, iter_simple_search, simple_search
+from src.store import normalize_operations
+
+QUERIES = ["магнит", "ЖКХ", "ozon", "№12"]
+
+
+def allocated(func: Callable[[], Any]) -> Tuple[Any, float, float]:
+    """Результат, время и объем памяти (МБ), оставшейся выделенной после построения."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, elapsed, size / 2**20
+
+
+def timed(func: Callable[[], Any]) -> Tuple[Any, float]:
+    """Результат и время вызова."""
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def run(rows: int) -> None:
+    """Сравнение построения, памяти, simple_search без индекса и find_physical_transfers."""
+    df = normalize_operations(generate_operations(rows))
+
+    records, dicts_time, dicts_size = allocated(lambda: df.to_dict(orient="records"))
+    compact, compact_time, compact_size = allocated(lambda: OperationRecords.from_dataframe(df))
+    print(f"{rows} операций")
+    print(f"{'список словарей':>20}: построение {dicts_time:6.2f} с, память {dicts_size:8.1f} МБ")
+    print(f"{'OperationRecords':>20}: построение {compact_time:6.2f} с, память {compact_size:8.1f} МБ")
+
+    print("Отбор совпадений (iter_*) и полный вызов с JSON (simple_search, find_physical_transfers):")
+    for query in QUERIES:
+        matches, dicts_scan = timed(lambda: list(iter_simple_search(query, records)))
+        compact_matches, compact_scan = timed(lambda: list(iter_simple_search(query, compact)))
+        expected, dicts_time = timed(lambda: simple_search(query, records))
+        result, compact_time = timed(lambda: simple_search(query, compact))
+        assert result == expected and len(matches) == len(compact_matches)
+        print(
+            f"{query!r:>9} ({len(matches):>6} совпадений): отбор {dicts_scan:6.3f} / {compact_scan:6.3f} с, "
+            f"с JSON {dicts_time:6.3f} / {compact_time:6.3f} с (словари / OperationRecords)"
+        )
+
+    matches, dicts_scan = timed(lambda: list(iter_physical_transfers(records)))
+    compact_matches, compact_scan = timed(lambda: list(iter_physical_transfers(compact)))
+    expected, dicts_time = timed(lambda: find_physical_transfers(records))
+    result, compact_time = timed(lambda: find_physical_transfers(compact))
+    assert result == expected and len(matches) == len(compact_matches)
+    print(
+        f"{'переводы':>9} ({len(matches):>6} совпадений): отбор {dicts_scan:6.3f} / {compact_scan:6.3f} с, "
+        f"с JSON {dicts_time:6.3f} / {compact_time:6.3f} с (словари / OperationRecords)"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    run(parser.parse_args(argv).rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Сравнение линейного simple_search и поиска по индексу.
+
+Запуск: python -m benchmarks.bench_search --rows 1000000
+"""
+
+import argparse
+import time
+from typing import List, Optional
+
+from benchmarks.synthetic import generate_operations
+from src.search_index import SearchIndex
+from src.services import simple_search
+from src.store import normalize_operations
+
+QUERIES = ["магнит", "такси", "№12", "иван с.", "ozon", "жкх", "аптека вита", "несуществующий"]
+
+
+def run(rows: int) -> None:
+    """Замер поиска по списку словарей и по индексу на одних и тех же запросах."""
+    df = normalize_operations(generate_operations(rows))
+    records = df.to_dict(orient="records")
+
+    start = time.perf_counter()
+    index = SearchIndex.from_dataframe(df)
+    print(f"Построение индекса на {rows} строк: {time.perf_counter() - start:.3f} с")
+
+    for query in QUERIES:
+        start = time.perf_counter()
+        expected = simple_search(query, records)
+        linear_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = simple_search(query, records, index)
+        index_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        matches = len(index.search(query))
+        lookup_time = time.perf_counter() - start
+
+        assert result == expected
+        print(
+            f"{query!r:>18}: {matches:>7} совпадений; simple_search: линейный {linear_time:7.3f} с, "
+            f"с индексом {index_time:7.3f} с; только поиск по индексу {lookup_time:7.4f} с"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    run(parser.parse_args(argv).rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Ускорение расчета по всей истории операций в пуле процессов в зависимости от числа процессов.
+
+Запуск: python -m benchmarks.bench_sharding --rows 5000000 --shards 32
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks.synthetic import generate_operations
+from src.sharding import analyze_shards, load_dictionaries, merge_results, transfer_codes, write_shards
+from src.store import normalize_operations
+
+
+def worker_counts(limit: int) -> List[int]:
+    """1, 2, 4, ... и число ядер."""
+    counts = [1]
+    while counts[-1] * 2 <= limit:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != limit:
+        counts.append(limit)
+    return counts
+
+
+def run(rows: int, shards: int, by: str, workers_list: Optional[List[int]] = None) -> None:
+    """Части записываются один раз, затем считаются пулами разного размера; результаты сравниваются."""
+    df = normalize_operations(generate_operations(rows))
+    cores = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        paths = write_shards(df, directory, shards, by)
+        print(
+            f"{rows} операций, {shards} частей по ключу {by}: запись {time.perf_counter() - start:.2f} с, ядер {cores}"
+        )
+        dictionaries = load_dictionaries(directory)
+
+        baseline = 0.0
+        expected: Optional[Dict[str, Any]] = None
+        for workers in workers_list or worker_counts(cores):
+            start = time.perf_counter()
+            parts = analyze_shards(paths, transfer_codes(dictionaries), workers)
+            result = merge_results(parts, dictionaries)
+            elapsed = time.perf_counter() - start
+
+            if expected is None:
+                baseline, expected = elapsed, result
+            else:
+                assert result["card_month_totals"].equals(expected["card_month_totals"])
+                assert result["category_month_totals"].equals(expected["category_month_totals"])
+                assert (result["transfers"] == expected["transfers"]).all()
+            print(f"процессов {workers:>3}: {elapsed:7.2f} с, ускорение {baseline / elapsed:5.2f}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--shards", type=int, default=32)
+    parser.add_argument("--by", choices=["card", "month"], default="card")
+    parser.add_argument(
+        "--workers", type=int, nargs="+", help="числа процессов (по умолчанию 1, 2, 4, ... до числа ядер)"
+    )
+    args = parser.parse_args(argv)
+    run(args.rows, args.shards, args.by, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Функции по DataFrame в памяти и по базе SQLite (индексы по дате, категории и карте, FTS5 по описанию).
+
+База строится по синтетическим операциям пачками во временном каталоге. Для каждой функции выводится
+время по DataFrame (с уже построенными индексами хранилища) и по базе и проверяется совпадение результатов.
+
+Запуск: python -m benchmarks.bench_sqlite --rows 1000000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Any, Callable, List, Optional
+from unittest.mock import patch
+
+import pandas as pd
+
+from benchmarks.synthetic import SyntheticStore, generate_operations
+from src.reports import REPORT_CACHE, spending_by_category
+from src.services import find_physical_transfers, simple_search
+from src.sqlite_backend import SqliteOperations
+from src.store import normalize_operations
+from src.utils import information_for_each_card, top_five_transactions
+
+BATCH_ROWS = 100_000
+
+
+def timed(call: Callable[[], Any]) -> tuple:
+    """Результат вызова и время в секундах."""
+    start = time.perf_counter()
+    result = call()
+    return result, time.perf_counter() - start
+
+
+def run(rows: int) -> None:
+    """Замер пяти функций по DataFrame и по базе на rows операциях."""
+    raw = generate_operations(rows)
+    df = normalize_operations(raw)
+    store = SyntheticStore(df)
+    store.get_search_index()
+    store.get_card_aggregates()
+    store.get_top_transactions()
+    data_time = df["Дата операции"].max()
+    date = data_time.strftime("%d.%m.%Y")
+
+    with tempfile.TemporaryDirectory() as directory:
+        batches = (raw.iloc[start:].head(BATCH_ROWS) for start in range(0, rows, BATCH_ROWS))
+        backend, build_time = timed(lambda: SqliteOperations.create(os.path.join(directory, "operations.db"), batches))
+        size = os.path.getsize(os.path.join(directory, "operations.db")) / 2**20
+        print(f"{rows} операций, построение базы: {build_time:.2f} с, {size:.0f} МБ")
+
+        calls = {
+            "simple_search": (
+                lambda: simple_search("колхоз", store.get_operation_records()),
+                lambda: simple_search("колхоз", backend),
+            ),
+            "find_physical_transfers": (
+                lambda: find_physical_transfers(store.get_operation_records()),
+                lambda: find_physical_transfers(backend),
+            ),
+            "spending_by_category": (
+                lambda: spending_by_category(df, "Супермаркеты", date),
+                lambda: spending_by_category(backend, "Супермаркеты", date),
+            ),
+            "information_for_each_card": (
+                lambda: information_for_each_card(pd.Timestamp(data_time)),
+                lambda: information_for_each_card(pd.Timestamp(data_time), backend=backend),
+            ),
+            "top_five_transactions": (
+                lambda: top_five_transactions(pd.Timestamp(data_time)),
+                lambda: top_five_transactions(pd.Timestamp(data_time), backend),
+            ),
+        }
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as reports, patch("src.utils.get_store", lambda path=None: store):
+            os.chdir(reports)  # отчеты spending_by_category записываются в текущий каталог
+            for name, (in_memory, sqlite) in calls.items():
+                REPORT_CACHE.clear()
+                expected, memory_time = timed(in_memory)
+                REPORT_CACHE.clear()
+                result, sqlite_time = timed(sqlite)
+                same = "да" if str(result) == str(expected) else "нет"
+                print(f"{name:27s} DataFrame {memory_time:8.4f} с, SQLite {sqlite_time:8.4f} с, совпадает: {same}")
+            os.chdir(cwd)
+        backend.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+    run(args.rows)
+
+
+if __name__ == "__main__":
+    main()
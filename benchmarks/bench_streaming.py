@@ -0,0 +1,60 @@
+"""Пиковая память simple_search/find_physical_transfers и потоковой записи результата.
+
+Запуск: python -m benchmarks.bench_streaming --rows 1000000
+"""
+
+import argparse
+import os
+import time
+import tracemalloc
+from typing import Any, Callable, List, Optional
+
+from benchmarks.synthetic import generate_operations
+from src.services import (
+    find_physical_transfers,
+    iter_physical_transfers,
+    iter_simple_search,
+    simple_search,
+    write_json_stream,
+)
+from src.store import normalize_operations
+
+
+def measure(title: str, func: Callable[[], Any]) -> None:
+    """Замер времени и пика памяти, выделенной во время вызова."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{title:>45}: {elapsed:7.3f} с, пик {peak / 2**20:8.1f} МБ")
+
+
+def run(rows: int) -> None:
+    """Сравнение строковых функций и потоковой записи в /dev/null."""
+    df = normalize_operations(generate_operations(rows))
+    records = df.to_dict(orient="records")
+
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        measure("simple_search('а')", lambda: simple_search("а", records))
+        measure(
+            "write_json_stream(iter_simple_search('а'))",
+            lambda: write_json_stream(iter_simple_search("а", records), devnull),
+        )
+        measure("find_physical_transfers(df)", lambda: find_physical_transfers(df))
+        measure(
+            "write_json_stream(iter_physical_transfers(df))",
+            lambda: write_json_stream(iter_physical_transfers(df), devnull, ndjson=True),
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    run(parser.parse_args(argv).rows)
+
+
+if __name__ == "__main__":
+    main()
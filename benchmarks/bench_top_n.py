@@ -0,0 +1,88 @@
+"""Сравнение топ-N полной сортировкой и частичным выбором по упорядоченным датам.
+
+Запуск: python -m benchmarks.bench_top_n --rows 1000000
+"""
+
+import argparse
+import time
+from typing import Any, List, Optional, Union
+
+import pandas as pd
+
+from benchmarks.synthetic import generate_operations
+from src.aggregates import MonthlyTopTransactions
+from src.store import normalize_operations
+from src.utils import window_start
+
+COLUMN = "Сумма операции с округлением"
+
+
+def full_sort(df: pd.DataFrame, data_time: pd.Timestamp, n: int, window: Union[str, int]) -> Any:
+    """Прежний расчет: маска по всему DataFrame, sort_values, head и apply по строкам."""
+    start = window_start(data_time, window)
+    filtered_df = df[(df["Дата операции"] >= start) & (df["Дата операции"] <= data_time)].copy()
+    top_transactions = filtered_df.sort_values(by=COLUMN, ascending=False).head(n)
+    return top_transactions.apply(
+        lambda row: {
+            "date": row["Дата операции"].strftime("%d.%m.%Y"),
+            "amount": round(row[COLUMN], 2),
+            "category": row["Категория"],
+            "description": row["Описание"],
+        },
+        axis=1,
+    ).tolist()
+
+
+def selection(top: MonthlyTopTransactions, data_time: pd.Timestamp, n: int, window: Union[str, int]) -> Any:
+    """Расчет как в top_n_transactions."""
+    rows = top.df.iloc[top.top_positions(window_start(data_time, window), data_time, n, COLUMN)]
+    return [
+        {"date": date, "amount": round(amount, 2), "category": category, "description": description}
+        for date, amount, category, description in zip(
+            rows["Дата операции"].dt.strftime("%d.%m.%Y"),
+            rows[COLUMN].tolist(),
+            rows["Категория"].tolist(),
+            rows["Описание"].tolist(),
+        )
+    ]
+
+
+def run(rows: int) -> None:
+    """Замер для разных N и периодов, повторный запрос использует запомненные месяцы."""
+    df = normalize_operations(generate_operations(rows))
+    start = time.perf_counter()
+    top = MonthlyTopTransactions(df)
+    print(f"Упорядочивание {rows} операций по дате: {time.perf_counter() - start:.3f} с")
+
+    data_time = pd.Timestamp("2021-09-29 00:00:00")
+    windows: List[Union[str, int]] = ["month", 365]
+    for window in windows:
+        for n in [5, 100, 1000]:
+            start = time.perf_counter()
+            expected = full_sort(df, data_time, n, window)
+            sort_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            result = selection(top, data_time, n, window)
+            first_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            selection(top, data_time, n, window)
+            repeat_time = time.perf_counter() - start
+
+            assert [item["amount"] for item in result] == [item["amount"] for item in expected]
+            print(
+                f"период {window!s:>5}, N={n:>4}: сортировка {sort_time:7.3f} с, выбор {first_time:7.4f} с, "
+                f"повторно {repeat_time:7.4f} с"
+            )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    run(parser.parse_args(argv).rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Сравнение поиска переводов физическим лицам по списку словарей и по DataFrame.
+
+Запуск: python -m benchmarks.bench_transfers --sizes 100000 1000000 3000000
+"""
+
+import argparse
+import time
+from typing import List, Optional
+
+from benchmarks.synthetic import generate_operations
+from src.services import NAME_PATTERN, filter_physical_transfers, find_physical_transfers
+from src.store import normalize_operations
+
+
+def run(sizes: List[int]) -> None:
+    """Замер поиска переводов для каждого размера."""
+    for size in sizes:
+        df = normalize_operations(generate_operations(size))
+        records = df.to_dict(orient="records")
+
+        start = time.perf_counter()
+        expected = find_physical_transfers(records)
+        loop_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = find_physical_transfers(df)
+        vector_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        loop_matches = [
+            row
+            for row in records
+            if row.get("Категория") == "Переводы" and NAME_PATTERN.search(row.get("Описание", ""))
+        ]
+        loop_filter_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        matches = len(filter_physical_transfers(df))
+        filter_time = time.perf_counter() - start
+
+        assert result == expected and matches == len(loop_matches)
+        print(
+            f"{size:>9} строк, {matches:>7} переводов: фильтрация циклом {loop_filter_time:7.3f} с, "
+            f"маской {filter_time:7.3f} с; find_physical_transfers со списком {loop_time:7.3f} с, "
+            f"с DataFrame {vector_time:7.3f} с"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100_000, 1_000_000, 3_000_000])
+    run(parser.parse_args(argv).sizes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Нагрузочный тест HTTP-сервиса (src.server): задержка p50/p99 и число запросов в секунду.
+
+Запуск против работающего сервиса: python -m benchmarks.load_test --url http://127.0.0.1:8000
+Запуск со встроенным сервисом на синтетических данных и заглушкой API котировок:
+python -m benchmarks.load_test --serve --rows 50000 --concurrency 16 --requests 2000
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import requests
+
+from benchmarks.stub_quotes import StubQuotesServer
+from benchmarks.synthetic import generate_operations
+from src import quotes
+from src.server import make_server, warm_up
+from src.store import set_default_path
+
+ENDPOINTS: List[Tuple[str, str, Dict[str, str]]] = [
+    ("home", "/home", {"date": "2021-09-29 12:00:00"}),
+    ("search", "/search", {"q": "магнит №12"}),
+    ("search_short", "/search", {"q": "ЖКХ"}),
+    ("transfers", "/transfers", {}),
+    ("spending", "/spending", {"category": "ЖКХ", "date": "29.09.2021"}),
+]
+
+
+def percentile(latencies: List[float], q: float) -> float:
+    """Перцентиль задержки в миллисекундах."""
+    return float(np.percentile(np.array(latencies), q) * 1000) if latencies else 0.0
+
+
+def load(url: str, concurrency: int, total: int, endpoints: List[str]) -> None:
+    """total запросов из concurrency потоков по кругу по выбранным адресам."""
+    selected = [endpoint for endpoint in ENDPOINTS if endpoint[0] in endpoints]
+    latencies: Dict[str, List[float]] = {name: [] for name, _, _ in selected}
+    errors: List[str] = []
+    counter = iter(range(total))
+    lock = threading.Lock()
+
+    def client() -> None:
+        with requests.Session() as session:
+            while True:
+                with lock:
+                    number = next(counter, None)
+                if number is None:
+                    return
+                name, path, params = selected[number % len(selected)]
+                start = time.perf_counter()
+                response = session.get(url + path, params=params)
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies[name].append(elapsed)
+                    if response.status_code != 200:
+                        errors.append(f"{name}: {response.status_code}")
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{total} запросов, {concurrency} потоков: {elapsed:.2f} с, {total / elapsed:.1f} запросов/с, "
+        f"ошибок {len(errors)}"
+    )
+    for name, values in latencies.items():
+        print(
+            f"{name:>13}: {len(values):>6} запросов, p50 {percentile(values, 50):8.2f} мс, "
+            f"p99 {percentile(values, 99):8.2f} мс"
+        )
+    everything = [value for values in latencies.values() for value in values]
+    print(f"{'все':>13}: p50 {percentile(everything, 50):8.2f} мс, p99 {percentile(everything, 99):8.2f} мс")
+
+
+def serve_synthetic(rows: int, directory: str) -> Tuple[str, StubQuotesServer]:
+    """Встроенный сервис на синтетическом файле операций с заглушкой API котировок."""
+    path = os.path.join(directory, "operations.xlsx")
+    generate_operations(rows).to_excel(path, index=False)
+    set_default_path(path)
+    stub = StubQuotesServer(delay=0.05)
+    quotes.CURRENCY_URL = stub.currency_url
+    quotes.STOCK_URL = stub.stock_url
+    warm_up()
+    server = make_server(port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}", stub
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Точка входа нагрузочного теста."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--serve", action="store_true", help="запустить сервис на синтетических данных")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--endpoints", nargs="+", default=[name for name, _, _ in ENDPOINTS])
+    args = parser.parse_args(argv)
+
+    if not args.serve:
+        load(args.url, args.concurrency, args.requests, args.endpoints)
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        url, stub = serve_synthetic(args.rows, directory)
+        try:
+            load(url, args.concurrency, args.requests, args.endpoints)
+        finally:
+            stub.close()
+
+
+if __name__ == "__main__":
+    main()
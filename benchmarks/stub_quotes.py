@@ -0,0 +1,82 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+DEFAULT_RATE = 90.0
+DEFAULT_PRICE = "150.75"
+
+
+class StubQuotesServer:
+    """Локальный HTTP-сервер с ответами в формате API курсов валют и котировок акций и задержкой delay
+    (для бенчмарков и тестов).
+
+    /currency/<ключ>/<валюта> отвечает курсом из rates, /stock/<ключ>/<тикер> — ценой из prices; без rates
+    и prices любой валюте и тикеру соответствуют DEFAULT_RATE и DEFAULT_PRICE. Неизвестные валюты, тикеры
+    и адреса — ответ 404. Пути всех запросов запоминаются в requests.
+    """
+
+    def __init__(
+        self,
+        delay: float = 0.1,
+        rates: Optional[Dict[str, float]] = None,
+        prices: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.delay = delay
+        self.rates = rates
+        self.prices = prices
+        self.requests: List[str] = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                stub.requests.append(self.path)
+                time.sleep(stub.delay)
+                body = stub.response(self.path)
+                if body is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                payload = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.currency_url = self.url + "/currency/{api_key}/{currency}"
+        self.stock_url = self.url + "/stock/{api_key}/{symbol}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def requests_count(self) -> int:
+        """Число полученных запросов."""
+        return len(self.requests)
+
+    def response(self, path: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Тело ответа на запрос path; None — ответ 404."""
+        name = path.rsplit("/", 1)[-1]
+        if path.startswith("/currency/"):
+            if self.rates is None:
+                return {"conversion_rates": {"RUB": DEFAULT_RATE}}
+            return {"conversion_rates": {"RUB": self.rates[name]}} if name in self.rates else None
+        if path.startswith("/stock/"):
+            if self.prices is None:
+                return {"Global Quote": {"05. price": DEFAULT_PRICE}}
+            return {"Global Quote": {"05. price": self.prices[name]}} if name in self.prices else None
+        return None
+
+    def close(self) -> None:
+        """Остановка сервера."""
+        self.server.shutdown()
+        self.server.server_close()
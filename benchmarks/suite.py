@@ -0,0 +1,198 @@
+"""Воспроизводимый набор бенчмарков функций проекта на синтетических операциях разного объема.
+
+Для каждого объема данные генерируются детерминированно (benchmarks/synthetic.py, параметр --seed),
+внешние API котировок заменяются локальным сервером-заглушкой. Результаты сохраняются в JSON
+(--output), сравнение с результатами прошлого запуска — --compare <файл>.
+
+Запуск: python -m benchmarks.suite --sizes 10000 100000 1000000 [10000000] --output suite.json
+Объем 10M строк требует порядка 8 ГБ памяти; read_excel измеряется только для объемов до --excel-rows
+(формат XLSX ограничен 1 048 576 строками, а запись файла openpyxl занимает минуты на 1M строк).
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.stub_quotes import StubQuotesServer
+from benchmarks.synthetic import SyntheticStore, generate_operations
+from src import quotes
+from src.reports import REPORT_CACHE, spending_by_category
+from src.services import find_physical_transfers, simple_search
+from src.store import normalize_operations
+from src.utils import information_for_each_card, read_excel, top_five_transactions
+from src.views import home_page
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+DATA_TIME = pd.Timestamp("2021-09-29 00:00:00")
+REPORT_DATE = "29.09.2021"
+SEARCH_QUERIES = ["колхоз", "такси", "Иван"]
+REGRESSION_THRESHOLD = 1.2
+
+
+def measure(func: Callable[[], Any], repeat: int, before: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    """Время repeat вызовов func (before вызывается перед каждым замером и не учитывается)."""
+    seconds = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        func()
+        seconds.append(time.perf_counter() - start)
+    return {"seconds": seconds, "min": min(seconds), "median": statistics.median(seconds)}
+
+
+def environment(seed: int) -> Dict[str, Any]:
+    """Описание окружения запуска для сравнения результатов."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "seed": seed,
+        "python": sys.version.split()[0],
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run_size(rows: int, seed: int, repeat: int, excel_rows: int, directory: str) -> List[Dict[str, Any]]:
+    """Замеры всех функций на rows синтетических операциях."""
+    results: List[Dict[str, Any]] = []
+
+    def add(function: str, measurement: Dict[str, Any], **extra: Any) -> None:
+        results.append({"rows": rows, "function": function, **measurement, **extra})
+        print(f"{rows:>10} {function:>32}: мин {measurement['min']:9.4f} с, медиана {measurement['median']:9.4f} с")
+
+    raw = generate_operations(rows, seed=seed)
+
+    if rows <= excel_rows:
+        path = os.path.join(directory, f"operations_{rows}.xlsx")
+        raw.to_excel(path, index=False)
+        add("read_excel", measure(lambda: read_excel(path), repeat), bytes=os.path.getsize(path))
+        os.remove(path)
+
+    start = time.perf_counter()
+    df = normalize_operations(raw)
+    elapsed = time.perf_counter() - start
+    del raw
+    add("normalize_operations", {"seconds": [elapsed], "min": elapsed, "median": elapsed})
+
+    store = SyntheticStore(df)
+    for name, build in [
+        ("build operation_records", store.get_operation_records),
+        ("build search_index", store.get_search_index),
+        ("build card_aggregates", store.get_card_aggregates),
+        ("build query", store.get_query),
+        ("build top_transactions", store.get_top_transactions),
+    ]:
+        add(name, measure(build, 1))
+
+    records = store.get_operation_records()
+    index = store.get_search_index()
+    with patch("src.utils.get_store", lambda path=None: store), patch.dict("src.store._stores", {store.path: store}):
+        for query in SEARCH_QUERIES:
+            add(f"simple_search[{query}]", measure(lambda: simple_search(query, records, index), repeat))
+        add("find_physical_transfers", measure(lambda: find_physical_transfers(df), repeat))
+        add("information_for_each_card", measure(lambda: information_for_each_card(DATA_TIME), repeat))
+        add("top_five_transactions", measure(lambda: top_five_transactions(DATA_TIME), repeat))
+        add(
+            "spending_by_category",
+            measure(lambda: spending_by_category(df, "Супермаркеты", REPORT_DATE), repeat, before=REPORT_CACHE.clear),
+        )
+        add(
+            "spending_by_category (кэш)",
+            measure(lambda: spending_by_category(df, "Супермаркеты", REPORT_DATE), repeat),
+        )
+        add("home_page", measure(lambda: home_page(DATA_TIME), repeat))
+    return results
+
+
+def compare(current: List[Dict[str, Any]], previous_path: str, threshold: float = REGRESSION_THRESHOLD) -> int:
+    """Сравнение медиан с результатами прошлого запуска; возвращает число замедлений больше threshold раз."""
+    with open(previous_path, encoding="utf-8") as f:
+        previous = {(item["rows"], item["function"]): item for item in json.load(f)["results"]}
+    regressions = 0
+    print(f"Сравнение с {previous_path}:")
+    for item in current:
+        old = previous.get((item["rows"], item["function"]))
+        if old is None or not old["median"]:
+            continue
+        ratio = item["median"] / old["median"]
+        marker = ""
+        if ratio > threshold:
+            marker = "  <- замедление"
+            regressions += 1
+        print(
+            f"{item['rows']:>10} {item['function']:>32}: {old['median']:9.4f} -> {item['median']:9.4f} с"
+            f" ({ratio:5.2f}x){marker}"
+        )
+    return regressions
+
+
+def run(
+    sizes: List[int], seed: int, repeat: int, excel_rows: int, output: str, previous: Optional[str] = None
+) -> Dict[str, Any]:
+    """Все замеры для всех объемов с сохранением в output."""
+    stub = StubQuotesServer(delay=0.05)
+    report: Dict[str, Any] = {"environment": environment(seed), "results": []}
+    try:
+        with (
+            tempfile.TemporaryDirectory() as directory,
+            patch.object(quotes, "CURRENCY_URL", stub.currency_url),
+            patch.object(quotes, "STOCK_URL", stub.stock_url),
+        ):
+            cwd = os.getcwd()
+            os.chdir(directory)
+            try:
+                for rows in sizes:
+                    report["results"].extend(run_size(rows, seed, repeat, excel_rows, directory))
+            finally:
+                os.chdir(cwd)
+    finally:
+        stub.close()
+
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Результаты сохранены в {output}")
+    if previous is not None:
+        report["regressions"] = compare(report["results"], previous)
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа набора бенчмарков; код возврата 1, если при --compare найдены замедления."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--excel-rows", type=int, default=100_000, help="наибольший объем для замера read_excel")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="файл результатов прошлого запуска")
+    args = parser.parse_args(argv)
+    report = run(args.sizes, args.seed, args.repeat, args.excel_rows, os.path.abspath(args.output), args.compare)
+    if report.get("regressions"):
+        print(f"Замедлений больше {REGRESSION_THRESHOLD} раз: {report['regressions']}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
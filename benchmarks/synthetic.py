@@ -0,0 +1,120 @@
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.store import TransactionStore, normalize_operations
+
+CATEGORIES = [
+    "Супермаркеты",
+    "Фастфуд",
+    "Транспорт",
+    "Переводы",
+    "ЖКХ",
+    "Аптеки",
+    "Рестораны",
+    "Каршеринг",
+    "Связь",
+    "Одежда и обувь",
+    "Развлечения",
+    "Косметика",
+    "Топливо",
+    "Пополнения",
+    "Различные товары",
+]
+MERCHANTS = [
+    "Колхоз",
+    "Магнит",
+    "Пятерочка",
+    "Перекресток",
+    "Яндекс Такси",
+    "Ситидрайв",
+    "МТС",
+    "Билайн",
+    "ЖКУ Квартира",
+    "Аптека Вита",
+    "Mcdonalds",
+    "Burger King",
+    "Лента",
+    "ОКЕЙ",
+    "Ozon.ru",
+    "Wildberries",
+]
+NAMES = ["Иван", "Сергей", "Анна", "Мария", "Дмитрий", "Ольга", "Константин", "Елена", "Михаил", "Татьяна"]
+SURNAME_INITIALS = "АБВГДЕКЛМНОПРСТ"
+
+
+def category_names(count: int) -> List[str]:
+    """Названия категорий: сначала CATEGORIES, затем «Категория N»."""
+    return (CATEGORIES + [f"Категория {i}" for i in range(len(CATEGORIES) + 1, count + 1)])[:count]
+
+
+def generate_operations(
+    rows: int,
+    cards: int = 50,
+    seed: int = 42,
+    start: Optional[str] = None,
+    categories: int = len(CATEGORIES),
+    days: int = 4 * 365,
+) -> pd.DataFrame:
+    """Детерминированный генератор операций со столбцами operations.xlsx (значения в виде из Excel)
+    за days дней с даты start."""
+    rng = np.random.default_rng(seed)
+    start_ts = pd.Timestamp(start or "2018-01-01")
+    seconds = np.sort(rng.integers(0, days * 24 * 3600, rows))[::-1]
+    dates = start_ts + pd.to_timedelta(seconds, unit="s")
+
+    category_codes = rng.integers(0, categories, rows)
+    category_column = np.array(category_names(categories), dtype=object)[category_codes]
+
+    merchants = np.array(MERCHANTS, dtype=object)[rng.integers(0, len(MERCHANTS), rows)]
+    branches = np.array([f" №{i}" for i in range(1, 300)], dtype=object)[rng.integers(0, 299, rows)]
+    merchants = np.where(rng.random(rows) < 0.5, merchants, merchants + branches)
+    person_names = np.array(NAMES, dtype=object)[rng.integers(0, len(NAMES), rows)]
+    initials = np.array(list(SURNAME_INITIALS), dtype=object)[rng.integers(0, len(SURNAME_INITIALS), rows)]
+    people = person_names + " " + initials + "."
+    descriptions = np.where(category_column == "Переводы", people, merchants)
+
+    card_numbers = np.array([f"*{i * 7919 % 10000:04d}" for i in range(cards)], dtype=object)
+    card_column = card_numbers[rng.integers(0, cards, rows)]
+
+    amounts = -np.round(rng.gamma(2.0, 400.0, rows), 2)
+    rounded = np.floor(amounts / 10) * 10
+
+    return pd.DataFrame(
+        {
+            "Дата операции": dates.strftime("%d.%m.%Y %H:%M:%S"),
+            "Дата платежа": dates.strftime("%d.%m.%Y"),
+            "Номер карты": card_column,
+            "Статус": "OK",
+            "Сумма операции": amounts,
+            "Валюта операции": "RUB",
+            "Сумма платежа": amounts,
+            "Валюта платежа": "RUB",
+            "Кэшбэк": np.nan,
+            "Категория": category_column,
+            "MCC": rng.integers(4000, 6000, rows).astype("float64"),
+            "Описание": descriptions,
+            "Бонусы (включая кэшбэк)": np.floor(-amounts / 100),
+            "Округление на инвесткопилку": 0,
+            "Сумма операции с округлением": np.abs(rounded),
+        }
+    )
+
+
+class SyntheticStore(TransactionStore):
+    """Хранилище с DataFrame в памяти вместо файла (объемы больше предела XLSX).
+    Операции в виде из Excel приводятся normalize_operations при первом обращении, как при чтении файла."""
+
+    def __init__(self, df: pd.DataFrame) -> None:
+        super().__init__(f"<synthetic {len(df)}>", use_cache=False)
+        self._raw: Optional[pd.DataFrame] = df
+        self._signature = (0, len(df))
+
+    def get_dataframe(self) -> pd.DataFrame:
+        with self._lock:
+            if self._df is None:
+                assert self._raw is not None
+                self._df = normalize_operations(self._raw)
+                self._raw = None
+            return self._df
@@ -0,0 +1,244 @@
+import copy
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.query import OperationsQuery
+
+CASHBACK_RATE = 0.01
+DAY = pd.Timedelta(days=1)
+MONTH = pd.offsets.MonthBegin(1)
+NANOSECOND = pd.Timedelta(1, "ns")
+SUM_COLUMNS = ["total_spent", "cashback"]
+
+
+def _daily_totals(operations: pd.DataFrame) -> pd.DataFrame:
+    return (
+        operations.assign(day=operations["date"].dt.normalize())
+        .groupby(["day", "card"], sort=True)[SUM_COLUMNS]
+        .sum()
+        .reset_index()
+    )
+
+
+class CardDailyAggregates:
+    """Суммы трат и кэшбэка по карте и дню для information_for_each_card.
+
+    Карты кодируются целыми номерами. Запрос за период складывает не более 31 дневной суммы
+    на карту; операции первого и последнего неполного дня берутся из отсортированных по дате
+    операций. Новые операции добавляются через append: пересчитываются только дни, начиная
+    с самой ранней новой операции.
+    """
+
+    def __init__(self) -> None:
+        self._cards: List[Any] = []
+        self._card_codes: Dict[Any, int] = {}
+        self._card_order = np.array([], dtype=np.int64)
+        self._operations = pd.DataFrame(
+            {
+                "date": pd.Series(dtype="datetime64[ns]"),
+                "card": pd.Series(dtype=np.int64),
+                "total_spent": pd.Series(dtype="float64"),
+                "cashback": pd.Series(dtype="float64"),
+            }
+        )
+        self._daily = _daily_totals(self._operations)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "CardDailyAggregates":
+        """Построение агрегатов по нормализованному DataFrame операций."""
+        aggregates = cls()
+        aggregates.append(df)
+        return aggregates
+
+    def _encode_cards(self, cards: pd.Series) -> np.ndarray:
+        codes, uniques = pd.factorize(cards)
+        mapping = np.empty(len(uniques), dtype=np.int64)
+        for position, card in enumerate(uniques):
+            if card not in self._card_codes:
+                self._card_codes[card] = len(self._cards)
+                self._cards.append(card)
+            mapping[position] = self._card_codes[card]
+        if len(self._card_order) != len(self._cards):
+            self._card_order = np.argsort(np.array(self._cards, dtype=object), kind="stable")
+        return mapping[codes]
+
+    def append(self, df: pd.DataFrame) -> None:
+        """Добавление новых операций с пересчетом только затронутых дней."""
+        # Из df берутся только нужные столбцы: фильтрация всего DataFrame копировала бы все столбцы.
+        valid = (df["Номер карты"].notna() & df["Дата операции"].notna()).to_numpy()
+        if not valid.any():
+            return
+        rows = slice(None) if valid.all() else valid
+        new_operations = pd.DataFrame(
+            {
+                "date": df["Дата операции"].to_numpy()[rows],
+                "card": self._encode_cards(df["Номер карты"][rows]),
+                "total_spent": df["Сумма операции с округлением"].fillna(0).to_numpy(dtype="float64")[rows],
+            }
+        )
+        new_operations["cashback"] = new_operations["total_spent"] * CASHBACK_RATE
+        new_operations = new_operations.sort_values("date", kind="stable", ignore_index=True)
+        first_new_date = new_operations["date"].iloc[0]
+
+        if self._operations.empty:
+            self._operations = new_operations
+        elif first_new_date >= self._operations["date"].iloc[-1]:
+            self._operations = pd.concat([self._operations, new_operations], ignore_index=True)
+        else:
+            # Вставка новых операций после операций с той же датой — тот же порядок, что и при
+            # устойчивой сортировке объединенных операций, но без сортировки всех операций.
+            at = np.searchsorted(self._operations["date"].to_numpy(), new_operations["date"].to_numpy(), side="right")
+            self._operations = pd.DataFrame(
+                {
+                    column: np.insert(self._operations[column].to_numpy(), at, new_operations[column].to_numpy())
+                    for column in self._operations.columns
+                }
+            )
+
+        first_day = first_new_date.normalize()
+        split = int(np.searchsorted(self._daily["day"].to_numpy(), first_day.to_datetime64(), side="left"))
+        tail = pd.concat([self._daily.iloc[split:], _daily_totals(new_operations)], ignore_index=True)
+        tail = tail.groupby(["day", "card"], sort=True)[SUM_COLUMNS].sum().reset_index()
+        self._daily = pd.concat([self._daily.iloc[:split], tail], ignore_index=True)
+
+    def extended(self, df: pd.DataFrame, start: int) -> "CardDailyAggregates":
+        """Агрегаты для df, в котором строки с позиции start добавлены к учтенным операциям.
+        Эти агрегаты не изменяются: append выполняется над копией."""
+        aggregates = copy.copy(self)
+        aggregates._cards = list(self._cards)
+        aggregates._card_codes = dict(self._card_codes)
+        aggregates.append(df.iloc[start:])
+        return aggregates
+
+    def __len__(self) -> int:
+        return len(self._operations)
+
+    def _raw_slice(self, start: pd.Timestamp, end: pd.Timestamp, include_end: bool) -> pd.DataFrame:
+        dates = self._operations["date"].to_numpy()
+        left = np.searchsorted(dates, start.to_datetime64(), side="left")
+        right = np.searchsorted(dates, end.to_datetime64(), side="right" if include_end else "left")
+        return self._operations.iloc[left:right]
+
+    def _daily_slice(self, first_day: pd.Timestamp, last_day: pd.Timestamp) -> pd.DataFrame:
+        days = self._daily["day"].to_numpy()
+        left = np.searchsorted(days, first_day.to_datetime64(), side="left")
+        right = np.searchsorted(days, last_day.to_datetime64(), side="left")
+        return self._daily.iloc[left:right]
+
+    def window_totals(self, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        """Суммы трат и кэшбэка по картам за период [start, end], карты упорядочены как в groupby."""
+        first_full_day = start.normalize() if start == start.normalize() else start.normalize() + DAY
+        last_day = end.normalize()
+        if first_full_day >= last_day:
+            parts = [self._raw_slice(start, end, include_end=True)]
+        else:
+            parts = [
+                self._raw_slice(start, first_full_day, include_end=False),
+                self._daily_slice(first_full_day, last_day),
+                self._raw_slice(last_day, end, include_end=True),
+            ]
+
+        size = len(self._cards)
+        codes = np.concatenate([part["card"].to_numpy() for part in parts])
+        present = np.bincount(codes, minlength=size) > 0
+        totals = {
+            column: np.bincount(codes, np.concatenate([part[column].to_numpy() for part in parts]), minlength=size)
+            for column in SUM_COLUMNS
+        }
+        order = self._card_order[present[self._card_order]]
+        return pd.DataFrame(
+            {
+                "card": np.array(self._cards, dtype=object)[order] if size else np.array([], dtype=object),
+                "total_spent": totals["total_spent"][order],
+                "cashback": totals["cashback"][order],
+            }
+        )
+
+    def month_to_date(self, data_time: pd.Timestamp) -> List[Dict]:
+        """Траты и кэшбэк по картам с первого числа месяца до data_time в формате information_for_each_card."""
+        return card_summary(self.window_totals(data_time.replace(day=1), data_time))
+
+
+def card_summary(grouped: pd.DataFrame) -> List[Dict]:
+    """Суммы по картам (столбцы card, total_spent, cashback) в формате information_for_each_card:
+    последние 4 цифры карты, по убыванию трат, суммы округлены до копеек."""
+    grouped = grouped.assign(last_digits=grouped["card"].astype(str).str[-4:])
+
+    result_df = grouped.sort_values(by="total_spent", ascending=False)
+
+    result: List[Dict] = result_df[["last_digits", "total_spent", "cashback"]].to_dict("records")
+
+    for item in result:
+        item["total_spent"] = round(item["total_spent"], 2)
+        item["cashback"] = round(item["cashback"], 2)
+    return result
+
+
+def largest_positions(positions: np.ndarray, values: np.ndarray, n: int) -> np.ndarray:
+    """Позиции n наибольших значений; при равенстве раньше идет строка с меньшей позицией (как nlargest)."""
+    valid = ~np.isnan(values)
+    positions, values = positions[valid], values[valid]
+    if n <= 0:
+        return positions[:0]
+    if len(values) > n:
+        threshold = np.partition(values, len(values) - n)[len(values) - n]
+        selected = values >= threshold
+        positions, values = positions[selected], values[selected]
+    order = np.lexsort((positions, -values))[:n]
+    result: np.ndarray = positions[order]
+    return result
+
+
+class MonthlyTopTransactions:
+    """Выбор топ-N операций за период без полной сортировки.
+
+    Период выбирается бинарным поиском по общему индексу OperationsQuery, а топ-N
+    находится частичной сортировкой. Для месяцев, целиком попавших в период, топ-N
+    запоминается и при следующих запросах объединяется с кандидатами неполных месяцев.
+    """
+
+    def __init__(self, df: pd.DataFrame, query: Optional[OperationsQuery] = None) -> None:
+        self.df = df
+        self._query = query if query is not None else OperationsQuery(df)
+        self._months: Dict[Tuple[pd.Timestamp, str], Tuple[int, np.ndarray]] = {}
+
+    def extended(
+        self, df: pd.DataFrame, start: int, query: Optional[OperationsQuery] = None
+    ) -> "MonthlyTopTransactions":
+        """Выбор топ-N для df, в котором строки с позиции start новые: запомненные топы месяцев
+        без новых операций сохраняются. query — уже дополненный индекс df (иначе дополняется свой)."""
+        top = MonthlyTopTransactions(df, query if query is not None else self._query.extended(df, start))
+        dates = df["Дата операции"].to_numpy()[start:]
+        months = {pd.Timestamp(month) for month in np.unique(dates[~pd.isna(dates)].astype("datetime64[M]"))}
+        top._months = {key: value for key, value in self._months.items() if key[0] not in months}
+        return top
+
+    def _slice(self, start: pd.Timestamp, end: pd.Timestamp, include_end: bool) -> np.ndarray:
+        return self._query.window(start, end, include_end=include_end)
+
+    def _month_top(self, month_start: pd.Timestamp, n: int, by: str) -> np.ndarray:
+        key = (month_start, by)
+        cached = self._months.get(key)
+        if cached is None or cached[0] < n:
+            positions = self._slice(month_start, month_start + MONTH, include_end=False)
+            cached = (n, largest_positions(positions, self.df[by].to_numpy(dtype="float64")[positions], n))
+            self._months[key] = cached
+        return cached[1][:n]
+
+    def top_positions(self, start: pd.Timestamp, end: pd.Timestamp, n: int, by: str) -> np.ndarray:
+        """Позиции строк DataFrame с n наибольшими значениями столбца by за период [start, end]."""
+        month_floor = start.normalize().replace(day=1)
+        month = month_floor if start == month_floor else month_floor + MONTH
+        candidates = []
+        if month + MONTH - NANOSECOND <= end:
+            candidates.append(self._slice(start, month, include_end=False))
+            while month + MONTH - NANOSECOND <= end:
+                candidates.append(self._month_top(month, n, by))
+                month = month + MONTH
+            start = month
+        candidates.append(self._slice(start, end, include_end=True))
+
+        positions = np.concatenate(candidates)
+        return largest_positions(positions, self.df[by].to_numpy(dtype="float64")[positions], n)
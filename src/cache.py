@@ -0,0 +1,123 @@
+import argparse
+import glob
+import os
+from typing import Any, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow.feather as feather  # type: ignore[import-untyped]
+
+from src.logger import setup_logger
+
+logger = setup_logger("cache.log")
+
+CACHE_EXTENSION = ".feather"
+JOURNAL_EXTENSION = ".journal.csv"
+JOURNAL_DATE_FORMAT = "%d.%m.%Y %H:%M:%S"
+
+
+def file_signature(path: str) -> Tuple[int, int]:
+    """Версия исходного файла: время модификации (нс) и размер."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def cache_path(path: str, signature: Tuple[int, int]) -> str:
+    """Путь к кэшу рядом с исходным файлом для заданной версии файла."""
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, f".{name}.{signature[0]}-{signature[1]}{CACHE_EXTENSION}")
+
+
+def journal_path(path: str, signature: Tuple[int, int]) -> str:
+    """Путь к журналу операций, добавленных к заданной версии исходного файла."""
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, f".{name}.{signature[0]}-{signature[1]}{JOURNAL_EXTENSION}")
+
+
+def _stale_cache_paths(path: str) -> List[str]:
+    directory, name = os.path.split(os.path.abspath(path))
+    return glob.glob(os.path.join(glob.escape(directory), f".{glob.escape(name)}.*-*{CACHE_EXTENSION}"))
+
+
+def load_cache(path: str, signature: Tuple[int, int]) -> Optional[pd.DataFrame]:
+    """Загрузка нормализованного DataFrame из кэша; None, если кэша для этой версии нет."""
+    sidecar = cache_path(path, signature)
+    if not os.path.exists(sidecar):
+        return None
+    try:
+        df: pd.DataFrame = feather.read_table(sidecar, memory_map=True).to_pandas()
+        logger.info(f"Данные загружены из кэша {sidecar}")
+        return df
+    except Exception as e:
+        logger.error(f"Произошла ошибка при чтении кэша {sidecar}: {e}")
+        return None
+
+
+def save_cache(path: str, signature: Tuple[int, int], df: pd.DataFrame) -> Optional[str]:
+    """Сохранение нормализованного DataFrame в кэш, старые версии кэша удаляются."""
+    sidecar = cache_path(path, signature)
+    tmp_path = f"{sidecar}.tmp"
+    try:
+        for stale in _stale_cache_paths(path):
+            os.remove(stale)
+        feather.write_feather(df.reset_index(drop=True), tmp_path, compression="uncompressed")
+        os.replace(tmp_path, sidecar)
+        logger.info(f"Кэш сохранен в файл {sidecar}")
+        return sidecar
+    except Exception as e:
+        logger.error(f"Произошла ошибка при сохранении кэша {sidecar}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+
+
+def append_journal(path: str, signature: Tuple[int, int], df: pd.DataFrame) -> str:
+    """Дописывание операций в конец журнала версии файла (журнал создается с заголовком)."""
+    journal = journal_path(path, signature)
+    exists = os.path.exists(journal)
+    df.to_csv(journal, mode="a", header=not exists, index=False, date_format=JOURNAL_DATE_FORMAT)
+    logger.info("В журнал %s добавлено операций: %d", journal, len(df))
+    return journal
+
+
+def load_journal(path: str, signature: Tuple[int, int]) -> Optional[pd.DataFrame]:
+    """Операции, добавленные к версии файла, в виде строк (как из Excel); None, если журнала нет.
+    Журнал другой версии файла не читается: новая выгрузка заменяет добавленные операции."""
+    journal = journal_path(path, signature)
+    if not os.path.exists(journal):
+        return None
+    try:
+        return pd.read_csv(journal, dtype=str)
+    except Exception as e:
+        logger.error(f"Произошла ошибка при чтении журнала {journal}: {e}")
+        return None
+
+
+def warm_cache(path: str) -> Optional[str]:
+    """Построение кэша для файла операций заранее."""
+    from src.store import TransactionStore
+
+    TransactionStore(path).get_dataframe()
+    sidecar = cache_path(path, file_signature(path))
+    return sidecar if os.path.exists(sidecar) else None
+
+
+def main(argv: Optional[List[str]] = None) -> Any:
+    """Командная строка: python -m src.cache warm <путь к operations.xlsx>."""
+    from src.store import path_excel_file
+
+    parser = argparse.ArgumentParser(prog="python -m src.cache", description="Кэш файла операций")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    warm = subparsers.add_parser("warm", help="построить кэш заранее")
+    warm.add_argument("path", nargs="?", default=path_excel_file)
+    args = parser.parse_args(argv)
+
+    sidecar = warm_cache(args.path)
+    if sidecar is None:
+        print("Не удалось построить кэш.")
+        return 1
+    print(f"Кэш построен: {sidecar}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,184 @@
+import math
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.aggregates import CASHBACK_RATE, card_summary
+from src.query import OperationsQuery
+
+AMOUNT_COLUMN = "Сумма операции с округлением"
+
+
+class CashbackRule:
+    """Правило кэшбэка для операций категорий category и карт card (None — любые).
+
+    rate — доля суммы операции. tiers — ступени [(порог, доля), ...]: доля ступени действует, когда
+    траты по карте с начала месяца (включая операцию) достигли порога. monthly_cap — наибольший
+    кэшбэк по правилу на карту за календарный месяц.
+    """
+
+    __slots__ = ("rate", "categories", "cards", "tiers", "monthly_cap")
+
+    def __init__(
+        self,
+        rate: float = 0.0,
+        category: Optional[Union[str, Sequence[str]]] = None,
+        card: Optional[Union[str, Sequence[str]]] = None,
+        tiers: Optional[Sequence[Tuple[float, float]]] = None,
+        monthly_cap: Optional[float] = None,
+    ) -> None:
+        self.rate = rate
+        self.categories = _as_set(category)
+        self.cards = _as_set(card)
+        self.tiers = sorted(tiers or [])
+        self.monthly_cap = monthly_cap
+
+    @classmethod
+    def from_dict(cls, item: Dict[str, Any]) -> "CashbackRule":
+        """Правило из словаря с ключами rate, category, card, tiers, monthly_cap (например, из JSON)."""
+        return cls(
+            rate=item.get("rate", 0.0),
+            category=item.get("category"),
+            card=item.get("card"),
+            tiers=[(float(threshold), float(rate)) for threshold, rate in item.get("tiers", [])],
+            monthly_cap=item.get("monthly_cap"),
+        )
+
+
+def _as_set(value: Optional[Union[str, Sequence[str]]]) -> Optional[frozenset]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return frozenset([value])
+    return frozenset(value)
+
+
+def _grouped_cumsum(groups: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Накопленные суммы values внутри каждой группы в порядке следования строк."""
+    order = np.argsort(groups, kind="stable")
+    ordered = values[order]
+    totals = np.cumsum(ordered)
+    starts = np.flatnonzero(np.r_[True, groups[order][1:] != groups[order][:-1]])
+    offsets = np.repeat(totals[starts] - ordered[starts], np.diff(np.r_[starts, len(ordered)]))
+    result = np.empty_like(totals)
+    result[order] = totals - offsets
+    return result
+
+
+def _apply_cap(groups: np.ndarray, values: np.ndarray, caps: np.ndarray) -> np.ndarray:
+    """Ограничение суммы values в каждой группе: строка получает остаток до caps, после исчерпания — 0."""
+    cumulative = _grouped_cumsum(groups, values)
+    capped: np.ndarray = np.minimum(cumulative, caps) - np.minimum(cumulative - values, caps)
+    return capped
+
+
+class CashbackRules:
+    """Набор правил кэшбэка, вычисляемый векторно для всех операций сразу.
+
+    Операции получает первое подходящее правило в порядке списка; операции без правила —
+    default_rate. Правила компилируются в таблицу (карта, категория) -> номер правила, поэтому
+    выбор правила — одна выборка из таблицы на операцию независимо от числа правил. Ступени
+    и месячные ограничения считаются накопленными суммами по группам (карта, месяц[, правило]).
+    monthly_cap — общее ограничение кэшбэка на карту за месяц.
+    """
+
+    def __init__(
+        self, rules: Iterable[CashbackRule], default_rate: float = CASHBACK_RATE, monthly_cap: Optional[float] = None
+    ) -> None:
+        self.rules = list(rules)
+        self.default_rate = default_rate
+        self.monthly_cap = monthly_cap
+        self._rates = np.array([rule.rate for rule in self.rules] + [default_rate], dtype="float64")
+        self._caps = np.array(
+            [math.inf if rule.monthly_cap is None else rule.monthly_cap for rule in self.rules] + [math.inf],
+            dtype="float64",
+        )
+        self._tiered = [number for number, rule in enumerate(self.rules) if rule.tiers]
+
+    @classmethod
+    def from_dicts(
+        cls, items: Iterable[Dict[str, Any]], default_rate: float = CASHBACK_RATE, monthly_cap: Optional[float] = None
+    ) -> "CashbackRules":
+        """Набор правил из списка словарей (формат CashbackRule.from_dict)."""
+        return cls([CashbackRule.from_dict(item) for item in items], default_rate, monthly_cap)
+
+    def _rule_numbers(
+        self, card_codes: np.ndarray, card_values: Any, category_codes: np.ndarray, category_values: Any
+    ) -> np.ndarray:
+        """Номер правила каждой операции по кодам карт и категорий; len(self.rules) — правило по умолчанию."""
+        # Пропуски получают последний код таблицы: им подходят только правила без условия.
+        table = np.full((len(card_values) + 1, len(category_values) + 1), len(self.rules), dtype=np.int64)
+        all_cards = np.arange(len(card_values) + 1)
+        all_categories = np.arange(len(category_values) + 1)
+        for number in reversed(range(len(self.rules))):
+            rule = self.rules[number]
+            rows = all_cards if rule.cards is None else np.flatnonzero(pd.Index(card_values).isin(rule.cards))
+            columns = (
+                all_categories
+                if rule.categories is None
+                else np.flatnonzero(pd.Index(category_values).isin(rule.categories))
+            )
+            table[np.ix_(rows, columns)] = number
+        table_numbers: np.ndarray = table[card_codes, category_codes]
+        return table_numbers
+
+    def evaluate(
+        self, dates: np.ndarray, cards: np.ndarray, categories: np.ndarray, amounts: np.ndarray
+    ) -> np.ndarray:
+        """Кэшбэк каждой операции. Операции должны быть упорядочены по дате, ступени и ограничения
+        считаются по операциям с начала месяца, поэтому передавать нужно операции с первого числа."""
+        amounts = np.nan_to_num(np.asarray(amounts, dtype="float64"))
+        if not len(amounts):
+            return amounts
+        card_codes, card_values = pd.factorize(cards)
+        category_codes, category_values = pd.factorize(categories)
+        rules = self._rule_numbers(card_codes, card_values, category_codes, category_values)
+        months = dates.astype("datetime64[M]").astype(np.int64)
+        card_months = (months - months.min()) * (len(card_values) + 1) + card_codes + 1
+
+        rates = self._rates[rules]
+        if self._tiered:
+            spent = _grouped_cumsum(card_months, amounts)
+            order = np.argsort(rules, kind="stable")
+            bounds = np.searchsorted(rules[order], np.arange(len(self.rules) + 2), side="left")
+            for number in self._tiered:
+                first, end = bounds[number], bounds[number + 1]
+                rows = order[first:end]
+                thresholds = np.array([threshold for threshold, _ in self.rules[number].tiers])
+                tier_rates = np.array([self.rules[number].rate] + [rate for _, rate in self.rules[number].tiers])
+                rates[rows] = tier_rates[np.searchsorted(thresholds, spent[rows], side="right")]
+
+        cashback: np.ndarray = amounts * rates
+        caps = self._caps[rules]
+        if np.isfinite(caps).any():
+            cashback = _apply_cap(card_months * (len(self.rules) + 1) + rules, cashback, caps)
+        if self.monthly_cap is not None:
+            cashback = _apply_cap(card_months, cashback, np.full(len(cashback), self.monthly_cap))
+        return cashback
+
+    def card_totals(self, query: OperationsQuery, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        """Траты и кэшбэк по картам за период [start, end], карты упорядочены по номеру."""
+        month_start = start.normalize().replace(day=1)
+        positions = query.window(month_start, end)
+        df = query.df
+        cards = df["Номер карты"].to_numpy()[positions]
+        valid = ~pd.isna(cards)
+        positions, cards = positions[valid], cards[valid]
+        dates = df["Дата операции"].to_numpy()[positions]
+        amounts = np.nan_to_num(df[AMOUNT_COLUMN].to_numpy(dtype="float64")[positions])
+        cashback = self.evaluate(dates, cards, df["Категория"].to_numpy()[positions], amounts)
+
+        in_window = dates >= start.to_datetime64()
+        return (
+            pd.DataFrame(
+                {"card": cards[in_window], "total_spent": amounts[in_window], "cashback": cashback[in_window]}
+            )
+            .groupby("card", sort=True)
+            .sum()
+            .reset_index()
+        )
+
+    def month_to_date(self, query: OperationsQuery, data_time: pd.Timestamp) -> List[Dict]:
+        """Траты и кэшбэк по картам с первого числа месяца до data_time в формате information_for_each_card."""
+        return card_summary(self.card_totals(query, data_time.replace(day=1), data_time))
@@ -0,0 +1,31 @@
+import logging
+import os
+from typing import Any
+
+LOGS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs")
+# Уровень логгеров проекта (DEBUG, INFO, WARNING...); сообщения ниже уровня не форматируются и не пишутся.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG").upper()
+
+
+class LazyFileHandler(logging.FileHandler):
+    """Файловый обработчик, который создает папку и открывает файл при первой записи."""
+
+    def __init__(self, file_name: str) -> None:
+        super().__init__(os.path.join(LOGS_DIR, file_name), "w", encoding="utf-8", delay=True)
+
+    def _open(self) -> Any:
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+def setup_logger(name: str) -> logging.Logger:
+    """Логгер модуля с записью в logs/<name>; файл не открывается до первой записи.
+    Уровень задается переменной окружения LOG_LEVEL (по умолчанию DEBUG)."""
+    logger = logging.getLogger(name)
+    if not logger.handlers:
+        file_handler = LazyFileHandler(name)
+        file_formatter = logging.Formatter("%(asctime)s %(levelname)s: %(message)s")
+        file_handler.setFormatter(file_formatter)
+        logger.addHandler(file_handler)
+        logger.setLevel(LOG_LEVEL)
+    return logger
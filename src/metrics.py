@@ -0,0 +1,256 @@
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar, cast
+
+import pandas as pd
+
+from src.records import OperationRecords
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+METRIC_PREFIX = "bank_app"
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = tuple(float(10**power) for power in range(0, 10))
+METRIC_BUCKETS = {
+    "seconds": LATENCY_BUCKETS,
+    "rows_in": SIZE_BUCKETS,
+    "rows_out": SIZE_BUCKETS,
+    "bytes_read": SIZE_BUCKETS,
+}
+METRIC_HELP = {
+    "seconds": "Время выполнения функции, с",
+    "rows_in": "Число операций на входе",
+    "rows_out": "Число строк результата",
+    "bytes_read": "Прочитано байт из файлов",
+}
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин (как histogram в Prometheus): число наблюдений,
+    сумма и число значений в каждой корзине."""
+
+    __slots__ = ("bounds", "counts", "count", "total")
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        """Учет одного значения."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q: float) -> float:
+        """Оценка квантиля q по верхней границе корзины, в которую он попадает."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Состояние гистограммы в виде словаря (границы корзин и накопленные счетчики)."""
+        cumulative = []
+        seen = 0
+        for count in self.counts:
+            seen += count
+            cumulative.append(seen)
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "buckets": dict(zip([str(bound) for bound in self.bounds] + ["+Inf"], cumulative)),
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+        }
+
+
+class Measurement:
+    """Измерение одного вызова: заполняется внутри measure() и записывается в реестр при выходе."""
+
+    __slots__ = ("rows_in", "rows_out", "bytes_read", "error")
+
+    def __init__(self) -> None:
+        self.rows_in: Optional[int] = None
+        self.rows_out: Optional[int] = None
+        self.bytes_read: Optional[int] = None
+        self.error = False
+
+
+class MetricsRegistry:
+    """Гистограммы времени, числа строк на входе и выходе и прочитанных байт по функциям.
+
+    Запись одного вызова — несколько сравнений и сложений под общей блокировкой, поэтому
+    сбор можно не отключать; при enabled=False measure() ничего не записывает."""
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._calls: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+
+    def observe(self, name: str, metric: str, value: float) -> None:
+        """Учет значения метрики metric функции name."""
+        with self._lock:
+            self._observe(name, metric, value)
+
+    def _observe(self, name: str, metric: str, value: float) -> None:
+        histogram = self._histograms.get((name, metric))
+        if histogram is None:
+            histogram = self._histograms[(name, metric)] = Histogram(METRIC_BUCKETS[metric])
+        histogram.observe(value)
+
+    def record(self, name: str, seconds: float, measurement: Measurement) -> None:
+        """Учет одного вызова функции name."""
+        with self._lock:
+            self._calls[name] = self._calls.get(name, 0) + 1
+            if measurement.error:
+                self._errors[name] = self._errors.get(name, 0) + 1
+            self._observe(name, "seconds", seconds)
+            if measurement.rows_in is not None:
+                self._observe(name, "rows_in", measurement.rows_in)
+            if measurement.rows_out is not None:
+                self._observe(name, "rows_out", measurement.rows_out)
+            if measurement.bytes_read is not None:
+                self._observe(name, "bytes_read", measurement.bytes_read)
+
+    def measure(self, name: str) -> "_Timer":
+        """Контекстный менеджер для измерения блока кода:
+        with METRICS.measure("read") as m: ...; m.rows_out = len(rows)."""
+        return _Timer(self, name)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Все метрики в виде словаря для JSON: {функция: {"calls", "errors", метрика: гистограмма}}."""
+        with self._lock:
+            result: Dict[str, Any] = {
+                name: {"calls": calls, "errors": self._errors.get(name, 0)} for name, calls in self._calls.items()
+            }
+            for (name, metric), histogram in self._histograms.items():
+                result.setdefault(name, {"calls": 0, "errors": 0})[metric] = histogram.snapshot()
+        return result
+
+    def to_prometheus(self, prefix: str = METRIC_PREFIX) -> str:
+        """Метрики в текстовом формате Prometheus (histogram и counter с меткой function)."""
+        with self._lock:
+            lines: List[str] = []
+            for metric in METRIC_BUCKETS:
+                series = sorted((name, h) for (name, m), h in self._histograms.items() if m == metric)
+                if not series:
+                    continue
+                full_name = f"{prefix}_{metric}"
+                lines.append(f"# HELP {full_name} {METRIC_HELP[metric]}")
+                lines.append(f"# TYPE {full_name} histogram")
+                for name, histogram in series:
+                    seen = 0
+                    for bound, count in zip(list(histogram.bounds) + ["+Inf"], histogram.counts):
+                        seen += count
+                        lines.append(f'{full_name}_bucket{{function="{name}",le="{bound}"}} {seen}')
+                    lines.append(f'{full_name}_sum{{function="{name}"}} {histogram.total}')
+                    lines.append(f'{full_name}_count{{function="{name}"}} {histogram.count}')
+            for counter, values in (("calls_total", self._calls), ("errors_total", self._errors)):
+                if not values:
+                    continue
+                lines.append(f"# TYPE {prefix}_{counter} counter")
+                for name in sorted(values):
+                    lines.append(f'{prefix}_{counter}{{function="{name}"}} {values[name]}')
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        """Сброс всех метрик."""
+        with self._lock:
+            self._histograms.clear()
+            self._calls.clear()
+            self._errors.clear()
+
+
+class _Timer:
+    __slots__ = ("registry", "name", "measurement", "start")
+
+    def __init__(self, registry: MetricsRegistry, name: str) -> None:
+        self.registry = registry
+        self.name = name
+        self.measurement = Measurement()
+        self.start = 0.0
+
+    def __enter__(self) -> Measurement:
+        self.start = time.perf_counter()
+        return self.measurement
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if not self.registry.enabled:
+            return
+        if exc_type is not None:
+            self.measurement.error = True
+        self.registry.record(self.name, time.perf_counter() - self.start, self.measurement)
+
+
+METRICS = MetricsRegistry()
+
+
+def count_rows(value: Any) -> Optional[int]:
+    """Число строк в списке операций, DataFrame или OperationRecords; None для остальных значений."""
+    if isinstance(value, (list, tuple, pd.DataFrame, OperationRecords)):
+        return len(value)
+    return None
+
+
+def file_size(path: Any) -> Optional[int]:
+    """Размер файла в байтах; None, если path — не путь к существующему файлу."""
+    if isinstance(path, (str, os.PathLike)):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return None
+    return None
+
+
+def first_argument(measure: Callable[[Any], Optional[int]]) -> Callable[..., Optional[int]]:
+    """Измерение первого позиционного аргумента вызова: first_argument(count_rows), first_argument(file_size)."""
+
+    def wrapper(*args: Any, **kwargs: Any) -> Optional[int]:
+        return measure(args[0]) if args else None
+
+    return wrapper
+
+
+def instrumented(
+    name: Optional[str] = None,
+    rows_in: Optional[Callable[..., Optional[int]]] = None,
+    rows_out: Optional[Callable[[Any], Optional[int]]] = count_rows,
+    bytes_read: Optional[Callable[..., Optional[int]]] = None,
+    registry: Optional[MetricsRegistry] = None,
+) -> Callable[[F], F]:
+    """Декоратор: время каждого вызова функции и, если заданы, число строк на входе (rows_in(*args, **kwargs)),
+    на выходе (rows_out(result)) и прочитанных байт (bytes_read(*args, **kwargs)) в реестре METRICS."""
+
+    def decorator(func: F) -> F:
+        metric_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            target = registry or METRICS
+            if not target.enabled:
+                return func(*args, **kwargs)
+            with target.measure(metric_name) as measurement:
+                if rows_in is not None:
+                    measurement.rows_in = rows_in(*args, **kwargs)
+                if bytes_read is not None:
+                    measurement.bytes_read = bytes_read(*args, **kwargs)
+                result = func(*args, **kwargs)
+                if rows_out is not None:
+                    measurement.rows_out = rows_out(result)
+                return result
+
+        return cast(F, wrapper)
+
+    return decorator
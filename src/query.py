@@ -0,0 +1,147 @@
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class KeyIndex:
+    """Вторичный индекс по значению столбца: позиции операций каждого значения, упорядоченные по дате."""
+
+    def __init__(self, values: Any, order: np.ndarray, dates: np.ndarray) -> None:
+        codes, uniques = pd.factorize(values)
+        permutation = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[permutation], np.arange(len(uniques) + 1), side="left")
+        self.positions = order[permutation]
+        self.dates = dates[permutation]
+        self.bounds: Dict[Any, Tuple[int, int]] = {
+            key: (int(bounds[code]), int(bounds[code + 1])) for code, key in enumerate(uniques)
+        }
+
+    def window(self, key: Any, start: Any, end: Any, include_end: bool = True) -> np.ndarray:
+        """Позиции операций со значением key за период, упорядоченные по дате."""
+        if key not in self.bounds:
+            return self.positions[:0]
+        low, high = self.bounds[key]
+        dates = self.dates[low:high]
+        left = low + np.searchsorted(dates, start, side="left")
+        right = low + np.searchsorted(dates, end, side="right" if include_end else "left")
+        result: np.ndarray = self.positions[left:right]
+        return result
+
+    def extended(self, values: Any, positions: np.ndarray, dates: np.ndarray) -> "KeyIndex":
+        """Индекс с добавленными операциями (values, positions, dates упорядочены по дате): новые позиции
+        вставляются в участки своих значений, значения без участка получают участки в конце."""
+        codes, uniques = pd.factorize(values)
+        segments = list(self.bounds)
+        ranks = {key: rank for rank, key in enumerate(segments)}
+        new_keys = [key for key in uniques if key not in ranks]
+        ranks.update({key: len(segments) + number for number, key in enumerate(new_keys)})
+        added = np.zeros(len(ranks), dtype=np.int64)
+        at = np.full(len(codes), len(self.positions), dtype=np.int64)
+        rank = np.zeros(len(codes), dtype=np.int64)
+        for code, key in enumerate(uniques):
+            rows = np.flatnonzero(codes == code)
+            rank[rows] = ranks[key]
+            added[ranks[key]] = len(rows)
+            if key in self.bounds:
+                low, high = self.bounds[key]
+                at[rows] = low + np.searchsorted(self.dates[low:high], dates[rows], side="right")
+        # Операции без значения (код -1) в участки не попадают, как и при построении индекса.
+        rows = np.flatnonzero(codes >= 0)
+        rows = rows[np.lexsort((rows, rank[rows], at[rows]))]
+
+        index = KeyIndex.__new__(KeyIndex)
+        index.positions = np.insert(self.positions, at[rows], positions[rows])
+        index.dates = np.insert(self.dates, at[rows], dates[rows])
+        offset = next(iter(self.bounds.values()))[0] if self.bounds else len(self.positions)
+        index.bounds = {}
+        for key in segments + new_keys:
+            low, high = self.bounds.get(key, (0, 0))
+            size = high - low + int(added[ranks[key]])
+            index.bounds[key] = (offset, offset + size)
+            offset += size
+        return index
+
+    def ranges(self, key: Any, starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Границы [left, right) в positions для набора периодов [starts[i], ends[i]] значения key."""
+        low, high = self.bounds.get(key, (0, 0))
+        dates = self.dates[low:high]
+        left = low + np.searchsorted(dates, starts, side="left")
+        right = low + np.searchsorted(dates, ends, side="right")
+        return left, right
+
+
+class OperationsQuery:
+    """Запросы операций за период по упорядоченному по дате индексу.
+
+    Операции упорядочиваются по «Дата операции» один раз, период выбирается бинарным поиском
+    за O(log n + k). Для «Категория» и «Номер карты» строятся вторичные индексы, поэтому
+    запрос вида «ЖКХ за последние 90 дней» не просматривает операции других категорий.
+    """
+
+    def __init__(self, df: pd.DataFrame, key_columns: Tuple[str, ...] = ("Категория", "Номер карты")) -> None:
+        self.df = df
+        dates = df["Дата операции"].to_numpy()
+        valid = np.flatnonzero(~pd.isna(dates))
+        self.order = valid[np.argsort(dates[valid], kind="stable")]
+        self.dates = dates[self.order]
+        self._key_columns = {column for column in key_columns if column in df.columns}
+        self._key_indexes: Dict[str, KeyIndex] = {}
+
+    def key_index(self, column: str) -> KeyIndex:
+        """Вторичный индекс по столбцу (строится при первом обращении)."""
+        if column not in self._key_indexes:
+            values = self.df[column].iloc[self.order]
+            self._key_indexes[column] = KeyIndex(values, self.order, self.dates)
+        return self._key_indexes[column]
+
+    def extended(self, df: pd.DataFrame, start: int) -> "OperationsQuery":
+        """Индекс для df, в котором строки с позиции start добавлены к операциям этого индекса:
+        новые операции вставляются в упорядоченные массивы без повторной сортировки всех операций."""
+        dates = df["Дата операции"].to_numpy()
+        new_dates = dates[start:]
+        valid = np.flatnonzero(~pd.isna(new_dates))
+        new_order = start + valid[np.argsort(new_dates[valid], kind="stable")]
+        at = np.searchsorted(self.dates, dates[new_order], side="right")
+
+        query = OperationsQuery.__new__(OperationsQuery)
+        query.df = df
+        query.order = np.insert(self.order, at, new_order)
+        query.dates = np.insert(self.dates, at, dates[new_order])
+        query._key_columns = self._key_columns
+        query._key_indexes = {
+            column: index.extended(df[column].iloc[new_order], new_order, dates[new_order])
+            for column, index in self._key_indexes.items()
+        }
+        return query
+
+    def window(
+        self,
+        start: Any,
+        end: Any,
+        category: Optional[Any] = None,
+        card: Optional[Any] = None,
+        include_end: bool = True,
+    ) -> np.ndarray:
+        """Позиции операций за период [start, end] (или [start, end) при include_end=False),
+        упорядоченные по дате, с необязательным отбором по категории и карте."""
+        start, end = pd.Timestamp(start).to_datetime64(), pd.Timestamp(end).to_datetime64()
+        if category is not None and "Категория" in self._key_columns:
+            positions = self.key_index("Категория").window(category, start, end, include_end)
+            if card is not None:
+                positions = positions[self.df["Номер карты"].to_numpy()[positions] == card]
+            return positions
+        if card is not None and "Номер карты" in self._key_columns:
+            return self.key_index("Номер карты").window(card, start, end, include_end)
+        left = np.searchsorted(self.dates, start, side="left")
+        right = np.searchsorted(self.dates, end, side="right" if include_end else "left")
+        positions = self.order[left:right]
+        if category is not None:
+            positions = positions[self.df["Категория"].to_numpy()[positions] == category]
+        if card is not None:
+            positions = positions[self.df["Номер карты"].to_numpy()[positions] == card]
+        return positions
+
+    def frame(self, start: Any, end: Any, category: Optional[Any] = None, card: Optional[Any] = None) -> pd.DataFrame:
+        """Операции за период в исходном порядке строк DataFrame."""
+        return self.df.iloc[np.sort(self.window(start, end, category, card))]
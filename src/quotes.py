@@ -0,0 +1,90 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.logger import setup_logger
+
+logger = setup_logger("quotes.log")
+
+CURRENCY_URL = "https://v6.exchangerate-api.com/v6/{api_key}/latest/{currency}"
+STOCK_URL = "https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={symbol}&apikey={api_key}"
+
+MAX_WORKERS = 16
+REQUEST_TIMEOUT = 5.0
+CACHE_TTL = 60.0
+
+
+class QuoteFetcher:
+    """Параллельные запросы котировок через общую сессию с пулом соединений.
+
+    Все запросы одной пачки выполняются одновременно в пуле потоков, у каждого есть таймаут,
+    успешные ответы (код 200) запоминаются на ttl секунд, поэтому повторные запросы в пределах
+    ttl не обращаются к сети.
+    """
+
+    def __init__(
+        self, max_workers: int = MAX_WORKERS, timeout: float = REQUEST_TIMEOUT, ttl: float = CACHE_TTL
+    ) -> None:
+        self.timeout = timeout
+        self.ttl = ttl
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="quotes")
+        self._cache: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, url: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._cache.get(url)
+            if entry is not None and entry[0] > time.monotonic():
+                return True, entry[1]
+            return False, None
+
+    def _fetch(self, url: str) -> Optional[Any]:
+        response = self.session.get(url, timeout=self.timeout)
+        if response.status_code != 200:
+            logger.warning(f"Код ответа {response.status_code} для запроса котировки.")
+            return None
+        data = response.json()
+        with self._lock:
+            self._cache[url] = (time.monotonic() + self.ttl, data)
+        return data
+
+    def fetch_json(self, urls: List[str]) -> List[Optional[Any]]:
+        """JSON-ответы для списка адресов в том же порядке; None для ответов с кодом не 200.
+        Исключения запросов (таймаут, ошибка соединения) пробрасываются вызывающему."""
+        results: List[Optional[Any]] = [None] * len(urls)
+        pending = {}
+        for position, url in enumerate(urls):
+            hit, data = self._cached(url)
+            if hit:
+                results[position] = data
+            else:
+                pending[position] = self._executor.submit(self._fetch, url)
+        for position, future in pending.items():
+            results[position] = future.result()
+        return results
+
+    def clear(self) -> None:
+        """Сброс запомненных ответов."""
+        with self._lock:
+            self._cache.clear()
+
+
+_fetcher: Optional[QuoteFetcher] = None
+_fetcher_lock = threading.Lock()
+
+
+def get_quote_fetcher() -> QuoteFetcher:
+    """Общий для процесса QuoteFetcher, создается при первом обращении."""
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = QuoteFetcher()
+        return _fetcher
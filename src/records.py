@@ -0,0 +1,108 @@
+from typing import Any, Dict, Iterator, List, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+ROWS_CHUNK_SIZE = 10_000
+
+
+class OperationRecords:
+    """Компактное представление операций: по массиву на столбец вместо словаря на операцию.
+
+    Строковые столбцы («Категория», «Номер карты», «Описание» и другие) хранятся как
+    pd.Categorical: коды строк и по одному экземпляру каждой различной строки. Даты — datetime64,
+    суммы — float64. Словари создаются только для строк, которые попали в результат.
+    Пропуски в строковых столбцах возвращаются как NaN (как после read_excel).
+    """
+
+    __slots__ = ("columns", "_length")
+
+    def __init__(self, columns: Dict[str, Any]) -> None:
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("Столбцы разной длины.")
+        self.columns = columns
+        self._length = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "OperationRecords":
+        """Построение по DataFrame операций; строковые столбцы переводятся в категориальные."""
+        columns: Dict[str, Any] = {}
+        for name, series in df.items():
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                columns[str(name)] = series.array
+            elif series.dtype == object:
+                columns[str(name)] = pd.Categorical(series)
+            else:
+                columns[str(name)] = series.to_numpy()
+        return cls(columns)
+
+    def extended(self, df: pd.DataFrame, start: int) -> "OperationRecords":
+        """Операции df, в котором строки с позиции start добавлены к этим операциям: массивы столбцов
+        дополняются новыми строками, категориальные столбцы — новыми значениями без перекодирования строк."""
+        columns: Dict[str, Any] = {}
+        for name, values in self.columns.items():
+            series = df[name]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                columns[name] = series.array
+            elif isinstance(values, pd.Categorical):
+                added = pd.Categorical(series.iloc[start:])
+                try:
+                    columns[name] = union_categoricals([values, added])
+                except TypeError:
+                    # Различные значения разных типов (например, только числа среди новых строк).
+                    columns[name] = pd.Categorical(np.concatenate([values.astype(object), added.astype(object)]))
+            else:
+                columns[name] = np.concatenate([values, series.to_numpy()[start:]])
+        return OperationRecords(columns)
+
+    @classmethod
+    def from_records(cls, records: List[Dict]) -> "OperationRecords":
+        """Построение по списку словарей операций."""
+        return cls.from_dataframe(pd.DataFrame(records))
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, position: int) -> Dict:
+        return next(self.rows([position]))
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self.rows(np.arange(self._length))
+
+    def column(self, name: str) -> pd.Series:
+        """Столбец в виде pd.Series без копирования данных; пустые значения, если столбца нет."""
+        if name not in self.columns:
+            return pd.Series([None] * self._length, dtype=object)
+        return pd.Series(self.columns[name], copy=False)
+
+    def rows(self, positions: Union[Sequence[int], np.ndarray]) -> Iterator[Dict]:
+        """Словари операций для заданных позиций (в том же виде, что и DataFrame.to_dict("records"))."""
+        positions = np.asarray(positions, dtype=np.intp)
+        names = list(self.columns)
+        for start in range(0, len(positions), ROWS_CHUNK_SIZE):
+            end = start + ROWS_CHUNK_SIZE
+            chunk = positions[start:end]
+            values = [pd.Series(self.columns[name][chunk], copy=False).tolist() for name in names]
+            for row in zip(*values):
+                yield dict(zip(names, row))
+
+    def take(self, positions: Union[Sequence[int], np.ndarray]) -> pd.DataFrame:
+        """DataFrame из строк с заданными позициями."""
+        return pd.DataFrame({name: values[positions] for name, values in self.columns.items()})
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """DataFrame со всеми операциями."""
+        return pd.DataFrame(self.columns)
+
+    @property
+    def nbytes(self) -> int:
+        """Объем массивов столбцов в байтах (для категориальных — коды и различные значения)."""
+        total = 0
+        for values in self.columns.values():
+            if isinstance(values, pd.Categorical):
+                total += values.codes.nbytes + int(pd.Series(values.categories).memory_usage(deep=True, index=False))
+            else:
+                total += values.nbytes
+        return total
@@ -1,47 +1,200 @@
+import atexit
 import json
-import logging
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import date, datetime, timedelta
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
-logger = logging.getLogger("reports.log")
-file_handler = logging.FileHandler("../logs/reports.log", "w", encoding="utf-8")
-file_formatter = logging.Formatter("%(asctime)s %(levelname)s: %(message)s")
-file_handler.setFormatter(file_formatter)
-logger.addHandler(file_handler)
-logger.setLevel(logging.DEBUG)
+from src.logger import setup_logger
+from src.metrics import count_rows, first_argument, instrumented
+from src.result_cache import ResultCache
+from src.sqlite_backend import SqliteOperations
+from src.store import get_store, json_default, parse_operation_dates, query_for
 
-path_excel_file = "/Users/anastasiaandreeva/Project_1_banking_transaction_analysis_application/data/operations.xlsx"
-reader_excel_file_ = pd.read_excel(path_excel_file)
+logger = setup_logger("reports.log")
 
+SPENDING_PERIOD = timedelta(days=90)
+REPORT_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+REPORT_CACHE = ResultCache()
 
-def report_saver(file_name: Optional[str] = None) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
-    """Декоратор для сохранения результатов отчетов в файл."""
+_background_reports: ContextVar[bool] = ContextVar("background_reports", default=False)
+
+
+def format_datetimes(df: pd.DataFrame, date_format: str = REPORT_DATE_FORMAT) -> pd.DataFrame:
+    """Копия DataFrame, в которой столбцы с датами преобразованы в строки (векторно, до to_dict)."""
+    columns = [column for column in df.columns if pd.api.types.is_datetime64_any_dtype(df[column])]
+    if not columns:
+        return df
+    return df.assign(**{column: df[column].dt.strftime(date_format) for column in columns})
+
+
+def _records(result: Any) -> List[Dict]:
+    return result if isinstance(result, list) else [result]
+
+
+def _report_default(value: Any) -> Any:
+    # даты, оставшиеся в результате отчета, записываются в формате REPORT_DATE_FORMAT
+    if isinstance(value, datetime):
+        return value.strftime(REPORT_DATE_FORMAT)
+    return json_default(value)
+
+
+def _report_frame(result: Any) -> pd.DataFrame:
+    return format_datetimes(pd.DataFrame(_records(result)))
+
+
+def _write_json(result: Any, file_path: str) -> None:
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=4, default=_report_default)
+
+
+def _write_ndjson(result: Any, file_path: str) -> None:
+    with open(file_path, "w", encoding="utf-8") as f:
+        for record in _records(result):
+            f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=_report_default))
+            f.write("\n")
+
+
+def _write_csv(result: Any, file_path: str) -> None:
+    _report_frame(result).to_csv(file_path, index=False)
+
+
+def _write_parquet(result: Any, file_path: str) -> None:
+    _report_frame(result).to_parquet(file_path, index=False)
+
+
+# Форматы записи отчетов: имя формата -> (расширение файла, функция записи). Можно добавлять свои.
+REPORT_WRITERS: Dict[str, Tuple[str, Callable[[Any, str], None]]] = {
+    "json": (".json", _write_json),
+    "ndjson": (".ndjson", _write_ndjson),
+    "csv": (".csv", _write_csv),
+    "parquet": (".parquet", _write_parquet),
+}
+
+
+def save_report(result: Any, file_path: str, fmt: str = "json") -> None:
+    """Запись результата отчета в файл в формате fmt; ошибки записи логируются.
+    Отчет пишется во временный файл и затем заменяет file_path, поэтому одновременные записи
+    одного отчета из нескольких потоков не перемешиваются."""
+    tmp_path = f"{file_path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        REPORT_WRITERS[fmt][1](result, tmp_path)
+        os.replace(tmp_path, file_path)
+        logger.info("Отчет успешно сохранен в файл: %s", file_path)
+    except Exception as e:
+        logger.error(f"Ошибка при сохранении отчета: {str(e)}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class ReportWriter:
+    """Фоновая запись отчетов: очередь и поток-писатель.
+
+    Поток запускается при первой задаче; при завершении процесса очередь дописывается.
+    """
+
+    def __init__(self) -> None:
+        self._queue: "queue.Queue[Tuple[Any, str, str]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _run(self) -> None:
+        while True:
+            result, file_path, fmt = self._queue.get()
+            try:
+                save_report(result, file_path, fmt)
+            finally:
+                self._queue.task_done()
+
+    def submit(self, result: Any, file_path: str, fmt: str = "json") -> None:
+        """Постановка отчета в очередь записи."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="report_writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+        self._queue.put((result, file_path, fmt))
+
+    def flush(self) -> None:
+        """Ожидание записи всех отчетов из очереди."""
+        self._queue.join()
+
+
+_writer: Optional[ReportWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_report_writer() -> ReportWriter:
+    """Общий для процесса фоновый писатель отчетов."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = ReportWriter()
+        return _writer
+
+
+@contextmanager
+def background_reports() -> Iterator[None]:
+    """Внутри блока report_saver записывает файлы отчетов фоновым потоком, как при background=True
+    (например, в обработчиках HTTP-запросов, чтобы запись файла не задерживала ответ)."""
+    token = _background_reports.set(True)
+    try:
+        yield
+    finally:
+        _background_reports.reset(token)
+
+
+def is_error_report(result: Any) -> bool:
+    """True, если результат отчета — сообщение об ошибке [{"error": ...}]."""
+    return isinstance(result, list) and len(result) == 1 and isinstance(result[0], dict) and "error" in result[0]
+
+
+def report_saver(
+    file_name: Optional[str] = None, fmt: str = "json", background: bool = False, cache: Optional[ResultCache] = None
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Декоратор для сохранения результатов отчетов в файл.
+    fmt — формат файла из REPORT_WRITERS ("json", "ndjson", "csv", "parquet"); при background=True
+    запись выполняется фоновым потоком, а результат возвращается сразу (дождаться записи —
+    get_report_writer().flush()). С cache результаты запоминаются по аргументам и версии данных:
+    при повторном вызове отчет не пересчитывается, а файл, уже содержащий этот результат,
+    не перезаписывается. Результат из кэша общий для вызовов, изменять его не следует; сообщения
+    об ошибках ([{"error": ...}]) не кэшируются. Результат не обходится в вызывающем потоке: даты
+    отчеты форматируют format_datetimes до to_dict, оставшиеся даты преобразуются при записи файла."""
+    if fmt not in REPORT_WRITERS:
+        raise ValueError(f"Неизвестный формат отчета: {fmt}")
 
     def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
         def wrapper(*args: Any, **kwargs: Any) -> Any:
-            result = func(*args, **kwargs)
+            key = cache.key(func, args, kwargs) if cache is not None else None
+            hit, result = cache.get(key) if cache is not None and key is not None else (False, None)
 
-            # Преобразуем даты в строки
-            if isinstance(result, list):
-                for item in result:
-                    for key, value in item.items():
-                        if isinstance(value, datetime):
-                            item[key] = value.strftime("%Y-%m-%d %H:%M:%S")
+            if not hit:
+                result = func(*args, **kwargs)
+                if cache is not None and key is not None and not is_error_report(result):
+                    cache.put(key, result)
 
             if file_name is None:
-                default_file_name = f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+                extension = REPORT_WRITERS[fmt][0]
+                default_file_name = f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}{extension}"
                 file_path = default_file_name
             else:
                 file_path = file_name
 
-            try:
-                with open(file_path, "w", encoding="utf-8") as f:
-                    json.dump(result, f, ensure_ascii=False, indent=4)
-                logger.info(f"Отчет успешно сохранен в файл: {file_path}")
-            except Exception as e:
-                logger.error(f"Ошибка при сохранении отчета: {str(e)}")
+            if cache is not None and key is not None and hit and cache.written(file_path, key):
+                return result
+
+            if background or _background_reports.get():
+                get_report_writer().submit(result, file_path, fmt)
+            else:
+                save_report(result, file_path, fmt)
+            if cache is not None:
+                cache.mark_written(file_path, key)
 
             return result
 
@@ -50,49 +203,118 @@ def report_saver(file_name: Optional[str] = None) -> Callable[[Callable[..., Any
     return decorator
 
 
-@report_saver("custom_report.json")
+def report_date(value: Optional[Union[str, datetime, date]]) -> datetime:
+    """Дата отчета: текущая при None, строка разбирается в формате ДД.ММ.ГГГГ."""
+    if value is None:
+        return datetime.now()
+    if isinstance(value, str):
+        return pd.to_datetime(value, dayfirst=True)
+    if isinstance(value, datetime):
+        return value
+    return datetime.combine(value, datetime.min.time())
+
+
+def operations_frame(data_list: Union[pd.DataFrame, str]) -> pd.DataFrame:
+    """DataFrame операций с датами типа datetime; строка — путь к файлу операций в хранилище.
+    Переданный DataFrame не изменяется: если даты в нем строками, возвращается новый DataFrame
+    с разобранными датами и общими с исходным остальными столбцами (чтобы не разбирать даты
+    при каждом вызове, передавайте DataFrame из хранилища или после normalize_operations)."""
+    if isinstance(data_list, str):
+        return get_store(data_list).get_dataframe()
+
+    df = data_list
+    if not pd.api.types.is_datetime64_any_dtype(df["Дата операции"]):
+        df = df.copy(deep=False)
+        df["Дата операции"] = parse_operation_dates(df["Дата операции"])
+    return df
+
+
+@instrumented("spending_by_category", rows_in=first_argument(count_rows))
+@report_saver("custom_report.json", cache=REPORT_CACHE)
 def spending_by_category(
-    data_list: Union[pd.DataFrame, str], category: str, date: Optional[Union[str, datetime, date]] = None
+    data_list: Union[pd.DataFrame, str, SqliteOperations],
+    category: str,
+    date: Optional[Union[str, datetime, date]] = None,
 ) -> Union[pd.DataFrame, List[Dict]]:
-    """Траты по категории."""
-    logger.info("Начало работы функции spending_by_category.")
+    """Траты по категории; data_list — DataFrame операций, путь к файлу операций или база SqliteOperations."""
+    logger.debug("Начало работы функции spending_by_category.")
 
     try:
-        if date is None:
-            date = datetime.now()
-        elif isinstance(date, str):
-            date = pd.to_datetime(date, dayfirst=True)
-        elif isinstance(date, datetime):
-            date = date
-        elif isinstance(date, datetime):
-            date = datetime.combine(date, datetime.min.time())
-
-        if isinstance(data_list, str):
-            df = pd.read_excel(data_list)
+        end_date = report_date(date)
+        start_date = end_date - SPENDING_PERIOD
+        if isinstance(data_list, SqliteOperations):
+            recent_transactions = data_list.frame(start_date, end_date, category=category)
         else:
-            df = data_list
+            df = operations_frame(data_list)
+            recent_transactions = query_for(df).frame(start_date, end_date, category=category)
+
+        logger.info("Траты по заданной категории за последние 3 месяца от переданной даты.")
+        return format_datetimes(recent_transactions).to_dict("records")
 
-        df["Дата операции"] = pd.to_datetime(df["Дата операции"], dayfirst=True)
+    except Exception as e:
+        logger.error(f"Произошла ошибка: {e}")
+        return [{"error": str(e)}]
 
-        filtered_transactions = df[df["Категория"] == category]
+    finally:
+        logger.debug("Завершение работы функции spending_by_category.")
 
-        start_date = date - timedelta(days=90)
-        end_date = date
 
-        recent_transactions = filtered_transactions[
-            (filtered_transactions["Дата операции"] >= start_date)
-            & (filtered_transactions["Дата операции"] <= end_date)
-        ]
+# print(spending_by_category(get_store().get_dataframe(), "ЖКХ", "20.05.2020"))
 
-        logger.info("Траты по заданной категории за последние 3 месяца от переданной даты.")
-        return recent_transactions.to_dict("records")
+
+@instrumented("spending_by_categories", rows_in=first_argument(count_rows))
+@report_saver("batch_report.json", cache=REPORT_CACHE)
+def spending_by_categories(
+    data_list: Union[pd.DataFrame, str],
+    requests: Iterable[Tuple[str, Optional[Union[str, datetime, date]]]],
+    amount_column: str = "Сумма операции с округлением",
+    include_transactions: bool = False,
+) -> List[Dict]:
+    """Траты по набору пар (категория, дата) за 3 месяца до каждой даты одним сводным отчетом.
+
+    Операции каждой категории берутся из индекса дат, суммы периодов считаются по накопленным
+    суммам, поэтому все периоды категории обрабатываются за один проход."""
+    logger.debug("Начало работы функции spending_by_categories.")
+
+    try:
+        pairs = [(category, report_date(value)) for category, value in requests]
+        df = operations_frame(data_list)
+        index = query_for(df).key_index("Категория")
+        amounts = df[amount_column].to_numpy(dtype="float64")[index.positions]
+        totals = np.concatenate([[0.0], np.cumsum(np.nan_to_num(amounts))])
+
+        by_category: Dict[str, List[int]] = {}
+        for number, (category, _) in enumerate(pairs):
+            by_category.setdefault(category, []).append(number)
+
+        result: List[Dict] = [{} for _ in pairs]
+        for category, numbers in by_category.items():
+            ends = np.array([pd.Timestamp(pairs[number][1]).to_datetime64() for number in numbers])
+            starts = ends - np.timedelta64(SPENDING_PERIOD)
+            left, right = index.ranges(category, starts, ends)
+
+            for number, start, end, first, last in zip(numbers, starts, ends, left, right):
+                report = {
+                    "category": category,
+                    "start_date": pd.Timestamp(start),
+                    "end_date": pd.Timestamp(end),
+                    "transactions_count": int(last - first),
+                    "total_spent": round(float(totals[last] - totals[first]), 2),
+                }
+                if include_transactions:
+                    transactions = df.iloc[np.sort(index.positions[first:last])]
+                    report["transactions"] = format_datetimes(transactions).to_dict("records")
+                result[number] = report
+
+        logger.info("Сводный отчет по тратам для %d пар категория-дата.", len(pairs))
+        return result
 
     except Exception as e:
         logger.error(f"Произошла ошибка: {e}")
         return [{"error": str(e)}]
 
     finally:
-        logger.info("Завершение работы функции spending_by_category.")
+        logger.debug("Завершение работы функции spending_by_categories.")
 
 
-print(spending_by_category(reader_excel_file_, "ЖКХ", "20.05.2020"))
+# print(spending_by_categories(get_store().get_dataframe(), [("ЖКХ", "31.05.2020"), ("Супермаркеты", "31.05.2020")]))
@@ -0,0 +1,204 @@
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from src.cache import file_signature
+from src.logger import setup_logger
+from src.sqlite_backend import SqliteOperations
+from src.store import store_for, store_for_path
+
+logger = setup_logger("result_cache.log")
+
+MAX_ENTRIES = 256
+MAX_DISK_BYTES = 256 * 1024 * 1024
+DISK_EXTENSION = ".pkl"
+
+
+def dataset_fingerprint(value: Any) -> Any:
+    """Версия данных аргумента отчета.
+
+    Для DataFrame хранилища — путь и версия данных хранилища, для базы SqliteOperations — ее версия,
+    для остальных DataFrame — хэш содержимого, для пути к файлу хранилища — версия данных хранилища
+    (учитывает добавленные операции, которые не меняют файл), для пути к другому существующему
+    файлу — версия файла, иначе само значение.
+    """
+    if isinstance(value, SqliteOperations):
+        return value.version
+    if isinstance(value, pd.DataFrame):
+        store = store_for(value)
+        if store is not None:
+            return ("store", store.path, store.signature)
+        hashed = pd.util.hash_pandas_object(value, index=True).to_numpy()
+        columns = tuple((str(column), str(dtype)) for column, dtype in value.dtypes.items())
+        return ("frame", columns, hashlib.sha256(hashed.tobytes()).hexdigest())
+    if isinstance(value, str) and os.path.isfile(value):
+        store = store_for_path(value)
+        if store is not None:
+            store.get_dataframe()  # перечитывает файл, если он изменился, и обновляет версию
+            return ("store", store.path, store.signature)
+        return ("file", os.path.abspath(value), file_signature(value))
+    return value
+
+
+def contains_none(value: Any) -> bool:
+    """True, если значение — None или список, кортеж или словарь, содержащий None на любом уровне."""
+    if value is None:
+        return True
+    if isinstance(value, (list, tuple)):
+        return any(contains_none(item) for item in value)
+    if isinstance(value, dict):
+        return any(contains_none(item) for item in value.values())
+    return False
+
+
+class ResultCache:
+    """Кэш результатов отчетов по ключу (функция, аргументы, версия данных).
+
+    В памяти хранится не более max_entries последних результатов (LRU). Если задан disk_dir,
+    результаты также сохраняются на диск; при превышении max_disk_bytes удаляются файлы,
+    к которым дольше всего не обращались. Изменение данных меняет ключ, поэтому результаты
+    по старой версии данных больше не выдаются и вытесняются.
+    """
+
+    def __init__(
+        self, max_entries: int = MAX_ENTRIES, disk_dir: Optional[str] = None, max_disk_bytes: int = MAX_DISK_BYTES
+    ) -> None:
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._written: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def key(self, func: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Optional[str]:
+        """Ключ вызова; None, если вызов не кэшируется.
+
+        Вызовы с None в аргументах (в том числе внутри списков, кортежей и словарей) не кэшируются:
+        None означает значение по умолчанию, которое может зависеть от момента вызова (например,
+        текущую дату в spending_by_category и в парах spending_by_categories)."""
+        if contains_none(args) or contains_none(kwargs):
+            return None
+        try:
+            parts = (
+                f"{func.__module__}.{func.__qualname__}",
+                tuple(dataset_fingerprint(value) for value in args),
+                tuple(sorted((name, dataset_fingerprint(value)) for name, value in kwargs.items())),
+            )
+        except Exception as e:
+            logger.warning(f"Не удалось вычислить ключ кэша для {func.__qualname__}: {e}")
+            return None
+        return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(str(self.disk_dir), f"{key}{DISK_EXTENSION}")
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """(True, результат) при попадании в кэш, иначе (False, None)."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key]
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            try:
+                with open(path, "rb") as f:
+                    result = pickle.load(f)
+                os.utime(path)
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                    self._remember(key, result)
+                return True, result
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.error(f"Произошла ошибка при чтении кэша отчета {path}: {e}")
+        with self._lock:
+            self.misses += 1
+        return False, None
+
+    def _remember(self, key: str, result: Any) -> None:
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def put(self, key: str, result: Any) -> None:
+        """Сохранение результата в памяти и, если задан disk_dir, на диске."""
+        with self._lock:
+            self._remember(key, result)
+        if self.disk_dir is not None:
+            self._save_to_disk(key, result)
+
+    def _save_to_disk(self, key: str, result: Any) -> None:
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(str(self.disk_dir), exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            self._evict_disk()
+        except Exception as e:
+            logger.error(f"Произошла ошибка при записи кэша отчета {path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _evict_disk(self) -> None:
+        entries = []
+        for entry in os.scandir(str(self.disk_dir)):
+            if entry.name.endswith(DISK_EXTENSION):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def written(self, file_path: str, key: str) -> bool:
+        """True, если в file_path уже записан результат с этим ключом и файл существует."""
+        with self._lock:
+            return self._written.get(file_path) == key and os.path.exists(file_path)
+
+    def mark_written(self, file_path: str, key: Optional[str]) -> None:
+        """Запоминает, результат с каким ключом записан в file_path (None — неизвестный результат)."""
+        with self._lock:
+            if key is None:
+                self._written.pop(file_path, None)
+            else:
+                self._written[file_path] = key
+
+    def stats(self) -> Dict[str, int]:
+        """Счетчики попаданий и промахов."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+            }
+
+    def clear(self) -> None:
+        """Сброс результатов в памяти и на диске и счетчиков."""
+        with self._lock:
+            self._entries.clear()
+            self._written.clear()
+            self.hits = self.disk_hits = self.misses = 0
+        if self.disk_dir is not None and os.path.isdir(self.disk_dir):
+            for entry in os.scandir(self.disk_dir):
+                if entry.name.endswith(DISK_EXTENSION):
+                    os.remove(entry.path)
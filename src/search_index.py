@@ -0,0 +1,289 @@
+import copy
+import re
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+SEARCH_COLUMNS = ("Категория", "Описание")
+FUZZY_COLUMN = "Описание"
+FUZZY_TOP_K = 10
+FUZZY_THRESHOLD = 0.5
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def trigrams(text: str) -> List[str]:
+    """Уникальные триграммы строки."""
+    return list({"".join(chars) for chars in zip(text, text[1:], text[2:])})
+
+
+def word_trigrams(text: str) -> Set[str]:
+    """Триграммы слов строки в нижнем регистре; слово дополняется двумя пробелами в начале и одним в конце,
+    поэтому у коротких слов тоже есть триграммы, а начало слова весит больше."""
+    result: Set[str] = set()
+    for word in WORD_PATTERN.findall(text.lower()):
+        padded = f"  {word} "
+        result.update("".join(chars) for chars in zip(padded, padded[1:], padded[2:]))
+    return result
+
+
+def _grouped(codes: np.ndarray, count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Позиции строк, упорядоченные по номеру значения (внутри значения — по порядку строк), и границы значений."""
+    valid = np.flatnonzero(codes >= 0)
+    order = valid[np.argsort(codes[valid], kind="stable")]
+    return order, np.searchsorted(codes[order], np.arange(count + 1))
+
+
+class ColumnIndex:
+    """Индекс одного текстового столбца.
+
+    Значения столбца кодируются номерами уникальных строк, строки переводятся в нижний
+    регистр один раз, триграммный индекс строится по уникальным строкам, поэтому его
+    размер зависит от числа различных значений, а не от числа операций.
+    """
+
+    def __init__(self, values: Iterable[Any]) -> None:
+        raw = pd.Series([value if isinstance(value, str) else None for value in values], dtype=object)
+        codes, uniques = pd.factorize(raw)
+        self.codes = codes.astype(np.int32)
+        self.lowered = [value.lower() for value in uniques]
+
+        postings: Dict[str, List[int]] = {}
+        for position, text in enumerate(self.lowered):
+            for trigram in trigrams(text):
+                postings.setdefault(trigram, []).append(position)
+        self.postings = {trigram: np.array(ids, dtype=np.int32) for trigram, ids in postings.items()}
+        self._lookup: Optional[Dict[str, int]] = None
+
+    def extended(self, values: Iterable[Any]) -> "ColumnIndex":
+        """Индекс с добавленными в конец значениями: триграммы строятся только для новых различных строк."""
+        lookup = self._lookup
+        if lookup is None:
+            lookup = {}
+            for code, text in enumerate(self.lowered):
+                lookup.setdefault(text, code)
+        lookup = dict(lookup)
+        lowered = list(self.lowered)
+        changed: Dict[str, List[int]] = {}
+        codes = []
+        for value in values:
+            if not isinstance(value, str):
+                codes.append(-1)
+                continue
+            text = value.lower()
+            if text not in lookup:
+                lookup[text] = len(lowered)
+                lowered.append(text)
+                for trigram in trigrams(text):
+                    changed.setdefault(trigram, []).append(lookup[text])
+            codes.append(lookup[text])
+
+        index = copy.copy(self)
+        index.codes = np.concatenate([self.codes, np.array(codes, dtype=np.int32)])
+        index.lowered = lowered
+        index.postings = dict(self.postings)
+        for trigram, ids in changed.items():
+            new_ids = np.array(ids, dtype=np.int32)
+            old_ids = self.postings.get(trigram)
+            index.postings[trigram] = new_ids if old_ids is None else np.concatenate([old_ids, new_ids])
+        index._lookup = lookup
+        return index
+
+    def candidates(self, query: str) -> Sequence[int]:
+        """Номера уникальных строк, которые могут содержать query."""
+        if len(query) < 3:
+            return range(len(self.lowered))
+        lists = []
+        for trigram in trigrams(query):
+            ids = self.postings.get(trigram)
+            if ids is None:
+                return []
+            lists.append(ids)
+        lists.sort(key=len)
+        result = lists[0]
+        for ids in lists[1:]:
+            result = np.intersect1d(result, ids, assume_unique=True)
+            if not len(result):
+                break
+        positions: List[int] = result.tolist()
+        return positions
+
+    def match(self, query: str) -> np.ndarray:
+        """Маска строк, в которых значение столбца содержит query (query уже в нижнем регистре)."""
+        matched = [position for position in self.candidates(query) if query in self.lowered[position]]
+        if not matched:
+            return np.zeros(len(self.codes), dtype=bool)
+        return np.isin(self.codes, np.array(matched, dtype=np.int32))
+
+
+class SearchIndex:
+    """Индекс для simple_search по столбцам «Категория» и «Описание».
+
+    Возвращает те же строки и в том же порядке, что и линейный поиск подстроки без учета регистра.
+    """
+
+    def __init__(self, categories: Iterable[Any], descriptions: Iterable[Any]) -> None:
+        self.categories = ColumnIndex(categories)
+        self.descriptions = ColumnIndex(descriptions)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "SearchIndex":
+        """Построение индекса по DataFrame операций."""
+        return cls(*(df[column] if column in df.columns else [None] * len(df) for column in SEARCH_COLUMNS))
+
+    @classmethod
+    def from_records(cls, records: List[Dict]) -> "SearchIndex":
+        """Построение индекса по списку словарей операций."""
+        return cls(*([record.get(column) for record in records] for column in SEARCH_COLUMNS))
+
+    def extended(self, df: pd.DataFrame, start: int) -> "SearchIndex":
+        """Индекс для df, в котором строки с позиции start добавлены к проиндексированным операциям."""
+        index = copy.copy(self)
+        index.categories, index.descriptions = (
+            part.extended(df[column].iloc[start:] if column in df.columns else [None] * (len(df) - start))
+            for part, column in zip((self.categories, self.descriptions), SEARCH_COLUMNS)
+        )
+        return index
+
+    def __len__(self) -> int:
+        return len(self.categories.codes)
+
+    def search(self, search_str: str) -> np.ndarray:
+        """Позиции строк, в которых «Категория» или «Описание» содержит search_str без учета регистра."""
+        query = search_str.lower()
+        return np.flatnonzero(self.categories.match(query) | self.descriptions.match(query))
+
+
+class FuzzyIndex:
+    """Индекс нечеткого поиска по различным значениям «Описание».
+
+    Описания кодируются номерами различных строк в нижнем регистре в порядке первого появления,
+    триграммы слов хранятся для каждой различной строки, поэтому размер индекса зависит от числа
+    различных описаний, а не от числа операций. Релевантность описания — доля триграмм запроса,
+    которые в нем есть: опечатка или пропущенная буква меняют только несколько триграмм.
+    """
+
+    def __init__(self, descriptions: Iterable[Any]) -> None:
+        raw = pd.Series([value if isinstance(value, str) else None for value in descriptions], dtype=object)
+        codes, uniques = pd.factorize(raw)
+        lowered_codes, lowered = pd.factorize(pd.Series([value.lower() for value in uniques], dtype=object))
+        self.codes = np.where(codes >= 0, lowered_codes.astype(np.int32)[codes], -1).astype(np.int32)
+        self.values: List[str] = list(lowered)
+        self.sizes = np.zeros(0, dtype=np.int32)
+        self.postings: Dict[str, np.ndarray] = {}
+        self._lookup: Optional[Dict[str, int]] = None
+        self._add_postings(0)
+        self._order, self._offsets = _grouped(self.codes, len(self.values))
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "FuzzyIndex":
+        """Построение индекса по DataFrame операций."""
+        return cls(df[FUZZY_COLUMN] if FUZZY_COLUMN in df.columns else [None] * len(df))
+
+    @classmethod
+    def from_records(cls, records: List[Dict]) -> "FuzzyIndex":
+        """Построение индекса по списку словарей операций."""
+        return cls(record.get(FUZZY_COLUMN) for record in records)
+
+    def _add_postings(self, first: int) -> None:
+        """Триграммы различных строк с номерами от first: дополняются sizes и списки postings."""
+        added: Dict[str, List[int]] = {}
+        sizes = []
+        for value_id in range(first, len(self.values)):
+            grams = word_trigrams(self.values[value_id])
+            sizes.append(len(grams))
+            for gram in grams:
+                added.setdefault(gram, []).append(value_id)
+        self.sizes = np.concatenate([self.sizes, np.array(sizes, dtype=np.int32)])
+        self.postings = dict(self.postings)
+        for gram, ids in added.items():
+            new_ids = np.array(ids, dtype=np.int32)
+            old_ids = self.postings.get(gram)
+            self.postings[gram] = new_ids if old_ids is None else np.concatenate([old_ids, new_ids])
+
+    def extended(self, df: pd.DataFrame, start: int) -> "FuzzyIndex":
+        """Индекс для df, в котором строки с позиции start добавлены к проиндексированным операциям:
+        триграммы строятся только для новых различных описаний, новые строки дописываются в группы."""
+        lookup = self._lookup
+        if lookup is None:
+            lookup = {value: value_id for value_id, value in enumerate(self.values)}
+        lookup = dict(lookup)
+        values = list(self.values)
+        descriptions = df[FUZZY_COLUMN].iloc[start:] if FUZZY_COLUMN in df.columns else [None] * (len(df) - start)
+        codes = []
+        for value in descriptions:
+            if not isinstance(value, str):
+                codes.append(-1)
+                continue
+            text = value.lower()
+            if text not in lookup:
+                lookup[text] = len(values)
+                values.append(text)
+            codes.append(lookup[text])
+        new_codes = np.array(codes, dtype=np.int32)
+
+        index = copy.copy(self)
+        index.codes = np.concatenate([self.codes, new_codes])
+        index.values = values
+        index._lookup = lookup
+        index._add_postings(len(self.values))
+
+        rows = start + np.flatnonzero(new_codes >= 0)
+        row_codes = new_codes[new_codes >= 0]
+        order = np.argsort(row_codes, kind="stable")
+        rows, row_codes = rows[order], row_codes[order]
+        offsets = np.concatenate([self._offsets, np.full(len(values) - len(self.values), self._offsets[-1])])
+        index._order = np.insert(self._order, offsets[row_codes + 1], rows)
+        index._offsets = offsets + np.concatenate([[0], np.cumsum(np.bincount(row_codes, minlength=len(values)))])
+        return index
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def search(
+        self,
+        query: str,
+        top_k: int = FUZZY_TOP_K,
+        threshold: float = FUZZY_THRESHOLD,
+        budget: Optional[float] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, bool]:
+        """Позиции не более top_k операций по убыванию релевантности описания запросу query, их
+        релевантность (от 0 до 1) и признак полного расчета.
+
+        В результат попадают описания с релевантностью не ниже threshold; при равной релевантности выше
+        описание, ближе к запросу по коэффициенту Жаккара триграмм, затем встретившееся раньше, операции
+        одного описания — в порядке следования. budget — время на запрос в секундах: триграммы запроса
+        учитываются от редких к частым, после исчерпания времени оставшиеся пропускаются.
+        """
+        deadline = None if budget is None else time.perf_counter() + budget
+        grams = word_trigrams(query)
+        if not grams or top_k <= 0:
+            return np.array([], dtype=np.intp), np.array([], dtype=np.float64), True
+
+        counts = np.zeros(len(self.values), dtype=np.int32)
+        complete = True
+        for ids in sorted((self.postings[gram] for gram in grams if gram in self.postings), key=len):
+            if deadline is not None and time.perf_counter() >= deadline:
+                complete = False
+                break
+            counts[ids] += 1
+        candidates = np.flatnonzero(counts >= threshold * len(grams))
+        if not len(candidates):
+            return np.array([], dtype=np.intp), np.array([], dtype=np.float64), complete
+
+        common = counts[candidates]
+        scores = common / len(grams)
+        similarity = common / (len(grams) + self.sizes[candidates] - common)
+        ranked = np.lexsort((candidates, -similarity, -scores))
+
+        positions, row_scores, found = [], [], 0
+        for rank in ranked.tolist():
+            begin, end = self._offsets[candidates[rank]], self._offsets[candidates[rank] + 1]
+            rows = self._order[begin:end][: top_k - found]
+            positions.append(rows)
+            row_scores.append(np.full(len(rows), scores[rank]))
+            found += len(rows)
+            if found >= top_k:
+                break
+        return np.concatenate(positions).astype(np.intp), np.concatenate(row_scores), complete
@@ -0,0 +1,284 @@
+import argparse
+import io
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from src.logger import setup_logger
+from src.metrics import METRICS, Measurement
+from src.reports import background_reports, spending_by_category
+from src.search_index import FUZZY_THRESHOLD, FUZZY_TOP_K
+from src.services import iter_fuzzy_search, iter_physical_transfers, iter_simple_search, write_json_stream
+from src.store import get_store, json_default, set_default_path
+from src.views import home_page
+
+logger = setup_logger("server.log")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+class ApiError(Exception):
+    """Ошибка запроса, которая возвращается клиенту с кодом status."""
+
+    def __init__(self, message: str, status: int = 400) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def warm_up() -> None:
+    """Загрузка данных и построение индексов до приема запросов."""
+    start = time.perf_counter()
+    store = get_store()
+    store.get_dataframe()
+    store.get_operation_records()
+    store.get_search_index()
+    store.get_fuzzy_index()
+    store.get_query()
+    store.get_card_aggregates()
+    store.get_top_transactions()
+    logger.info(f"Данные и индексы загружены за {time.perf_counter() - start:.2f} с.")
+
+
+def _param(params: Dict[str, List[str]], name: str) -> str:
+    values = params.get(name)
+    if not values:
+        raise ApiError(f"Не указан параметр {name}.")
+    return values[0]
+
+
+class ChunkedWriter:
+    """Текстовый поток поверх сокета ответа для write_json_stream: текст отправляется частями
+    Transfer-Encoding: chunked не меньше chunk_bytes, поэтому память не зависит от размера ответа."""
+
+    def __init__(self, wfile: io.BufferedIOBase, chunk_bytes: int = STREAM_CHUNK_BYTES) -> None:
+        self.wfile = wfile
+        self.chunk_bytes = chunk_bytes
+        self._parts: List[bytes] = []
+        self._size = 0
+
+    def write(self, text: str) -> int:
+        data = text.encode("utf-8")
+        self._parts.append(data)
+        self._size += len(data)
+        if self._size >= self.chunk_bytes:
+            self.flush()
+        return len(text)
+
+    def flush(self) -> None:
+        """Отправка накопленного текста одной частью."""
+        if self._size:
+            data = b"".join(self._parts)
+            self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+            self._parts, self._size = [], 0
+
+    def close(self) -> None:
+        """Отправка остатка и завершающей пустой части."""
+        self.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def handle_home(params: Dict[str, List[str]]) -> bytes:
+    """Страница «Главная» на дату date (YYYY-MM-DD HH:MM:SS)."""
+    try:
+        data_time = pd.Timestamp(_param(params, "date"))
+    except ValueError as e:
+        raise ApiError(f"Некорректная дата: {e}")
+    if pd.isna(data_time):
+        raise ApiError("Некорректная дата: пустое значение.")
+    response = home_page(data_time)
+    if response is None:
+        raise ApiError("Ошибка при формировании страницы.", status=500)
+    return json.dumps(response, ensure_ascii=False, default=json_default).encode("utf-8")
+
+
+def _number_param(params: Dict[str, List[str]], name: str) -> Optional[float]:
+    if name not in params:
+        return None
+    try:
+        value = float(_param(params, name))
+    except ValueError:
+        raise ApiError(f"Параметр {name} должен быть числом.")
+    if value < 0:
+        raise ApiError(f"Параметр {name} должен быть неотрицательным.")
+    return value
+
+
+def handle_search(params: Dict[str, List[str]]) -> Iterable[Dict]:
+    """Простой поиск по строке q; при fuzzy=1 — нечеткий поиск по описанию: не более limit операций
+    по убыванию релевантности, порог релевантности threshold, время на запрос budget_ms."""
+    store = get_store()
+    query = _param(params, "q")
+    if params.get("fuzzy", ["0"])[0] in ("0", "false", ""):
+        return iter_simple_search(query, store.get_operation_records(), store.get_search_index())
+    limit, threshold, budget_ms = (_number_param(params, name) for name in ("limit", "threshold", "budget_ms"))
+    return iter_fuzzy_search(
+        query,
+        store.get_operation_records(),
+        store.get_fuzzy_index(),
+        top_k=FUZZY_TOP_K if limit is None else int(limit),
+        threshold=FUZZY_THRESHOLD if threshold is None else threshold,
+        budget=None if budget_ms is None else budget_ms / 1000,
+    )
+
+
+def handle_transfers(params: Dict[str, List[str]]) -> Iterable[Dict]:
+    """Переводы физическим лицам."""
+    return iter_physical_transfers(get_store().get_dataframe())
+
+
+def handle_spending(params: Dict[str, List[str]]) -> bytes:
+    """Траты по категории category за 3 месяца до даты date (ДД.ММ.ГГГГ); файл отчета пишется фоновым потоком."""
+    with background_reports():
+        result = spending_by_category(get_store().get_dataframe(), _param(params, "category"), _param(params, "date"))
+    return json.dumps(result, ensure_ascii=False, default=json_default).encode("utf-8")
+
+
+def handle_append(body: bytes) -> bytes:
+    """Добавление новых операций: тело запроса — JSON-объект операции или массив операций."""
+    try:
+        operations = json.loads(body)
+    except ValueError as e:
+        raise ApiError(f"Некорректный JSON: {e}")
+    if not operations or not isinstance(operations, (dict, list)):
+        raise ApiError("Ожидается операция или массив операций.")
+    if isinstance(operations, list) and not all(isinstance(operation, dict) for operation in operations):
+        raise ApiError("Каждая операция должна быть JSON-объектом.")
+    appended = get_store().append(operations)
+    return json.dumps({"appended": appended}).encode("utf-8")
+
+
+# Ответ обработчика: тело в байтах или записи, которые отправляются потоком JSON-массива.
+Body = Union[bytes, Iterable[Dict]]
+
+ROUTES: Dict[str, Callable[[Dict[str, List[str]]], Body]] = {
+    "/home": handle_home,
+    "/search": handle_search,
+    "/transfers": handle_transfers,
+    "/spending": handle_spending,
+    "/health": lambda params: b'{"status":"ok"}',
+    "/metrics": lambda params: json.dumps(METRICS.snapshot(), ensure_ascii=False).encode("utf-8"),
+    "/metrics/prometheus": lambda params: METRICS.to_prometheus().encode("utf-8"),
+}
+POST_ROUTES: Dict[str, Callable[[bytes], bytes]] = {"/operations": handle_append}
+CONTENT_TYPES = {"/metrics/prometheus": "text/plain; version=0.0.4; charset=utf-8"}
+JSON_CONTENT_TYPE = "application/json; charset=utf-8"
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """Обработчик запросов: GET-маршруты из ROUTES и POST-маршруты из POST_ROUTES, ответы в JSON."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        self._respond("GET", url.path, ROUTES.get(url.path), lambda handler: handler(params))
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        self._respond("POST", url.path, POST_ROUTES.get(url.path), lambda handler: handler(self._read_body()))
+
+    def _read_body(self) -> bytes:
+        """Тело запроса длиной Content-Length; некорректный заголовок — ошибка 400."""
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True  # тело не прочитано, соединение дальше не используется
+            raise ApiError("Некорректный заголовок Content-Length.")
+        return self.rfile.read(length)
+
+    def _respond(self, method: str, path: str, handler: Any, call: Callable[[Any], Body]) -> None:
+        start = time.perf_counter()
+        if handler is None:
+            status, error = self._error(ApiError(f"Неизвестный адрес: {path}", status=404))
+            self._send(status, JSON_CONTENT_TYPE, error)
+        else:
+            with METRICS.measure(f"{method} {path}") as measurement:
+                status, body = self._dispatch(path, handler, call)
+                content_type = CONTENT_TYPES.get(path, JSON_CONTENT_TYPE) if status == 200 else JSON_CONTENT_TYPE
+                if isinstance(body, bytes):
+                    self._send(status, content_type, body)
+                else:
+                    self._stream(path, content_type, body, measurement)
+        logger.debug("%s %s %d %.4f с", method, path, status, time.perf_counter() - start)
+
+    def _dispatch(self, path: str, handler: Any, call: Callable[[Any], Body]) -> Tuple[int, Body]:
+        try:
+            return 200, call(handler)
+        except Exception as e:
+            if not isinstance(e, ApiError):
+                logger.error(f"Произошла ошибка при обработке {path}: {e}")
+            return self._error(e)
+
+    @staticmethod
+    def _error(error: Exception) -> Tuple[int, bytes]:
+        status = error.status if isinstance(error, ApiError) else 500
+        return status, json.dumps({"error": str(error)}, ensure_ascii=False).encode("utf-8")
+
+    def _send(self, status: int, content_type: str, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, path: str, content_type: str, records: Iterable[Dict], measurement: Measurement) -> None:
+        """Отправка записей JSON-массивом частями (Transfer-Encoding: chunked) по мере их получения.
+        Ошибка после начала ответа уже не может изменить статус: соединение закрывается без
+        завершающей части, и клиент видит оборванный ответ."""
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        writer = ChunkedWriter(self.wfile)
+        try:
+            measurement.rows_out = write_json_stream(records, writer)
+            writer.close()
+        except Exception as e:
+            logger.error(f"Произошла ошибка при потоковой отправке {path}: {e}")
+            measurement.error = True
+            self.close_connection = True
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def make_server(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """HTTP-сервер, обрабатывающий каждый запрос в отдельном потоке."""
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Запуск сервиса: python -m src.server [--host 127.0.0.1] [--port 8000] [--path operations.xlsx]."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--path", help="файл операций (по умолчанию путь из модуля store)")
+    args = parser.parse_args(argv)
+
+    if args.path:
+        set_default_path(args.path)
+    warm_up()
+    server = make_server(args.host, args.port)
+    logger.info(f"Сервис запущен на http://{args.host}:{server.server_address[1]}")
+    print(f"Сервис запущен на http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,75 @@
 import json
-import logging
 import re
-from typing import Any
+from typing import Any, Dict, Iterable, Iterator, Optional, Protocol, Union
 
+import numpy as np
 import pandas as pd
 
-logger = logging.getLogger("services.log")
-file_handler = logging.FileHandler("../logs/services.log", "w", encoding="utf-8")
-file_formatter = logging.Formatter("%(asctime)s %(levelname)s: %(message)s")
-file_handler.setFormatter(file_formatter)
-logger.addHandler(file_handler)
-logger.setLevel(logging.DEBUG)
+from src.logger import setup_logger
+from src.metrics import METRICS
+from src.records import OperationRecords
+from src.search_index import FUZZY_COLUMN, FUZZY_THRESHOLD, FUZZY_TOP_K, FuzzyIndex, SearchIndex
+from src.sqlite_backend import SqliteOperations
+from src.store import json_default
 
-path_excel_file = "/Users/anastasiaandreeva/Project_1_banking_transaction_analysis_application/data/operations.xlsx"
-reader_excel_file = (pd.read_excel(path_excel_file)).to_dict(orient="records")
-# print(reader_excel_file)
+logger = setup_logger("services.log")
 
+NAME_PATTERN = re.compile(r"[А-Яа-я]+\s[А-Яа-я]\.")
+STREAM_CHUNK_SIZE = 10_000
 
-def simple_search(search_str: str, data_list: list) -> Any:
-    """Функция для простого поиска."""
-    logger.info("Начало работы функции simple_search.")
-    logger.warning("Тип вводных данных - str!")
+
+def iter_simple_search(
+    search_str: str, data_list: Union[list, OperationRecords, SqliteOperations], index: Optional[SearchIndex] = None
+) -> Iterator[Dict]:
+    """Генератор совпадений простого поиска в порядке следования операций."""
+    if not isinstance(search_str, str):
+        raise TypeError("Некорректный тип данных.")
+    if search_str == "" or search_str == "nan" or not data_list:
+        return iter(())
+    if isinstance(data_list, SqliteOperations):
+        return data_list.search(search_str)
+    if isinstance(data_list, OperationRecords):
+        positions = index.search(search_str) if index is not None else _search_positions(search_str, data_list)
+        return data_list.rows(positions)
+    if index is not None:
+        return (data_list[position] for position in index.search(search_str))
+    return _iter_linear_search(search_str.lower(), data_list)
+
+
+def _contains(values: pd.Series, search_lower: str) -> np.ndarray:
+    """Маска строк, в которых значение категориального столбца содержит search_lower без учета регистра.
+    Проверяются только различные значения столбца."""
+    categorical = pd.Categorical(values)
+    matched = [
+        code
+        for code, value in enumerate(categorical.categories)
+        if isinstance(value, str) and search_lower in value.lower()
+    ]
+    return np.isin(categorical.codes, np.array(matched, dtype=categorical.codes.dtype))
+
+
+def _search_positions(search_str: str, records: OperationRecords) -> np.ndarray:
+    search_lower = search_str.lower()
+    mask = _contains(records.column("Категория"), search_lower) | _contains(records.column("Описание"), search_lower)
+    return np.flatnonzero(mask)
+
+
+def _iter_linear_search(search_lower: str, data_list: list) -> Iterator[Dict]:
+    for data in data_list:
+        if isinstance(data.get("Категория"), str) and search_lower in data["Категория"].lower():
+            yield data
+        elif isinstance(data.get("Описание"), str) and search_lower in data["Описание"].lower():
+            yield data
+
+
+def simple_search(
+    search_str: str, data_list: Union[list, OperationRecords, SqliteOperations], index: Optional[SearchIndex] = None
+) -> Any:
+    """Функция для простого поиска.
+    Если передан index, построенный по тем же data_list, просматриваются только строки-кандидаты из индекса.
+    data_list — список словарей операций, OperationRecords или база SqliteOperations."""
+    logger.debug("Начало работы функции simple_search.")
+    logger.debug("Тип вводных данных - str!")
     if not isinstance(search_str, str):
         logger.error("TypeError: Некорректный тип данных.")
         raise TypeError("Некорректный тип данных.")
@@ -33,42 +82,147 @@ def simple_search(search_str: str, data_list: list) -> Any:
             logger.error("Данные отсутствуют.")
             return []
 
-        new_data_list = []
-        for data in data_list:
-            if isinstance(data.get("Категория"), str) and search_str.lower() in data["Категория"].lower():
-                new_data_list.append(data)
-            elif isinstance(data.get("Описание"), str) and search_str.lower() in data["Описание"].lower():
-                new_data_list.append(data)
+        with METRICS.measure("simple_search") as measurement:
+            measurement.rows_in = len(data_list)
+            new_data_list = list(iter_simple_search(search_str, data_list, index))
+            measurement.rows_out = len(new_data_list)
 
-        json_result = json.dumps(new_data_list, indent=4, ensure_ascii=False)
+        json_result = json.dumps(new_data_list, indent=4, ensure_ascii=False, default=json_default)
         logger.info("Данные в виде JSON.")
         return json_result
     except Exception as e:
         logger.error(f"Произошла ошибка: {e}")
         return {e}
     finally:
-        logger.info("Завершение работы функции simple_search.")
+        logger.debug("Завершение работы функции simple_search.")
+
 
+# print(simple_search(input('Введите строку поиска: ').lower(), get_store().get_records()))
 
-# print(simple_search(input('Введите строку поиска: ').lower(), reader_excel_file))
 
+def iter_fuzzy_search(
+    search_str: str,
+    data_list: Union[list, OperationRecords],
+    index: Optional[FuzzyIndex] = None,
+    top_k: int = FUZZY_TOP_K,
+    threshold: float = FUZZY_THRESHOLD,
+    budget: Optional[float] = None,
+) -> Iterator[Dict]:
+    """Генератор не более top_k операций нечеткого поиска по «Описание» в порядке убывания релевантности."""
+    if not isinstance(search_str, str):
+        raise TypeError("Некорректный тип данных.")
+    if search_str == "" or search_str == "nan" or not data_list:
+        return iter(())
+    if index is None:
+        if isinstance(data_list, OperationRecords):
+            index = FuzzyIndex(data_list.column(FUZZY_COLUMN))
+        else:
+            index = FuzzyIndex.from_records(data_list)
+    positions, _, complete = index.search(search_str, top_k, threshold, budget)
+    if not complete:
+        logger.warning(f"Время на запрос {search_str!r} исчерпано, результат нечеткого поиска неполный.")
+    if isinstance(data_list, OperationRecords):
+        return data_list.rows(positions)
+    return (data_list[position] for position in positions.tolist())
+
+
+def fuzzy_search(
+    search_str: str,
+    data_list: Union[list, OperationRecords],
+    index: Optional[FuzzyIndex] = None,
+    top_k: int = FUZZY_TOP_K,
+    threshold: float = FUZZY_THRESHOLD,
+    budget: Optional[float] = None,
+) -> Any:
+    """Функция для нечеткого поиска по описанию с учетом опечаток.
+    Возвращает не более top_k операций, описания которых содержат не меньше доли threshold триграмм
+    запроса, от наиболее релевантных. index — FuzzyIndex, построенный по тем же data_list, budget —
+    время на запрос в секундах (при исчерпании результат может быть неполным)."""
+    logger.debug("Начало работы функции fuzzy_search.")
+    if not isinstance(search_str, str):
+        logger.error("TypeError: Некорректный тип данных.")
+        raise TypeError("Некорректный тип данных.")
+
+    if search_str == "" or search_str == "nan" or not data_list:
+        return []
+
+    try:
+        with METRICS.measure("fuzzy_search") as measurement:
+            measurement.rows_in = len(data_list)
+            new_data_list = list(iter_fuzzy_search(search_str, data_list, index, top_k, threshold, budget))
+            measurement.rows_out = len(new_data_list)
 
-def find_physical_transfers(data_list: list) -> Any:
+        json_result = json.dumps(new_data_list, indent=4, ensure_ascii=False, default=json_default)
+        logger.info("Данные в виде JSON.")
+        return json_result
+    except Exception as e:
+        logger.error(f"Произошла ошибка: {e}")
+        return {e}
+    finally:
+        logger.debug("Завершение работы функции fuzzy_search.")
+
+
+def physical_transfer_positions(df: Union[pd.DataFrame, OperationRecords]) -> np.ndarray:
+    """Позиции переводов физическим лицам в DataFrame операций или OperationRecords.
+    Сначала отбираются строки категории «Переводы» булевой маской, затем скомпилированное
+    регулярное выражение применяется к различным описаниям этих строк."""
+    if "Описание" not in df.columns:
+        return np.array([], dtype=np.intp)
+    if isinstance(df, OperationRecords):
+        categories, all_descriptions = df.column("Категория"), df.column("Описание")
+    else:
+        categories, all_descriptions = df["Категория"], df["Описание"]
+    positions = np.flatnonzero(categories == "Переводы")
+    codes, descriptions = pd.factorize(all_descriptions.iloc[positions])
+    if not len(descriptions):
+        return np.array([], dtype=np.intp)
+    matched = pd.Series(descriptions).str.contains(NAME_PATTERN, na=False).to_numpy(dtype=bool)
+    return positions[(codes >= 0) & matched[codes]]
+
+
+def filter_physical_transfers(df: pd.DataFrame) -> pd.DataFrame:
+    """Переводы физическим лицам в DataFrame операций."""
+    return df.iloc[physical_transfer_positions(df)]
+
+
+def _iter_rows(df: pd.DataFrame, positions: np.ndarray) -> Iterator[Dict]:
+    for start in range(0, len(positions), STREAM_CHUNK_SIZE):
+        end = start + STREAM_CHUNK_SIZE
+        yield from df.iloc[positions[start:end]].to_dict(orient="records")
+
+
+def iter_physical_transfers(
+    data_list: Union[list, pd.DataFrame, OperationRecords, SqliteOperations],
+) -> Iterator[Dict]:
+    """Генератор переводов физическим лицам; DataFrame и OperationRecords преобразуются в словари порциями,
+    в базе SqliteOperations переводы выбираются по индексу категории."""
+    if isinstance(data_list, SqliteOperations):
+        return data_list.physical_transfers(NAME_PATTERN)
+    if isinstance(data_list, OperationRecords):
+        return data_list.rows(physical_transfer_positions(data_list))
+    if isinstance(data_list, pd.DataFrame):
+        return _iter_rows(data_list, physical_transfer_positions(data_list))
+    return (
+        transaction
+        for transaction in data_list
+        if transaction.get("Категория") == "Переводы" and NAME_PATTERN.search(transaction.get("Описание", ""))
+    )
+
+
+def find_physical_transfers(data_list: Union[list, pd.DataFrame, OperationRecords, SqliteOperations]) -> Any:
     """Функция поиска переводов физическим лицам."""
-    logger.info("Начало работы функции find_physical_transfers.")
+    logger.debug("Начало работы функции find_physical_transfers.")
     try:
-        if not data_list:
+        if len(data_list) == 0:
             logger.error("Данные отсутствуют.")
             return []
 
-        name_pattern = r"[А-Яа-я]+\s[А-Яа-я]\."
-
-        filtered_data = []
-        for transaction in data_list:
-            if transaction.get("Категория") == "Переводы" and re.search(name_pattern, transaction.get("Описание", "")):
-                filtered_data.append(transaction)
+        with METRICS.measure("find_physical_transfers") as measurement:
+            measurement.rows_in = len(data_list)
+            filtered_data = list(iter_physical_transfers(data_list))
+            measurement.rows_out = len(filtered_data)
 
-        json_result = json.dumps(filtered_data, indent=4, ensure_ascii=False)
+        json_result = json.dumps(filtered_data, indent=4, ensure_ascii=False, default=json_default)
 
         logger.info("Данные в виде JSON.")
         return json_result
@@ -76,7 +230,38 @@ def find_physical_transfers(data_list: list) -> Any:
         logger.error(f"Произошла ошибка: {e}")
         return {e}
     finally:
-        logger.info("Завершение работы функции find_physical_transfers.")
+        logger.debug("Завершение работы функции find_physical_transfers.")
+
+
+# print(find_physical_transfers(get_store().get_dataframe()))
+
+
+class TextWriter(Protocol):
+    """Объект с методом write(str): текстовый файл, StringIO, поток ответа HTTP."""
+
+    def write(self, text: str, /) -> Any: ...
+
+
+def write_json_stream(records: Iterable[Dict], fp: TextWriter, ndjson: bool = False) -> int:
+    """Потоковая запись результатов в файл или сокет (объект с методом write).
+    По умолчанию пишется компактный JSON-массив, при ndjson=True — один объект JSON на строку.
+    Записи сериализуются по одной, поэтому память не зависит от числа совпадений.
+    Возвращает количество записанных записей."""
+    count = 0
+    separator = "\n" if ndjson else ","
+    if not ndjson:
+        fp.write("[")
+    for record in records:
+        if count and not ndjson:
+            fp.write(separator)
+        fp.write(json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=json_default))
+        if ndjson:
+            fp.write(separator)
+        count += 1
+    if not ndjson:
+        fp.write("]")
+    return count
 
 
-# print(find_physical_transfers(reader_excel_file))
+# with open("search.ndjson", "w", encoding="utf-8") as f:
+#     write_json_stream(iter_simple_search("а", get_store().get_records()), f, ndjson=True)
@@ -0,0 +1,238 @@
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.aggregates import CASHBACK_RATE, card_summary
+from src.logger import setup_logger
+from src.services import NAME_PATTERN
+
+logger = setup_logger("sharding.log")
+
+SHARD_KEYS = ("card", "month")
+SHARD_COLUMNS = ("row", "date", "card", "category", "description", "amount")
+DICTIONARIES_FILE = "dictionaries.json"
+NAT = np.iinfo(np.int64).min
+TRANSFERS_CATEGORY = "Переводы"
+
+# Коды для analyze_shard в процессе пула (transfer_codes), передаются один раз при запуске процесса.
+_worker_codes: Optional[Tuple[int, np.ndarray]] = None
+
+
+def _month_numbers(dates: np.ndarray) -> np.ndarray:
+    """Номер месяца (год * 12 + месяц) для дат в наносекундах; -1 для пропусков."""
+    valid = dates != NAT
+    months = np.full(len(dates), -1, dtype=np.int64)
+    months[valid] = dates[valid].astype("datetime64[ns]").astype("datetime64[M]").astype(np.int64)
+    return months
+
+
+def write_shards(df: pd.DataFrame, directory: str, shards: int, by: str = "card") -> List[str]:
+    """Раскладка операций по shards каталогам: по одному файлу .npy на столбец.
+
+    Строковые столбцы кодируются номерами по общим для всех частей словарям (dictionaries.json),
+    суммы переводятся в копейки (int64), поэтому частичные суммы частей складываются без ошибок
+    округления. by="card" — все операции карты в одной части, by="month" — все операции месяца.
+    """
+    if by not in SHARD_KEYS:
+        raise ValueError(f"Некорректный ключ разбиения: {by}")
+    card_codes, cards = pd.factorize(df["Номер карты"])
+    category_codes, categories = pd.factorize(df["Категория"])
+    description_codes, descriptions = pd.factorize(df["Описание"])
+    dates = df["Дата операции"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+    amounts = np.round(df["Сумма операции с округлением"].fillna(0).to_numpy(dtype="float64") * 100).astype(np.int64)
+    columns: Dict[str, np.ndarray] = {
+        "row": np.arange(len(df), dtype=np.int64),
+        "date": dates,
+        "card": card_codes.astype(np.int32),
+        "category": category_codes.astype(np.int32),
+        "description": description_codes.astype(np.int32),
+        "amount": amounts,
+    }
+
+    keys = np.maximum(card_codes, 0) if by == "card" else np.maximum(_month_numbers(dates), 0)
+    shard_ids = keys % shards
+
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, DICTIONARIES_FILE), "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "cards": list(map(str, cards)),
+                "categories": list(map(str, categories)),
+                "descriptions": list(map(str, descriptions)),
+            },
+            f,
+            ensure_ascii=False,
+        )
+
+    paths = []
+    for shard in range(shards):
+        path = os.path.join(directory, f"shard_{shard:04d}")
+        os.makedirs(path, exist_ok=True)
+        positions = np.flatnonzero(shard_ids == shard)
+        for name, values in columns.items():
+            np.save(os.path.join(path, f"{name}.npy"), values[positions])
+        paths.append(path)
+    return paths
+
+
+def load_shard(path: str) -> Dict[str, np.ndarray]:
+    """Столбцы части в виде массивов, отображенных в память (без чтения файла целиком)."""
+    return {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in SHARD_COLUMNS}
+
+
+def _group_sums(keys: Tuple[np.ndarray, np.ndarray], *values: np.ndarray) -> Tuple[np.ndarray, List[np.ndarray]]:
+    """Уникальные пары ключей (месяц, код) в виде массива n x 2 и суммы каждого из массивов values по парам.
+    Пара кодируется одним int64, поэтому группировка — одна одномерная сортировка."""
+    combined = (keys[0].astype(np.int64) << 32) | keys[1].astype(np.int64)
+    unique, inverse = np.unique(combined, return_inverse=True)
+    pairs = np.stack([unique >> 32, unique & 0xFFFFFFFF], axis=1)
+    sums = [np.bincount(inverse, weights=value, minlength=len(unique)).astype(np.int64) for value in values]
+    return pairs, sums
+
+
+def load_dictionaries(directory: str) -> Dict[str, List[str]]:
+    """Словари кодов строковых столбцов, записанные write_shards."""
+    with open(os.path.join(directory, DICTIONARIES_FILE), encoding="utf-8") as f:
+        dictionaries: Dict[str, List[str]] = json.load(f)
+    return dictionaries
+
+
+def transfer_codes(dictionaries: Dict[str, List[str]]) -> Tuple[int, np.ndarray]:
+    """Код категории «Переводы» (-1, если ее нет) и коды описаний с именем получателя (NAME_PATTERN).
+    Это все, что analyze_shard нужно из словарей, поэтому словарь описаний разбирается один раз."""
+    categories = dictionaries["categories"]
+    category = categories.index(TRANSFERS_CATEGORY) if TRANSFERS_CATEGORY in categories else -1
+    names = [code for code, description in enumerate(dictionaries["descriptions"]) if NAME_PATTERN.search(description)]
+    return category, np.array(names, dtype=np.int32)
+
+
+def _init_worker(codes: Tuple[int, np.ndarray]) -> None:
+    global _worker_codes
+    _worker_codes = codes
+
+
+def analyze_shard(path: str, codes: Optional[Tuple[int, np.ndarray]] = None) -> Dict[str, Any]:
+    """Частичные результаты по одной части: суммы по (месяц, карта) и (месяц, категория) и переводы.
+    codes — результат transfer_codes; по умолчанию коды, переданные процессу пула analyze_shards,
+    а вне пула они вычисляются по словарям каталога части."""
+    columns = load_shard(path)
+    if codes is None:
+        codes = _worker_codes or transfer_codes(load_dictionaries(os.path.dirname(path)))
+    transfer_category, name_codes = codes
+
+    months = _month_numbers(np.asarray(columns["date"]))
+    amounts = np.asarray(columns["amount"])
+    cards = np.asarray(columns["card"])
+    categories = np.asarray(columns["category"])
+    descriptions = np.asarray(columns["description"])
+
+    with_card = (months >= 0) & (cards >= 0)
+    card_keys, (card_sums,) = _group_sums((months[with_card], cards[with_card].astype(np.int64)), amounts[with_card])
+    with_category = (months >= 0) & (categories >= 0)
+    category_keys, (category_sums, category_counts) = _group_sums(
+        (months[with_category], categories[with_category].astype(np.int64)),
+        amounts[with_category],
+        np.ones(int(with_category.sum()), dtype=np.int64),
+    )
+
+    transfers = np.array([], dtype=np.int64)
+    if transfer_category >= 0:
+        candidates = np.flatnonzero(categories == transfer_category)
+        transfers = np.asarray(columns["row"])[candidates[np.isin(descriptions[candidates], name_codes)]]
+
+    return {
+        "card_keys": card_keys,
+        "card_sums": card_sums,
+        "category_keys": category_keys,
+        "category_sums": category_sums,
+        "category_counts": category_counts,
+        "transfers": transfers,
+    }
+
+
+def analyze_shards(paths: List[str], codes: Tuple[int, np.ndarray], workers: int = 1) -> List[Dict[str, Any]]:
+    """analyze_shard по всем частям; при workers > 1 — в пуле процессов, каждому процессу коды
+    передаются один раз при запуске."""
+    if workers <= 1:
+        return [analyze_shard(path, codes) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(codes,)) as executor:
+        return list(executor.map(analyze_shard, paths))
+
+
+def _months_to_timestamps(months: np.ndarray) -> pd.DatetimeIndex:
+    return pd.DatetimeIndex(months.astype("datetime64[M]").astype("datetime64[ns]"))
+
+
+def merge_results(parts: List[Dict[str, Any]], dictionaries: Dict[str, List[str]]) -> Dict[str, Any]:
+    """Объединение частичных результатов: суммы по одинаковым ключам складываются в копейках."""
+    card_keys, (card_sums,) = _group_sums(
+        (
+            np.concatenate([part["card_keys"][:, 0] for part in parts]),
+            np.concatenate([part["card_keys"][:, 1] for part in parts]),
+        ),
+        np.concatenate([part["card_sums"] for part in parts]),
+    )
+    category_keys, (category_sums, category_counts) = _group_sums(
+        (
+            np.concatenate([part["category_keys"][:, 0] for part in parts]),
+            np.concatenate([part["category_keys"][:, 1] for part in parts]),
+        ),
+        np.concatenate([part["category_sums"] for part in parts]),
+        np.concatenate([part["category_counts"] for part in parts]),
+    )
+    cards = np.array(dictionaries["cards"], dtype=object)
+    categories = np.array(dictionaries["categories"], dtype=object)
+    card_totals = card_sums / 100
+    return {
+        "card_month_totals": pd.DataFrame(
+            {
+                "month": _months_to_timestamps(card_keys[:, 0]),
+                "card": cards[card_keys[:, 1]],
+                "total_spent": card_totals,
+                "cashback": card_totals * CASHBACK_RATE,
+            }
+        )
+        .sort_values(["month", "card"], kind="stable")
+        .reset_index(drop=True),
+        "category_month_totals": pd.DataFrame(
+            {
+                "month": _months_to_timestamps(category_keys[:, 0]),
+                "category": categories[category_keys[:, 1]],
+                "total_spent": category_sums / 100,
+                "operations": category_counts,
+            }
+        )
+        .sort_values(["month", "category"], kind="stable")
+        .reset_index(drop=True),
+        "transfers": np.sort(np.concatenate([part["transfers"] for part in parts])),
+    }
+
+
+def run_sharded(
+    df: pd.DataFrame, shards: int, workers: int = 1, by: str = "card", directory: Optional[str] = None
+) -> Dict[str, Any]:
+    """Расчет по всей истории операций частями в пуле из workers процессов.
+
+    Возвращает суммы трат и кэшбэка по месяцам и картам ("card_month_totals"), суммы и число
+    операций по месяцам и категориям ("category_month_totals") и позиции переводов физическим
+    лицам в df ("transfers"). Части передаются процессам через отображаемые в память файлы .npy
+    в directory (по умолчанию во временном каталоге); при workers=1 части считаются в текущем процессе.
+    """
+    with tempfile.TemporaryDirectory() as temporary:
+        root = directory or temporary
+        paths = write_shards(df, root, shards, by)
+        dictionaries = load_dictionaries(root)
+        parts = analyze_shards(paths, transfer_codes(dictionaries), workers)
+        logger.info(f"Обработано {len(df)} операций в {shards} частях, процессов: {workers}.")
+        return merge_results(parts, dictionaries)
+
+
+def cards_for_month(card_month_totals: pd.DataFrame, month: pd.Timestamp) -> List[Dict]:
+    """Суммы по картам за месяц в формате information_for_each_card."""
+    rows = card_month_totals[card_month_totals["month"] == month.normalize().replace(day=1)]
+    return card_summary(rows.sort_values("card"))
@@ -0,0 +1,336 @@
+import argparse
+import functools
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Pattern, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.aggregates import CASHBACK_RATE
+from src.cache import file_signature
+from src.logger import setup_logger
+from src.store import normalize_operations
+
+logger = setup_logger("sqlite_backend.log")
+
+TABLE = "operations"
+FTS_TABLE = "operations_fts"
+DATE_COLUMN = "Дата операции"
+CATEGORY_COLUMN = "Категория"
+CARD_COLUMN = "Номер карты"
+DESCRIPTION_COLUMN = "Описание"
+AMOUNT_COLUMN = "Сумма операции с округлением"
+INDEXES = {
+    "operations_date": (DATE_COLUMN,),
+    "operations_category_date": (CATEGORY_COLUMN, DATE_COLUMN),
+    "operations_card_date": (CARD_COLUMN, DATE_COLUMN),
+}
+INSERT_BATCH_SIZE = 50_000
+FTS_MIN_QUERY_LENGTH = 3
+
+
+def quote(name: str) -> str:
+    """Имя столбца SQL в кавычках."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _contains(value: Any, search_lower: str) -> bool:
+    return isinstance(value, str) and search_lower in value.lower()
+
+
+@functools.lru_cache(maxsize=32)
+def _compiled(pattern: str) -> Pattern[str]:
+    return re.compile(pattern)
+
+
+def _regexp(pattern: str, value: Any) -> bool:
+    return isinstance(value, str) and _compiled(pattern).search(value) is not None
+
+
+def _column_kind(series: pd.Series) -> str:
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "datetime"
+    if pd.api.types.is_float_dtype(series):
+        return "float"
+    if pd.api.types.is_integer_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return "integer"
+    return "text"
+
+
+def _sql_values(series: pd.Series, kind: str) -> List[Any]:
+    """Значения столбца для sqlite3: даты — целые наносекунды, пропуски — NULL."""
+    if kind == "datetime":
+        dates = pd.to_datetime(series).to_numpy(dtype="datetime64[ns]")
+        values: List[Any] = dates.view(np.int64).tolist()
+        return [None if missing else value for value, missing in zip(values, np.isnat(dates).tolist())]
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def _column_array(values: Sequence[Any], kind: str) -> np.ndarray:
+    """Массив значений столбца из строк SQLite: NULL — NaT для дат и NaN для остальных столбцов."""
+    if kind == "datetime":
+        dates = [np.iinfo(np.int64).min if value is None else value for value in values]
+        return np.array(dates, dtype=np.int64).view("datetime64[ns]")
+    array = np.array([np.nan if value is None else value for value in values], dtype=object)
+    if kind in ("float", "integer"):
+        try:
+            return array.astype("int64" if kind == "integer" and None not in values else "float64")
+        except (TypeError, ValueError):
+            return array
+    return array
+
+
+class SqliteOperations:
+    """Операции во встроенной базе SQLite для данных, которые не помещаются в память.
+
+    Операции хранятся в таблице operations в исходном порядке (столбец position), даты — целыми
+    наносекундами. Индексы по дате, по (категория, дата) и по (карта, дата) позволяют выбирать
+    операции за период без просмотра всей таблицы, для «Категория» и «Описание» строится
+    полнотекстовый индекс FTS5 с триграммным токенизатором (если SQLite его поддерживает).
+    Методы возвращают операции в том же виде, что и DataFrame хранилища, поэтому функции
+    utils, services и reports дают с этим источником те же результаты.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._changes = 0
+        connection = self._connection()
+        self.columns = [
+            name for name, _ in connection.execute("SELECT name, kind FROM columns ORDER BY number").fetchall()
+        ]
+        self._kinds = dict(connection.execute("SELECT name, kind FROM columns").fetchall())
+        self.has_fts = (
+            connection.execute("SELECT count(*) FROM sqlite_master WHERE name = ?", (FTS_TABLE,)).fetchone()[0] > 0
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Соединение текущего потока (у каждого потока свое соединение)."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.create_function("contains", 2, _contains, deterministic=True)
+            connection.create_function("regexp", 2, _regexp, deterministic=True)
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    @classmethod
+    def create(
+        cls, path: str, source: Union[str, pd.DataFrame, Iterable[pd.DataFrame]], batch_size: int = INSERT_BATCH_SIZE
+    ) -> "SqliteOperations":
+        """Создание базы по DataFrame, пачкам DataFrame или файлу операций (XLSX или CSV читается пачками,
+        поэтому файл не загружается в память целиком). Существующая база заменяется после построения."""
+        from src.streaming import iter_operation_batches
+
+        if isinstance(source, str):
+            batches: Iterable[pd.DataFrame] = iter_operation_batches(source, batch_size)
+        elif isinstance(source, pd.DataFrame):
+            batches = [source]
+        else:
+            batches = source
+        tmp_path = f"{path}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        connection = sqlite3.connect(tmp_path)
+        try:
+            kinds: Optional[Dict[str, str]] = None
+            for batch in batches:
+                batch = normalize_operations(batch)
+                if kinds is None:
+                    kinds = {str(name): _column_kind(series) for name, series in batch.items()}
+                    _create_schema(connection, kinds)
+                _insert(connection, batch, kinds)
+            if kinds is None:
+                raise ValueError("Нет операций для загрузки в базу.")
+            for name, columns in INDEXES.items():
+                if all(column in kinds for column in columns):
+                    connection.execute(
+                        f"CREATE INDEX {name} ON {TABLE} ({', '.join(quote(column) for column in columns)})"
+                    )
+            connection.commit()
+        finally:
+            connection.close()
+        os.replace(tmp_path, path)
+        logger.info("База операций построена: %s", path)
+        return cls(path)
+
+    def append(self, operations: pd.DataFrame) -> int:
+        """Добавление операций в конец таблицы (и в полнотекстовый индекс); возвращает их число."""
+        connection = self._connection()
+        with connection:
+            _insert(connection, normalize_operations(operations), self._kinds)
+        self._changes += 1
+        return len(operations)
+
+    def close(self) -> None:
+        """Закрытие соединений всех потоков."""
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections = []
+        self._local = threading.local()
+
+    @property
+    def version(self) -> Tuple[Any, ...]:
+        """Версия данных для ключей кэша отчетов: версия файла базы и число добавлений этим объектом."""
+        return ("sqlite", os.path.abspath(self.path), file_signature(self.path), self._changes)
+
+    def __len__(self) -> int:
+        # Строки только добавляются, поэтому число строк — наибольшая позиция плюс один (поиск по ключу).
+        count = self._connection().execute(f"SELECT max(position) FROM {TABLE}").fetchone()[0]
+        return 0 if count is None else int(count) + 1
+
+    def _select(self, where: str = "", params: Sequence[Any] = (), order: str = "position", limit: str = "") -> list:
+        columns = ", ".join(quote(column) for column in self.columns)
+        sql = f"SELECT {columns} FROM {TABLE} {where} ORDER BY {order} {limit}"
+        return self._connection().execute(sql, params).fetchall()
+
+    def _frame(self, rows: list) -> pd.DataFrame:
+        """DataFrame строк с типами столбцов как после normalize_operations (строковые — object)."""
+        values = list(zip(*rows)) if rows else [()] * len(self.columns)
+        return pd.DataFrame(
+            {
+                column: _column_array(column_values, self._kinds[column])
+                for column, column_values in zip(self.columns, values)
+            },
+            columns=self.columns,
+        )
+
+    def _rows(self, rows: list) -> Iterator[Dict]:
+        """Словари операций в том же виде, что и DataFrame.to_dict("records") хранилища."""
+        for row in rows:
+            record: Dict[str, Any] = {}
+            for column, value in zip(self.columns, row):
+                if value is None:
+                    record[column] = pd.NaT if self._kinds[column] == "datetime" else np.nan
+                elif self._kinds[column] == "datetime":
+                    record[column] = pd.Timestamp(value)
+                else:
+                    record[column] = value
+            yield record
+
+    def frame(self, start: Any, end: Any, category: Optional[Any] = None, card: Optional[Any] = None) -> pd.DataFrame:
+        """Операции за период [start, end] в исходном порядке с необязательным отбором по категории и карте."""
+        where = f"WHERE {quote(DATE_COLUMN)} BETWEEN ? AND ?"
+        params: List[Any] = [pd.Timestamp(start).value, pd.Timestamp(end).value]
+        if category is not None:
+            where += f" AND {quote(CATEGORY_COLUMN)} = ?"
+            params.append(category)
+        if card is not None:
+            where += f" AND {quote(CARD_COLUMN)} = ?"
+            params.append(card)
+        return self._frame(self._select(where, params))
+
+    def card_totals(self, start: Any, end: Any) -> pd.DataFrame:
+        """Траты и кэшбэк (CASHBACK_RATE от трат) по картам за период [start, end], карты упорядочены по номеру."""
+        amount = f"coalesce({quote(AMOUNT_COLUMN)}, 0)"
+        rows = (
+            self._connection()
+            .execute(
+                f"SELECT {quote(CARD_COLUMN)}, total({amount}), total({amount} * ?) FROM {TABLE} "
+                f"WHERE {quote(DATE_COLUMN)} BETWEEN ? AND ? AND {quote(CARD_COLUMN)} IS NOT NULL "
+                f"GROUP BY {quote(CARD_COLUMN)} ORDER BY {quote(CARD_COLUMN)}",
+                (CASHBACK_RATE, pd.Timestamp(start).value, pd.Timestamp(end).value),
+            )
+            .fetchall()
+        )
+        return pd.DataFrame(rows, columns=["card", "total_spent", "cashback"]).astype(
+            {"total_spent": "float64", "cashback": "float64"}
+        )
+
+    def top(self, start: Any, end: Any, n: int, by: str = AMOUNT_COLUMN) -> pd.DataFrame:
+        """n операций с наибольшими значениями столбца by за период [start, end]; при равенстве раньше
+        идет операция с меньшей позицией, пропуски не учитываются."""
+        if by not in self._kinds:
+            raise KeyError(by)
+        where = f"WHERE {quote(DATE_COLUMN)} BETWEEN ? AND ? AND {quote(by)} IS NOT NULL"
+        params = [pd.Timestamp(start).value, pd.Timestamp(end).value, max(n, 0)]
+        return self._frame(self._select(where, params, order=f"{quote(by)} DESC, position", limit="LIMIT ?"))
+
+    def search(self, search_str: str) -> Iterator[Dict]:
+        """Операции, в которых «Категория» или «Описание» содержит search_str без учета регистра.
+        Кандидаты выбираются полнотекстовым индексом, совпадение проверяется так же, как в simple_search."""
+        search_lower = search_str.lower()
+        condition = (
+            f"(contains({quote(CATEGORY_COLUMN)}, ?) OR contains({quote(DESCRIPTION_COLUMN)}, ?))"
+            if DESCRIPTION_COLUMN in self._kinds and CATEGORY_COLUMN in self._kinds
+            else f"contains({quote(DESCRIPTION_COLUMN if DESCRIPTION_COLUMN in self._kinds else CATEGORY_COLUMN)}, ?)"
+        )
+        params: List[Any] = [search_lower] * condition.count("?")
+        if self.has_fts and len(search_lower) >= FTS_MIN_QUERY_LENGTH:
+            where = f"WHERE position IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?) AND {condition}"
+            params.insert(0, '"' + search_lower.replace('"', '""') + '"')
+        else:
+            where = f"WHERE {condition}"
+        return self._rows(self._select(where, params))
+
+    def physical_transfers(self, pattern: Pattern[str]) -> Iterator[Dict]:
+        """Операции категории «Переводы», описание которых соответствует регулярному выражению pattern."""
+        if DESCRIPTION_COLUMN not in self._kinds:
+            return iter(())
+        where = f"WHERE {quote(CATEGORY_COLUMN)} = ? AND regexp(?, {quote(DESCRIPTION_COLUMN)})"
+        return self._rows(self._select(where, ["Переводы", pattern.pattern]))
+
+
+def _create_schema(connection: sqlite3.Connection, kinds: Dict[str, str]) -> None:
+    # Столбцы без объявленного типа хранят значения без преобразования (строки остаются строками).
+    columns = ", ".join(quote(column) for column in kinds)
+    connection.execute(f"CREATE TABLE {TABLE} (position INTEGER PRIMARY KEY, {columns})")
+    connection.execute("CREATE TABLE columns (number INTEGER PRIMARY KEY, name TEXT, kind TEXT)")
+    connection.executemany(
+        "INSERT INTO columns (number, name, kind) VALUES (?, ?, ?)",
+        [(number, column, kind) for number, (column, kind) in enumerate(kinds.items())],
+    )
+    if CATEGORY_COLUMN in kinds or DESCRIPTION_COLUMN in kinds:
+        try:
+            connection.execute(
+                f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(category, description, content='', tokenize='trigram')"
+            )
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Полнотекстовый индекс недоступен, поиск просматривает таблицу: {e}")
+
+
+def _insert(connection: sqlite3.Connection, batch: pd.DataFrame, kinds: Dict[str, str]) -> None:
+    """Добавление пачки операций в таблицу и в полнотекстовый индекс."""
+    first = connection.execute(f"SELECT coalesce(max(position) + 1, 0) FROM {TABLE}").fetchone()[0]
+    positions = list(range(first, first + len(batch)))
+    values = [
+        _sql_values(batch[column], kind) if column in batch.columns else [None] * len(batch)
+        for column, kind in kinds.items()
+    ]
+    placeholders = ", ".join("?" * (len(kinds) + 1))
+    connection.executemany(f"INSERT INTO {TABLE} VALUES ({placeholders})", zip(positions, *values))
+    if connection.execute("SELECT count(*) FROM sqlite_master WHERE name = ?", (FTS_TABLE,)).fetchone()[0]:
+        texts = [
+            _sql_values(batch[column], "text") if column in batch.columns else [None] * len(batch)
+            for column in (CATEGORY_COLUMN, DESCRIPTION_COLUMN)
+        ]
+        connection.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, category, description) VALUES (?, ?, ?)", zip(positions, *texts)
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> Any:
+    """Командная строка: python -m src.sqlite_backend build <путь к operations.xlsx> <путь к базе>."""
+    parser = argparse.ArgumentParser(prog="python -m src.sqlite_backend", description="База операций SQLite")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="построить базу по файлу операций")
+    build.add_argument("source")
+    build.add_argument("path")
+    build.add_argument("--batch-size", type=int, default=INSERT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    operations = SqliteOperations.create(args.path, args.source, args.batch_size)
+    print(f"База построена: {args.path}, операций: {len(operations)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,367 @@
+import os
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.aggregates import CardDailyAggregates, MonthlyTopTransactions
+from src.cache import append_journal, file_signature, load_cache, load_journal, save_cache
+from src.logger import setup_logger
+from src.metrics import METRICS
+from src.query import OperationsQuery
+from src.records import OperationRecords
+from src.search_index import FuzzyIndex, SearchIndex
+
+logger = setup_logger("store.log")
+
+path_excel_file = "/Users/anastasiaandreeva/Project_1_banking_transaction_analysis_application/data/operations.xlsx"
+
+DATE_FORMAT = "%d.%m.%Y %H:%M:%S"
+DATE_LENGTH = 19
+DATE_SEPARATORS = [2, 5, 10, 13, 16]
+DATE_SEPARATOR_CODES = [ord(char) for char in ".. ::"]
+DATE_DIGITS = [position for position in range(DATE_LENGTH) if position not in DATE_SEPARATORS]
+DATE_PARSE_CHUNK_SIZE = 200_000
+AMOUNT_COLUMNS = [
+    "Сумма операции",
+    "Сумма платежа",
+    "Кэшбэк",
+    "Бонусы (включая кэшбэк)",
+    "Округление на инвесткопилку",
+    "Сумма операции с округлением",
+]
+
+
+def _parse_fixed_dates(values: np.ndarray) -> Optional[np.ndarray]:
+    """Разбор строк вида ДД.ММ.ГГГГ ЧЧ:ММ:СС арифметикой над кодами символов (без strptime для
+    каждой строки); None, если хотя бы одно значение не в этом виде."""
+    try:
+        # Лишний символ ширины показывает строки длиннее формата, которые иначе были бы обрезаны.
+        text = np.asarray(values, dtype=f"U{DATE_LENGTH + 1}")
+    except (ValueError, TypeError):
+        return None
+    codes = text.view(np.uint32).reshape(len(text), DATE_LENGTH + 1).astype(np.int32)
+    if codes[:, DATE_LENGTH].any() or (codes[:, DATE_SEPARATORS] != DATE_SEPARATOR_CODES).any():
+        return None
+    digits = codes[:, DATE_DIGITS] - ord("0")
+    if ((digits < 0) | (digits > 9)).any():
+        return None
+
+    def number(first: int, last: int) -> np.ndarray:
+        result = np.zeros(len(codes), dtype=np.int64)
+        for position in range(first, last + 1):
+            result = result * 10 + (codes[:, position] - ord("0"))
+        return result
+
+    day, month, year = number(0, 1), number(3, 4), number(6, 9)
+    hour, minute, second = number(11, 12), number(14, 15), number(17, 18)
+    if ((month < 1) | (month > 12) | (day < 1) | (hour > 23) | (minute > 59) | (second > 59)).any():
+        return None
+    months = ((year - 1970) * 12 + month - 1).astype("datetime64[M]")
+    days = months.astype("datetime64[D]") + (day - 1).astype("timedelta64[D]")
+    if (days.astype("datetime64[M]") != months).any():
+        return None
+    seconds = (hour * 3600 + minute * 60 + second).astype("timedelta64[s]")
+    parsed: np.ndarray = (days + seconds).astype("datetime64[ns]")
+    return parsed
+
+
+def parse_operation_dates(values: pd.Series) -> pd.Series:
+    """Разбор дат операций в datetime64 по формату выгрузки DATE_FORMAT: строки фиксированной длины
+    разбираются векторно пачками по DATE_PARSE_CHUNK_SIZE, иначе — pd.to_datetime с форматом;
+    значения в другом виде разбираются как ДД.ММ.ГГГГ."""
+    raw = values.to_numpy()
+    parts = []
+    for start in range(0, len(raw), DATE_PARSE_CHUNK_SIZE):
+        end = start + DATE_PARSE_CHUNK_SIZE
+        part = _parse_fixed_dates(raw[start:end])
+        if part is None:
+            break
+        parts.append(part)
+    else:
+        parsed = np.concatenate(parts) if parts else np.array([], dtype="datetime64[ns]")
+        return pd.Series(parsed, index=values.index, name=values.name)
+    try:
+        return pd.to_datetime(values, format=DATE_FORMAT)
+    except (ValueError, TypeError):
+        return pd.to_datetime(values, dayfirst=True)
+
+
+def normalize_operations(df: pd.DataFrame) -> pd.DataFrame:
+    """Приведение типов столбцов операций: даты, суммы и категории.
+    Исходный DataFrame не изменяется и не копируется: результат — новый DataFrame, в котором
+    заменены только столбцы, требующие приведения, остальные столбцы общие с исходным."""
+    df = df.copy(deep=False)
+    if "Дата операции" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["Дата операции"]):
+        df["Дата операции"] = parse_operation_dates(df["Дата операции"])
+    for column in AMOUNT_COLUMNS:
+        if column in df.columns and df[column].dtype != "float64":
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype("float64")
+    if "Категория" in df.columns and not isinstance(df["Категория"].dtype, pd.CategoricalDtype):
+        df["Категория"] = df["Категория"].astype("category")
+    return df
+
+
+def conform_operations(new: pd.DataFrame, base: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Приведение новых операций к столбцам и типам base для pd.concat: столбцы упорядочиваются как
+    в base, числа и даты разбираются, категории base дополняются новыми значениями (base не изменяется,
+    возвращается вместе с новыми операциями)."""
+    new = normalize_operations(new.reindex(columns=base.columns))
+    base = base.copy(deep=False)
+    for column, dtype in base.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            values = new[column].astype(object)
+            extra = pd.Index(values.dropna().unique()).difference(dtype.categories)
+            if len(extra):
+                base[column] = base[column].cat.add_categories(extra)
+            new[column] = pd.Categorical(values, categories=base[column].cat.categories)
+        elif pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_numeric_dtype(new[column].dtype):
+            new[column] = pd.to_numeric(new[column], errors="coerce")
+    return base, new
+
+
+def json_default(value: Any) -> Any:
+    """Сериализация в JSON значений, которых нет в стандартном модуле json (даты операций)."""
+    if isinstance(value, datetime):
+        return value.strftime(DATE_FORMAT)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class TransactionStore:
+    """Общее для процесса хранилище операций из Excel.
+
+    Файл читается один раз, типы столбцов приводятся один раз, повторное чтение
+    происходит только при изменении времени модификации или размера файла.
+    При use_cache=True нормализованные данные сохраняются в колоночный кэш рядом
+    с файлом, и следующие процессы читают кэш вместо разбора Excel.
+    """
+
+    def __init__(self, path: str, use_cache: bool = True) -> None:
+        self.path = path
+        self.use_cache = use_cache
+        self._lock = threading.Lock()
+        self._signature: Optional[Tuple[int, int]] = None
+        self._df: Optional[pd.DataFrame] = None
+        self._records: Optional[List[Dict]] = None
+        self._derived: Dict[str, Any] = {}
+        self._appended = 0
+
+    def _load(self, signature: Tuple[int, int]) -> pd.DataFrame:
+        df = self._load_file(signature)
+        self._appended = 0
+        journal = load_journal(self.path, signature)
+        if journal is not None and len(journal):
+            logger.info("Из журнала добавлено операций: %d", len(journal))
+            base, new = conform_operations(journal, df)
+            df = pd.concat([base, new], ignore_index=True)
+            self._appended = len(new)
+        return df
+
+    def _load_file(self, signature: Tuple[int, int]) -> pd.DataFrame:
+        if self.use_cache:
+            df = load_cache(self.path, signature)
+            if df is not None:
+                return df
+        logger.info("Чтение данных из %s", self.path)
+        with METRICS.measure("store_read_excel") as measurement:
+            measurement.bytes_read = os.path.getsize(self.path)
+            df = normalize_operations(pd.read_excel(self.path))
+            measurement.rows_out = len(df)
+        if self.use_cache:
+            save_cache(self.path, signature, df)
+        return df
+
+    def get_dataframe(self) -> pd.DataFrame:
+        """Возвращает DataFrame операций, перечитывая файл только при его изменении."""
+        signature = file_signature(self.path)
+        with self._lock:
+            if self._df is None or signature != self._signature:
+                self._df = self._load(signature)
+                self._records = None
+                self._derived = {}
+                self._signature = signature
+            return self._df
+
+    def get_records(self) -> List[Dict]:
+        """Возвращает операции в виде списка словарей (строится один раз на версию файла)."""
+        while True:
+            df = self.get_dataframe()
+            with self._lock:
+                if self._df is not df:
+                    continue  # данные заменены (append, перечитывание файла) после get_dataframe
+                if self._records is None:
+                    self._records = df.to_dict(orient="records")
+                return self._records
+
+    def get_operation_records(self) -> OperationRecords:
+        """Операции в компактном виде OperationRecords (строится один раз на версию файла)."""
+        records: OperationRecords = self.get_derived("operation_records", OperationRecords.from_dataframe)
+        return records
+
+    def get_derived(self, name: str, builder: Callable[[pd.DataFrame], Any]) -> Any:
+        """Возвращает производную структуру (индекс, агрегаты), построенную один раз на версию файла.
+        Структура строится и сохраняется под той же блокировкой, под которой проверяется, что DataFrame
+        не был заменен, поэтому структура по старой версии данных не сохраняется для новой."""
+        while True:
+            df = self.get_dataframe()
+            with self._lock:
+                if self._df is not df:
+                    continue  # данные заменены (append, перечитывание файла) после get_dataframe
+                if name not in self._derived:
+                    self._derived[name] = builder(df)
+                return self._derived[name]
+
+    def get_search_index(self) -> SearchIndex:
+        """Индекс для simple_search по текущей версии данных."""
+        index: SearchIndex = self.get_derived("search_index", SearchIndex.from_dataframe)
+        return index
+
+    def get_fuzzy_index(self) -> FuzzyIndex:
+        """Индекс нечеткого поиска по описаниям по текущей версии данных."""
+        index: FuzzyIndex = self.get_derived("fuzzy_index", FuzzyIndex.from_dataframe)
+        return index
+
+    def get_card_aggregates(self) -> CardDailyAggregates:
+        """Дневные суммы по картам для information_for_each_card по текущей версии данных."""
+        aggregates: CardDailyAggregates = self.get_derived("card_aggregates", CardDailyAggregates.from_dataframe)
+        return aggregates
+
+    def get_query(self) -> OperationsQuery:
+        """Индекс операций по дате (и по категории и карте) для запросов за период."""
+        query: OperationsQuery = self.get_derived("query", OperationsQuery)
+        return query
+
+    def get_top_transactions(self) -> MonthlyTopTransactions:
+        """Выбор топ-N операций за период по текущей версии данных."""
+        query = self.get_query()
+        top: MonthlyTopTransactions = self.get_derived(
+            "top_transactions", lambda df: MonthlyTopTransactions(df, query if query.df is df else None)
+        )
+        return top
+
+    def append(self, operations: Union[pd.DataFrame, Dict, List[Dict]], persist: bool = True) -> int:
+        """Добавление новых операций (DataFrame, словарь одной операции или список словарей) без
+        перечитывания файла; возвращает число добавленных операций.
+
+        Индексы и агрегаты, которые уже построены, дополняются только новыми операциями (затронутые
+        дни карт, месяцы топ-N, новые строки поиска), остальные производные структуры строятся заново
+        при следующем обращении. Версия данных (signature) меняется, поэтому кэш отчетов не выдает
+        результаты по старым данным. При persist=True операции дописываются в журнал рядом с файлом
+        и добавляются при следующей загрузке этой версии файла.
+        """
+        new = pd.DataFrame([operations] if isinstance(operations, dict) else operations)
+        if new.empty:
+            return 0
+        self.get_dataframe()
+        with self._lock:
+            df = self._df
+            if df is None or self._signature is None:
+                raise RuntimeError("Данные хранилища не загружены.")
+            base, new = conform_operations(new, df)
+            if persist:
+                append_journal(self.path, self._signature, new)
+            start = len(base)
+            combined = pd.concat([base, new], ignore_index=True)
+            self._derived = self._extend_derived(combined, start)
+            if self._records is not None:
+                self._records = self._records + new.to_dict(orient="records")
+            self._df = combined
+            self._appended += len(new)
+        logger.info("Добавлено операций: %d", len(new))
+        return len(new)
+
+    def _extend_derived(self, df: pd.DataFrame, start: int) -> Dict[str, Any]:
+        """Производные структуры для df, в котором строки с позиции start новые."""
+        query = self._derived.get("query")
+        extended_query = query.extended(df, start) if isinstance(query, OperationsQuery) else None
+        derived: Dict[str, Any] = {}
+        for name, value in self._derived.items():
+            if value is query and extended_query is not None:
+                derived[name] = extended_query
+            elif isinstance(value, MonthlyTopTransactions):
+                derived[name] = value.extended(df, start, extended_query)
+            elif hasattr(value, "extended"):
+                derived[name] = value.extended(df, start)
+        return derived
+
+    def append_export(self, path: str, persist: bool = True) -> int:
+        """Добавление операций из более новой выгрузки: добавляются только строки, которых еще нет
+        в хранилище (сравниваются все столбцы; одинаковые операции учитываются по количеству)."""
+        export = pd.read_excel(path)
+        df = self.get_dataframe()
+        base, new = conform_operations(export, df)
+        return self.append(new[~_row_keys(new).isin(_row_keys(base))], persist)
+
+    @property
+    def signature(self) -> Optional[Tuple[int, ...]]:
+        """Версия данных: время модификации и размер загруженного файла и число добавленных
+        операций или None, если данные не загружены."""
+        if self._signature is None:
+            return None
+        return self._signature + (self._appended,)
+
+    def owns(self, df: pd.DataFrame) -> bool:
+        """True, если df — загруженный этим хранилищем DataFrame."""
+        with self._lock:
+            return self._df is df
+
+    def clear(self) -> None:
+        """Сбрасывает загруженные данные."""
+        with self._lock:
+            self._df = None
+            self._records = None
+            self._derived = {}
+            self._signature = None
+            self._appended = 0
+
+
+def _row_keys(df: pd.DataFrame) -> pd.MultiIndex:
+    """Ключи строк для сравнения выгрузок: хэш значений строки и номер повтора такой же строки."""
+    hashes = pd.util.hash_pandas_object(df, index=False)
+    return pd.MultiIndex.from_arrays([hashes.to_numpy(), hashes.groupby(hashes).cumcount().to_numpy()])
+
+
+_stores: Dict[str, TransactionStore] = {}
+_stores_lock = threading.Lock()
+
+
+def set_default_path(path: str) -> None:
+    """Путь к файлу операций, который используется get_store() без аргументов."""
+    global path_excel_file
+    path_excel_file = path
+
+
+def get_store(path: Optional[str] = None) -> TransactionStore:
+    """Возвращает общее для процесса хранилище для указанного файла."""
+    path = path or path_excel_file
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = TransactionStore(path)
+        return _stores[path]
+
+
+def store_for(df: pd.DataFrame) -> Optional[TransactionStore]:
+    """Хранилище, загрузившее df, или None для DataFrame, созданного вне хранилищ."""
+    with _stores_lock:
+        stores = list(_stores.values())
+    for store in stores:
+        if store.owns(df):
+            return store
+    return None
+
+
+def store_for_path(path: str) -> Optional[TransactionStore]:
+    """Хранилище, созданное для файла path, или None, если файл не загружался хранилищем."""
+    with _stores_lock:
+        return _stores.get(path)
+
+
+def query_for(df: pd.DataFrame) -> OperationsQuery:
+    """Индекс для запросов за период по df: общий индекс хранилища, если df загружен хранилищем,
+    иначе индекс строится по переданному DataFrame."""
+    store = store_for(df)
+    if store is not None:
+        return store.get_query()
+    return OperationsQuery(df)
@@ -0,0 +1,162 @@
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src.aggregates import CASHBACK_RATE, card_summary, largest_positions
+from src.logger import setup_logger
+from src.reports import SPENDING_PERIOD, format_datetimes, report_date
+from src.store import normalize_operations
+from src.utils import transactions_summary, window_start
+
+logger = setup_logger("streaming.log")
+
+BATCH_SIZE = 50_000
+XLSX_EXTENSIONS = (".xlsx", ".xlsm")
+CSV_EXTENSIONS = (".csv", ".txt")
+
+
+def iter_xlsx_batches(path: str, batch_size: int = BATCH_SIZE, sheet: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """Чтение XLSX пачками по batch_size строк (openpyxl в режиме read-only), типы приводятся в каждой пачке."""
+    from openpyxl import load_workbook  # type: ignore[import-untyped]
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet is not None else workbook.worksheets[0]
+        rows = worksheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(name) for name in header]
+        batch: List[Any] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield normalize_operations(pd.DataFrame(batch, columns=columns))
+                batch = []
+        if batch:
+            yield normalize_operations(pd.DataFrame(batch, columns=columns))
+    finally:
+        workbook.close()
+
+
+def iter_csv_batches(path: str, batch_size: int = BATCH_SIZE, **read_csv_kwargs: Any) -> Iterator[pd.DataFrame]:
+    """Чтение CSV-выгрузки пачками по batch_size строк (read_csv с chunksize), типы приводятся в каждой пачке.
+    Параметры формата (sep, decimal, encoding) передаются в read_csv."""
+    with pd.read_csv(path, chunksize=batch_size, **read_csv_kwargs) as reader:
+        for chunk in reader:
+            yield normalize_operations(chunk)
+
+
+def iter_operation_batches(path: str, batch_size: int = BATCH_SIZE, **kwargs: Any) -> Iterator[pd.DataFrame]:
+    """Пачки операций из XLSX или CSV в зависимости от расширения файла."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in XLSX_EXTENSIONS:
+        return iter_xlsx_batches(path, batch_size, **kwargs)
+    if extension in CSV_EXTENSIONS:
+        return iter_csv_batches(path, batch_size, **kwargs)
+    raise ValueError(f"Неподдерживаемый формат файла операций: {extension}")
+
+
+def _in_period(batch: pd.DataFrame, start: Any, end: Any) -> np.ndarray:
+    dates = batch["Дата операции"]
+    mask: np.ndarray = ((dates >= start) & (dates <= end)).to_numpy()
+    return mask
+
+
+class CardSpendingAccumulator:
+    """Траты и кэшбэк по картам с первого числа месяца до data_time по пачкам операций
+    (результат как у information_for_each_card)."""
+
+    def __init__(self, data_time: pd.Timestamp) -> None:
+        self.start = data_time.replace(day=1)
+        self.end = data_time
+        self._totals: Optional[pd.DataFrame] = None
+
+    def add(self, batch: pd.DataFrame) -> None:
+        """Учет пачки операций."""
+        window = batch[_in_period(batch, self.start, self.end) & batch["Номер карты"].notna().to_numpy()]
+        if window.empty:
+            return
+        spent = window["Сумма операции с округлением"].fillna(0).to_numpy(dtype="float64")
+        sums = (
+            pd.DataFrame(
+                {"card": window["Номер карты"].to_numpy(), "total_spent": spent, "cashback": spent * CASHBACK_RATE}
+            )
+            .groupby("card")
+            .sum()
+        )
+        self._totals = sums if self._totals is None else self._totals.add(sums, fill_value=0)
+
+    def result(self) -> List[Dict]:
+        """Суммы по картам, упорядоченные по убыванию трат."""
+        if self._totals is None:
+            return []
+        return card_summary(self._totals.sort_index().reset_index())
+
+
+class CategorySpendingAccumulator:
+    """Операции категории за 3 месяца до даты по пачкам операций (результат как у spending_by_category)."""
+
+    def __init__(self, category: str, date: Any = None) -> None:
+        self.category = category
+        self.end = report_date(date)
+        self.start = self.end - SPENDING_PERIOD
+        self._parts: List[pd.DataFrame] = []
+
+    def add(self, batch: pd.DataFrame) -> None:
+        """Учет пачки операций."""
+        window = batch[_in_period(batch, self.start, self.end) & (batch["Категория"] == self.category).to_numpy()]
+        if not window.empty:
+            self._parts.append(window)
+
+    def result(self) -> List[Dict]:
+        """Операции категории за период в порядке чтения."""
+        if not self._parts:
+            return []
+        records: List[Dict] = format_datetimes(pd.concat(self._parts, ignore_index=True)).to_dict("records")
+        return records
+
+
+class TopNAccumulator:
+    """Топ-N операций по столбцу by за период по пачкам операций (результат как у top_n_transactions).
+    Между пачками хранится не более n строк-кандидатов."""
+
+    def __init__(
+        self,
+        data_time: pd.Timestamp,
+        n: int = 5,
+        by: str = "Сумма операции с округлением",
+        window: Union[str, int] = "month",
+    ) -> None:
+        self.start = window_start(data_time, window)
+        self.end = data_time
+        self.n = n
+        self.by = by
+        self._rows_seen = 0
+        self._top: Optional[pd.DataFrame] = None
+
+    def add(self, batch: pd.DataFrame) -> None:
+        """Учет пачки операций."""
+        positions = np.flatnonzero(_in_period(batch, self.start, self.end))
+        window = batch.iloc[positions].set_index(positions + self._rows_seen)
+        self._rows_seen += len(batch)
+        candidates = window if self._top is None else pd.concat([self._top, window])
+        top = largest_positions(candidates.index.to_numpy(), candidates[self.by].to_numpy(dtype="float64"), self.n)
+        self._top = candidates.loc[top]
+
+    def result(self) -> List[Dict]:
+        """Топ-N операций по убыванию значения by."""
+        if self._top is None:
+            return []
+        return transactions_summary(self._top)
+
+
+def consume(batches: Iterable[pd.DataFrame], accumulators: Iterable[Any]) -> None:
+    """Передача каждой пачки всем накопителям за один проход по данным."""
+    accumulators = list(accumulators)
+    for number, batch in enumerate(batches, start=1):
+        for accumulator in accumulators:
+            accumulator.add(batch)
+        logger.debug("Обработана пачка %d: %d операций.", number, len(batch))
@@ -1,28 +1,49 @@
 import json
-import logging
 import os
 from datetime import datetime
-from typing import Any
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Union
 
 import pandas as pd
-import requests
 from dotenv import load_dotenv
 
-load_dotenv()
-API_KEY_CURRENCY = os.getenv("API_KEY_CURRENCY")
-API_KEY_SP_500 = os.getenv("API_KEY_SP_500")
+from src import quotes
+from src.aggregates import card_summary
+from src.cashback import CashbackRules
+from src.logger import setup_logger
+from src.metrics import file_size, first_argument, instrumented
+from src.query import OperationsQuery
+from src.quotes import get_quote_fetcher
+from src.sqlite_backend import SqliteOperations
+from src.store import get_store
 
-logger = logging.getLogger("utils.log")
-file_handler = logging.FileHandler("../logs/utils.log", "w", encoding="utf-8")
-file_formatter = logging.Formatter("%(asctime)s %(levelname)s: %(message)s")
-file_handler.setFormatter(file_formatter)
-logger.addHandler(file_handler)
-logger.setLevel(logging.DEBUG)
+logger = setup_logger("utils.log")
 
+path_user_settings = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "user_settings.json")
 
+
+@lru_cache(maxsize=None)
+def _load_env() -> bool:
+    return load_dotenv()
+
+
+def get_api_key(name: str) -> Optional[str]:
+    """API-ключ из переменных окружения, файл .env читается при первом обращении."""
+    _load_env()
+    return os.getenv(name)
+
+
+def load_user_settings() -> Any:
+    """Чтение пользовательских настроек из user_settings.json."""
+    logger.info("Чтение данных из user_settings.json.")
+    with open(path_user_settings, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@instrumented(bytes_read=first_argument(file_size))
 def read_excel(path_excel: str) -> Any:
     """Функция для считывания финансовых операций из Excel."""
-    logger.info("Начало работы функции read_excel.")
+    logger.debug("Начало работы функции read_excel.")
     logger.info("Чтение данных из operations.xlsx")
     try:
         reader_excel_file = (pd.read_excel(path_excel)).to_dict(orient="records")
@@ -32,16 +53,16 @@ def read_excel(path_excel: str) -> Any:
         logger.error(f"Произошла ошибка в функции read_excel: {e}")
         return f"Произошла ошибка: {e}"
     finally:
-        logger.info("Завершение работы функции read_excel.")
+        logger.debug("Завершение работы функции read_excel.")
 
 
-path_excel_file = "/Users/anastasiaandreeva/Project_1_banking_transaction_analysis_application/data/operations.xlsx"
 # print(read_excel(path_excel_file))
 
 
+@instrumented(rows_out=None)
 def welcome_function() -> str | Any:
     """Функция приветствия."""
-    logger.info("Начало работы функции greeting.")
+    logger.debug("Начало работы функции greeting.")
     try:
         current_date_time = datetime.now()
         hour = current_date_time.hour
@@ -58,41 +79,36 @@ def welcome_function() -> str | Any:
         logger.error(f"Произошла ошибка в функции welcome_function: {e}")
         return {e}
     finally:
-        logger.info("Завершение работы функции welcome_function.")
+        logger.debug("Завершение работы функции welcome_function.")
 
 
 # print(welcome_function())
 
 
-def information_for_each_card(data_time: pd.Timestamp) -> Any:
-    """Функция информации по каждой карте."""
-    logger.info("Начало работы функции information_for_each_card.")
+@instrumented()
+def information_for_each_card(
+    data_time: pd.Timestamp, rules: Optional[CashbackRules] = None, backend: Optional[SqliteOperations] = None
+) -> Any:
+    """Функция информации по каждой карте.
+    Без rules кэшбэк — CASHBACK_RATE от трат, с rules — по набору правил кэшбэка (модуль cashback).
+    При переданном backend операции выбираются из базы SqliteOperations вместо хранилища."""
+    logger.debug("Начало работы функции information_for_each_card.")
     try:
-        logger.info("Чтение данных из operations.xlsx")
-        df = pd.read_excel(path_excel_file)
-        df["Дата операции"] = pd.to_datetime(df["Дата операции"], dayfirst=True)
-        start_date = data_time.replace(day=1)
-        end_date = data_time
-
-        df_filtered = df[(df["Дата операции"] >= start_date) & (df["Дата операции"] <= end_date)].copy()
-
-        df_filtered["кэшбек"] = df_filtered["Сумма операции с округлением"] * 0.01
-
-        grouped = (
-            df_filtered.groupby("Номер карты")
-            .agg(total_spent=("Сумма операции с округлением", "sum"), cashback=("кэшбек", "sum"))
-            .reset_index()
-        )
-
-        grouped["last_digits"] = grouped["Номер карты"].astype(str).str[-4:]
-
-        result_df = grouped.sort_values(by="total_spent", ascending=False)
-
-        result = result_df[["last_digits", "total_spent", "cashback"]].to_dict("records")
-
-        for item in result:
-            item["total_spent"] = round(item["total_spent"], 2)
-            item["cashback"] = round(item["cashback"], 2)
+        if backend is not None:
+            month_start = data_time.replace(day=1)
+            if rules is not None:
+                month = backend.frame(month_start.normalize(), data_time)
+                result = rules.month_to_date(OperationsQuery(month), data_time)
+            else:
+                result = card_summary(backend.card_totals(month_start, data_time))
+            logger.info("Данные в виде списка словарей.")
+            return result
+
+        store = get_store()
+        if rules is not None:
+            result = rules.month_to_date(store.get_query(), data_time)
+        else:
+            result = store.get_card_aggregates().month_to_date(data_time)
 
         logger.info("Данные в виде списка словарей.")
         return result
@@ -100,110 +116,117 @@ def information_for_each_card(data_time: pd.Timestamp) -> Any:
         logger.error(f"Произошла ошибка в функции information_for_each_card: {e}")
         return f"{e}"
     finally:
-        logger.info("Завершение работы функции information_for_each_card.")
+        logger.debug("Завершение работы функции information_for_each_card.")
 
 
 # print(information_for_each_card(pd.to_datetime('29-09-2018 00:00:00', dayfirst=True)))
 
 
-def top_five_transactions(data_time: pd.Timestamp) -> Any:
-    """Топ-5 транзакций по сумме платежа."""
-    logger.info("Начало работы функции top_five_transactions.")
+def window_start(data_time: pd.Timestamp, window: Union[str, int]) -> pd.Timestamp:
+    """Начало периода, который заканчивается в data_time: "month" — с первого числа месяца,
+    "year" — с начала года, число — за столько дней до data_time."""
+    if window == "month":
+        return data_time.replace(day=1)
+    if window == "year":
+        return data_time.replace(month=1, day=1)
+    if isinstance(window, int):
+        return data_time - pd.Timedelta(days=window)
+    raise ValueError(f"Некорректный период: {window}")
+
+
+def transactions_summary(rows: pd.DataFrame) -> List[Dict]:
+    """Операции в формате топа транзакций: дата, сумма, категория и описание."""
+    return [
+        {"date": date, "amount": round(amount, 2), "category": category, "description": description}
+        for date, amount, category, description in zip(
+            rows["Дата операции"].dt.strftime("%d.%m.%Y"),
+            rows["Сумма операции с округлением"].tolist(),
+            rows["Категория"].tolist(),
+            rows["Описание"].tolist(),
+        )
+    ]
+
+
+@instrumented()
+def top_n_transactions(
+    data_time: pd.Timestamp,
+    n: int = 5,
+    by: str = "Сумма операции с округлением",
+    window: Union[str, int] = "month",
+    backend: Optional[SqliteOperations] = None,
+) -> Any:
+    """Топ-N транзакций по значению столбца by за период window, который заканчивается в data_time
+    (из базы SqliteOperations, если передан backend)."""
+    logger.debug("Начало работы функции top_n_transactions.")
     try:
-        logger.info("Чтение данных из operations.xlsx")
-        df = pd.read_excel(path_excel_file)
-
-        df["Дата операции"] = pd.to_datetime(df["Дата операции"], format="%d.%m.%Y %H:%M:%S", dayfirst=True)
-
-        start_date = data_time.replace(day=1)
-        end_date = data_time
-
-        filtered_df = df[(df["Дата операции"] >= start_date) & (df["Дата операции"] <= end_date)].copy()
-
-        top_transactions = filtered_df.sort_values(by="Сумма операции с округлением", ascending=False).head(5)
+        if backend is not None:
+            rows = backend.top(window_start(data_time, window), data_time, n, by)
+        else:
+            top = get_store().get_top_transactions()
+            rows = top.df.iloc[top.top_positions(window_start(data_time, window), data_time, n, by)]
 
-        result = top_transactions.apply(
-            lambda row: {
-                "date": row["Дата операции"].strftime("%d.%m.%Y"),
-                "amount": round(row["Сумма операции с округлением"], 2),
-                "category": row["Категория"],
-                "description": row["Описание"],
-            },
-            axis=1,
-        ).tolist()
+        result = transactions_summary(rows)
 
         logger.info("Данные в виде списка словарей.")
         return result
     except Exception as e:
-        logger.error(f"Произошла ошибка в функции top_five_transactions: {e}")
+        logger.error(f"Произошла ошибка в функции top_n_transactions: {e}")
         return {e}
     finally:
-        logger.info("Завершение работы функции top_five_transactions.")
+        logger.debug("Завершение работы функции top_n_transactions.")
+
+
+def top_five_transactions(data_time: pd.Timestamp, backend: Optional[SqliteOperations] = None) -> Any:
+    """Топ-5 транзакций по сумме платежа."""
+    return top_n_transactions(data_time, 5, backend=backend)
 
 
 # print(top_five_transactions(pd.to_datetime('29.09.2020', dayfirst=True)))
 
 
+@instrumented()
 def get_currency_data() -> Any:
     """Функция для получения курсов валют."""
-    logger.info("Начало работы функции get_currency_data.")
+    logger.debug("Начало работы функции get_currency_data.")
     try:
         result = []
-        path_json_file = (
-            "/Users/anastasiaandreeva/Project_1_banking_transaction_analysis_application/user_settings.json"
-        )
-        logger.info("Чтение данных из user_settings.json.")
-        with open(path_json_file, "r", encoding="utf=8") as f:
-            data = (json.load(f)).get("user_currencies")
-            for user_currencies in data:
-                url = f"https://v6.exchangerate-api.com/v6/{API_KEY_CURRENCY}/latest/{user_currencies}"
-                response = requests.get(url)
-                if response.status_code == 200:
-                    response.json()
-                    result.append(
-                        {"currency": user_currencies, "rate": round(response.json()["conversion_rates"]["RUB"], 2)}
-                    )
+        data = load_user_settings().get("user_currencies")
+        api_key = get_api_key("API_KEY_CURRENCY")
+        urls = [quotes.CURRENCY_URL.format(api_key=api_key, currency=currency) for currency in data]
+        for user_currencies, response in zip(data, get_quote_fetcher().fetch_json(urls)):
+            if response is not None:
+                result.append({"currency": user_currencies, "rate": round(response["conversion_rates"]["RUB"], 2)})
         logger.info("Данные в виде списка словарей.")
         return result
     except Exception as e:
         logger.error(f"Произошла ошибка: {e}")
         return f"Произошла ошибка: {e}"
     finally:
-        logger.info("Завершение работы функции get_currency_data.")
+        logger.debug("Завершение работы функции get_currency_data.")
 
 
 # print(get_currency_data())
 
 
+@instrumented()
 def get_price_stock() -> Any:
     """Функция для получения стоимости акций из S&P500."""
-    logger.info("Начало работы функции get_price_stock.")
+    logger.debug("Начало работы функции get_price_stock.")
     try:
         result = []
-        path_json_file = (
-            "/Users/anastasiaandreeva/Project_1_banking_transaction_analysis_application/user_settings.json"
-        )
-        logger.info("Чтение данных из user_settings.json.")
-        with open(path_json_file, "r", encoding="utf=8") as f:
-            data = (json.load(f)).get("user_stocks")
-            for user_stocks in data:
-                url = (
-                    f"https://www.alphavantage."
-                    f"co/query?function=GLOBAL_QUOTE&symbol={user_stocks}&apikey={API_KEY_SP_500}"
-                )
-                response = requests.get(url)
-                if response.status_code == 200:
-                    response.json()
-                    result.append(
-                        {"stock": user_stocks, "price": round(float(response.json()["Global Quote"]["05. price"]), 2)}
-                    )
+        data = load_user_settings().get("user_stocks")
+        api_key = get_api_key("API_KEY_SP_500")
+        urls = [quotes.STOCK_URL.format(api_key=api_key, symbol=symbol) for symbol in data]
+        for user_stocks, response in zip(data, get_quote_fetcher().fetch_json(urls)):
+            if response is not None:
+                result.append({"stock": user_stocks, "price": round(float(response["Global Quote"]["05. price"]), 2)})
         logger.info("Данные в виде списка словарей.")
         return result
     except Exception as e:
         logger.error(f"Произошла ошибка: {e}")
         return f"Произошла ошибка: {e}"
     finally:
-        logger.info("Завершение работы функции get_price_stock.")
+        logger.debug("Завершение работы функции get_price_stock.")
 
 
 # print(get_price_stock())
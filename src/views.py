@@ -1,5 +1,9 @@
 import json
-from typing import Any
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional, Tuple
 
 from src.utils import (
     get_currency_data,
@@ -9,17 +13,100 @@ from src.utils import (
     welcome_function,
 )
 
+SECTION_BUDGETS = {
+    "greeting": 1.0,
+    "cards": 10.0,
+    "top_transactions": 10.0,
+    "currency_rates": 6.0,
+    "stock_prices": 6.0,
+}
+SECTION_TIMEOUT_MARKER = {"error": "Превышено время ожидания"}
 
-def home_page(data_time: Any) -> Any:
+CONCURRENT_PAGES = 8
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=CONCURRENT_PAGES * len(SECTION_BUDGETS), thread_name_prefix="home_page"
+            )
+        return _executor
+
+
+class _SectionRun:
+    """Вызов раздела в потоке пула: запоминает момент, когда раздел начал выполняться."""
+
+    def __init__(self, func: Callable[..., Any], args: Tuple[Any, ...]) -> None:
+        self.func = func
+        self.args = args
+        self.started = threading.Event()
+        self.start = 0.0
+
+    def __call__(self) -> Tuple[Any, float]:
+        self.start = time.perf_counter()
+        self.started.set()
+        result = self.func(*self.args)
+        return result, time.perf_counter()
+
+
+def _wait_section(run: _SectionRun, future: Future, submitted: float, budget: float) -> Tuple[Any, float]:
+    """Результат раздела и время его выполнения; FutureTimeoutError, если раздел не уложился в бюджет.
+
+    Бюджет отсчитывается с начала выполнения раздела, а не с постановки в очередь пула. Раздел, который
+    за время бюджета так и не начал выполняться, снимается с очереди."""
+    if not run.started.wait(max(0.0, submitted + budget - time.perf_counter())) and future.cancel():
+        raise FutureTimeoutError
+    run.started.wait()
+    deadline = run.start + budget
+    result, end = future.result(timeout=max(0.0, deadline - time.perf_counter()))
+    if end > deadline:
+        raise FutureTimeoutError
+    return result, end - run.start
+
+
+def home_page(data_time: Any, budgets: Optional[Dict[str, float]] = None) -> Any:
     """Функция для страницы «Главная» принимает на вход строку с датой
-    и временем в формате YYYY-MM-DD HH:MM:SS."""
+    и временем в формате YYYY-MM-DD HH:MM:SS.
+    Разделы страницы собираются параллельно; раздел, который не уложился в свой бюджет времени
+    (секунды, SECTION_BUDGETS, отсчитываются с начала выполнения раздела), возвращает
+    SECTION_TIMEOUT_MARKER. Время каждого раздела — в "meta"."""
     try:
-        response = {
-            "greeting": welcome_function(),
-            "cards": information_for_each_card(data_time),
-            "top_transactions": top_five_transactions(data_time),
-            "currency_rates": get_currency_data(),
-            "stock_prices": get_price_stock(),
+        budgets = {**SECTION_BUDGETS, **(budgets or {})}
+        sections: Dict[str, Tuple[Callable[..., Any], Tuple[Any, ...]]] = {
+            "greeting": (welcome_function, ()),
+            "cards": (information_for_each_card, (data_time,)),
+            "top_transactions": (top_five_transactions, (data_time,)),
+            "currency_rates": (get_currency_data, ()),
+            "stock_prices": (get_price_stock, ()),
+        }
+
+        start = time.perf_counter()
+        executor = _get_executor()
+        runs = {name: _SectionRun(func, args) for name, (func, args) in sections.items()}
+        futures: Dict[str, Future] = {name: executor.submit(run) for name, run in runs.items()}
+
+        results: Dict[str, Any] = {}
+        timings: Dict[str, float] = {}
+        timed_out = []
+        for name in sorted(futures, key=budgets.__getitem__):
+            try:
+                results[name], elapsed = _wait_section(runs[name], futures[name], start, budgets[name])
+                timings[name] = round(elapsed, 4)
+            except FutureTimeoutError:
+                results[name] = SECTION_TIMEOUT_MARKER
+                timings[name] = budgets[name]
+                timed_out.append(name)
+
+        response: Dict[str, Any] = {name: results[name] for name in sections}
+        response["meta"] = {
+            "timings": {name: timings[name] for name in sections},
+            "timed_out": timed_out,
+            "total": round(time.perf_counter() - start, 4),
         }
 
         json.dumps(response)
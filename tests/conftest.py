@@ -0,0 +1,50 @@
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_operations
+from src.store import normalize_operations
+
+GAP_COLUMNS = ("Номер карты", "Категория", "Описание", "MCC", "Сумма операции с округлением")
+
+
+def pytest_configure(config: Any) -> None:
+    config.addinivalue_line("markers", "operations(**options): параметры фикстуры operations (make_operations)")
+
+
+def make_operations(
+    rows: int = 2000,
+    seed: int = 0,
+    start: str = "2021-01-01",
+    days: int = 365,
+    cards: int = 3,
+    categories: int = 5,
+    gaps: float = 0.0,
+    missing_dates: float = 0.0,
+    shuffled: bool = False,
+    normalized: bool = False,
+) -> pd.DataFrame:
+    """Операции generate_operations (в виде из Excel, по убыванию даты) с пропусками.
+
+    gaps — доля пропусков (NaN, как после чтения Excel) в номере карты, категории, описании, MCC и сумме
+    с округлением, missing_dates — доля пропущенных дат, shuffled — строки в случайном порядке,
+    normalized — типы столбцов приведены normalize_operations.
+    """
+    df = generate_operations(rows, cards=cards, seed=seed, start=start, categories=categories, days=days)
+    rng = np.random.default_rng(seed)
+    for column in GAP_COLUMNS:
+        df[column] = df[column].where(rng.random(rows) >= gaps)
+    df["Дата операции"] = df["Дата операции"].where(rng.random(rows) >= missing_dates)
+    if shuffled:
+        df = df.iloc[rng.permutation(rows)].reset_index(drop=True)
+    return normalize_operations(df) if normalized else df
+
+
+@pytest.fixture(scope="module")
+def operations(request: Any) -> pd.DataFrame:
+    """Фикстура: операции make_operations с параметрами метки operations модуля
+    (pytestmark = pytest.mark.operations(rows=..., gaps=...))."""
+    marker = request.node.get_closest_marker("operations")
+    return make_operations(**(marker.kwargs if marker is not None else {}))
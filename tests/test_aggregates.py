@@ -0,0 +1,115 @@
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.aggregates import CardDailyAggregates, MonthlyTopTransactions
+
+# Операции по нескольким картам за три месяца (фикстура operations из conftest)
+pytestmark = pytest.mark.operations(rows=2000, days=90, gaps=0.05, normalized=True)
+
+
+def reference_information(df: pd.DataFrame, data_time: pd.Timestamp) -> List[Dict[str, Any]]:
+    """Расчет information_for_each_card фильтрацией всего DataFrame (прежняя реализация)."""
+    df_filtered = df[(df["Дата операции"] >= data_time.replace(day=1)) & (df["Дата операции"] <= data_time)].copy()
+    df_filtered["кэшбек"] = df_filtered["Сумма операции с округлением"] * 0.01
+    grouped = (
+        df_filtered.groupby("Номер карты")
+        .agg(total_spent=("Сумма операции с округлением", "sum"), cashback=("кэшбек", "sum"))
+        .reset_index()
+    )
+    grouped["last_digits"] = grouped["Номер карты"].astype(str).str[-4:]
+    result: List[Dict] = (
+        grouped.sort_values(by="total_spent", ascending=False)[["last_digits", "total_spent", "cashback"]]
+    ).to_dict("records")
+    for item in result:
+        item["total_spent"] = round(item["total_spent"], 2)
+        item["cashback"] = round(item["cashback"], 2)
+    return result
+
+
+@pytest.mark.parametrize(
+    "data_time",
+    ["2021-01-01 00:00:00", "2021-01-31 23:59:59", "2021-02-15 00:00:00", "2021-03-10 13:45:00", "2021-06-01"],
+)
+def test_month_to_date_matches_reference(operations: pd.DataFrame, data_time: str) -> None:
+    """Тест совпадения результатов по дневным суммам с расчетом по всему DataFrame."""
+    aggregates = CardDailyAggregates.from_dataframe(operations)
+    timestamp = pd.Timestamp(data_time)
+    assert aggregates.month_to_date(timestamp) == reference_information(operations, timestamp)
+
+
+def test_month_to_date_with_start_time(operations: pd.DataFrame) -> None:
+    """Тест учета времени в начале периода, как в фильтре по DataFrame."""
+    aggregates = CardDailyAggregates.from_dataframe(operations)
+    timestamp = pd.Timestamp("2021-02-20 18:30:00")
+    assert aggregates.month_to_date(timestamp) == reference_information(operations, timestamp)
+
+
+def test_append_in_parts(operations: pd.DataFrame) -> None:
+    """Тест инкрементального добавления операций, в том числе задним числом."""
+    aggregates = CardDailyAggregates()
+    shuffled = operations.sample(frac=1, random_state=1)
+    for part in np.array_split(np.arange(len(shuffled)), 5):
+        aggregates.append(shuffled.iloc[part])
+    assert len(aggregates) == operations["Номер карты"].notna().sum()
+
+    timestamp = pd.Timestamp("2021-03-31 00:00:00")
+    assert aggregates.month_to_date(timestamp) == reference_information(operations, timestamp)
+
+
+def test_month_to_date_empty() -> None:
+    """Тест пустого результата при отсутствии операций."""
+    assert CardDailyAggregates().month_to_date(pd.Timestamp("2021-01-15")) == []
+
+
+def reference_top(df: pd.DataFrame, start: pd.Timestamp, end: pd.Timestamp, n: int) -> List[int]:
+    """Топ-N полной устойчивой сортировкой отфильтрованного DataFrame."""
+    filtered = df[(df["Дата операции"] >= start) & (df["Дата операции"] <= end)]
+    filtered = filtered.dropna(subset=["Сумма операции с округлением"])
+    top = filtered.sort_values(by="Сумма операции с округлением", ascending=False, kind="stable").head(n)
+    return top.index.tolist()
+
+
+@pytest.fixture
+def operations_with_ties() -> pd.DataFrame:
+    """Фикстура с операциями за год с повторяющимися суммами и пропусками."""
+    rng = np.random.default_rng(1)
+    rows = 5000
+    amounts = rng.integers(1, 300, rows).astype("float64")
+    amounts[::97] = np.nan
+    return pd.DataFrame(
+        {
+            "Дата операции": pd.Timestamp("2020-01-01")
+            + pd.to_timedelta(rng.integers(0, 366 * 86400, rows), unit="s"),
+            "Сумма операции с округлением": amounts,
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "start, end, n",
+    [
+        ("2020-03-01", "2020-03-17 12:00:00", 5),
+        ("2020-03-05 08:00:00", "2020-07-31 23:59:59.999999999", 50),
+        ("2020-01-01", "2020-12-31 23:59:59", 1000),
+        ("2020-02-10", "2020-02-10", 3),
+    ],
+)
+def test_top_positions_match_full_sort(operations_with_ties: pd.DataFrame, start: str, end: str, n: int) -> None:
+    """Тест совпадения топ-N с полной сортировкой, включая одинаковые суммы."""
+    top = MonthlyTopTransactions(operations_with_ties)
+    start_ts, end_ts = pd.Timestamp(start), pd.Timestamp(end)
+    expected = reference_top(operations_with_ties, start_ts, end_ts, n)
+    assert top.top_positions(start_ts, end_ts, n, "Сумма операции с округлением").tolist() == expected
+    assert top.top_positions(start_ts, end_ts, n, "Сумма операции с округлением").tolist() == expected
+
+
+def test_top_positions_larger_n_after_cache(operations_with_ties: pd.DataFrame) -> None:
+    """Тест пересчета запомненного топа месяца при запросе большего N."""
+    top = MonthlyTopTransactions(operations_with_ties)
+    start, end = pd.Timestamp("2020-01-01"), pd.Timestamp("2020-06-30 23:59:59.999999999")
+    top.top_positions(start, end, 10, "Сумма операции с округлением")
+    result = top.top_positions(start, end, 200, "Сумма операции с округлением").tolist()
+    assert result == reference_top(operations_with_ties, start, end, 200)
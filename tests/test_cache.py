@@ -0,0 +1,68 @@
+import os
+from typing import Any
+from unittest.mock import patch
+
+import pandas as pd
+import pyarrow.feather as feather  # type: ignore[import-untyped]
+import pytest
+
+from src.cache import cache_path, file_signature, load_cache, main, save_cache
+from src.store import TransactionStore, normalize_operations
+
+
+@pytest.fixture
+def operations_file(tmp_path: Any) -> str:
+    """Фикстура с путем к Excel-файлу операций."""
+    path = tmp_path / "operations.xlsx"
+    pd.DataFrame(
+        {
+            "Дата операции": ["01.09.2018 12:00:00", "02.09.2018 13:30:00"],
+            "Номер карты": ["*7197", "*5091"],
+            "Сумма операции с округлением": [100, 250.5],
+            "Категория": ["Супермаркеты", "Переводы"],
+        }
+    ).to_excel(path, index=False)
+    return str(path)
+
+
+def test_store_uses_cache(operations_file: str) -> None:
+    """Тест чтения данных из кэша вместо повторного разбора Excel в новом хранилище."""
+    expected = TransactionStore(operations_file).get_dataframe()
+    assert os.path.exists(cache_path(operations_file, file_signature(operations_file)))
+
+    with patch("pandas.read_excel") as mock_read_excel:
+        result = TransactionStore(operations_file).get_dataframe()
+    mock_read_excel.assert_not_called()
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_cache_is_feather(operations_file: str) -> None:
+    """Тест колоночного формата кэша: Feather без сжатия, читается отображением в память."""
+    df = normalize_operations(pd.read_excel(operations_file))
+    sidecar = save_cache(operations_file, file_signature(operations_file), df)
+
+    assert sidecar is not None and sidecar.endswith(".feather")
+    table = feather.read_table(sidecar, memory_map=True)
+    pd.testing.assert_frame_equal(table.to_pandas(), df)
+
+
+def test_cache_invalidated_on_change(operations_file: str) -> None:
+    """Тест игнорирования кэша старой версии файла и удаления устаревшего кэша."""
+    df = normalize_operations(pd.read_excel(operations_file))
+    old_signature = file_signature(operations_file)
+    old_sidecar = save_cache(operations_file, old_signature, df)
+
+    stat = os.stat(operations_file)
+    os.utime(operations_file, (stat.st_atime, stat.st_mtime + 10))
+    new_signature = file_signature(operations_file)
+
+    assert load_cache(operations_file, new_signature) is None
+    save_cache(operations_file, new_signature, df)
+    assert old_sidecar is not None and not os.path.exists(old_sidecar)
+
+
+def test_warm_command(operations_file: str, capsys: Any) -> None:
+    """Тест команды предварительного построения кэша."""
+    assert main(["warm", operations_file]) == 0
+    assert "Кэш построен" in capsys.readouterr().out
+    assert os.path.exists(cache_path(operations_file, file_signature(operations_file)))
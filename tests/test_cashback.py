@@ -0,0 +1,140 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.aggregates import CardDailyAggregates
+from src.cashback import CashbackRule, CashbackRules
+from src.query import OperationsQuery
+from src.store import normalize_operations
+
+
+def reference_cashback(rules: CashbackRules, df: pd.DataFrame) -> List[float]:
+    """Кэшбэк каждой операции расчетом по строкам (операции упорядочены по дате)."""
+    spent: Dict[Tuple, float] = {}
+    by_rule: Dict[Tuple, float] = {}
+    by_card: Dict[Tuple, float] = {}
+    result = []
+    for date, card, category, amount in zip(
+        df["Дата операции"], df["Номер карты"], df["Категория"], df["Сумма операции с округлением"]
+    ):
+        month = (date.year, date.month, card)
+        spent[month] = spent.get(month, 0.0) + amount
+        number = next(
+            (
+                number
+                for number, rule in enumerate(rules.rules)
+                if (rule.cards is None or card in rule.cards)
+                and (rule.categories is None or category in rule.categories)
+            ),
+            None,
+        )
+        if number is None:
+            value = amount * rules.default_rate
+        else:
+            rule = rules.rules[number]
+            rate = rule.rate
+            for threshold, tier_rate in rule.tiers:
+                if spent[month] >= threshold:
+                    rate = tier_rate
+            value = amount * rate
+            if rule.monthly_cap is not None:
+                used = by_rule.get(month + (number,), 0.0)
+                value = max(0.0, min(value, rule.monthly_cap - used))
+                by_rule[month + (number,)] = used + value
+        if rules.monthly_cap is not None:
+            used = by_card.get(month, 0.0)
+            value = max(0.0, min(value, rules.monthly_cap - used))
+            by_card[month] = used + value
+        result.append(value)
+    return result
+
+
+@pytest.fixture
+def operations() -> pd.DataFrame:
+    """Фикстура: операции по трем картам за два месяца, упорядоченные по дате."""
+    rng = np.random.default_rng(7)
+    rows = 400
+    dates = pd.Timestamp("2021-08-01") + pd.to_timedelta(np.sort(rng.integers(0, 61 * 24 * 3600, rows)), unit="s")
+    return normalize_operations(
+        pd.DataFrame(
+            {
+                "Дата операции": dates,
+                "Номер карты": rng.choice(["*1111", "*2222", "*3333"], rows),
+                "Категория": rng.choice(["Супермаркеты", "Фастфуд", "Топливо", "Аптеки"], rows),
+                "Описание": "Магазин",
+                "Сумма операции с округлением": np.round(rng.gamma(2.0, 500.0, rows), 2),
+            }
+        )
+    )
+
+
+def test_default_rules_match_card_aggregates(operations: pd.DataFrame) -> None:
+    """Без правил кэшбэк совпадает с information_for_each_card (1% от трат)."""
+    data_time = pd.Timestamp("2021-09-20 15:00:00")
+
+    result = CashbackRules([]).month_to_date(OperationsQuery(operations), data_time)
+
+    assert result == CardDailyAggregates.from_dataframe(operations).month_to_date(data_time)
+
+
+def test_rules_match_reference(operations: pd.DataFrame) -> None:
+    """Векторный расчет совпадает с расчетом по строкам: первое подходящее правило, ступени, ограничения."""
+    rules = CashbackRules(
+        [
+            CashbackRule(rate=0.1, category="Топливо", card="*1111", monthly_cap=300),
+            CashbackRule(rate=0.05, category=["Топливо", "Аптеки"]),
+            CashbackRule(rate=0.01, card="*2222", tiers=[(20_000, 0.02), (50_000, 0.03)]),
+            CashbackRule(rate=0.0, category="Фастфуд"),
+        ],
+        default_rate=0.015,
+        monthly_cap=1_000,
+    )
+
+    result = rules.evaluate(
+        operations["Дата операции"].to_numpy(),
+        operations["Номер карты"].to_numpy(),
+        operations["Категория"].to_numpy(),
+        operations["Сумма операции с округлением"].to_numpy(),
+    )
+
+    np.testing.assert_allclose(result, reference_cashback(rules, operations))
+
+
+def test_monthly_cap_per_card() -> None:
+    """Ограничение месяца исчерпывается по порядку операций и начинается заново в новом месяце."""
+    rules = CashbackRules([CashbackRule(rate=0.1, category="Топливо", monthly_cap=150)])
+    dates = pd.to_datetime(["2021-08-01", "2021-08-02", "2021-08-03", "2021-09-01"]).to_numpy()
+
+    result = rules.evaluate(
+        dates,
+        np.array(["*1111"] * 4, dtype=object),
+        np.array(["Топливо"] * 4, dtype=object),
+        np.array([1000.0, 1000.0, 1000.0, 1000.0]),
+    )
+
+    assert result.tolist() == [100.0, 50.0, 0.0, 100.0]
+
+
+def test_month_to_date_with_rules(operations: pd.DataFrame) -> None:
+    """Траты и кэшбэк по картам в формате information_for_each_card."""
+    rules = CashbackRules.from_dicts([{"category": "Топливо", "rate": 0.05}], default_rate=0.0)
+    data_time = pd.Timestamp("2021-09-30 00:00:00")
+
+    result = rules.month_to_date(OperationsQuery(operations), data_time)
+
+    dates = operations["Дата операции"]
+    september = operations[(dates >= pd.Timestamp("2021-09-01")) & (dates <= data_time)]
+    fuel = september[september["Категория"] == "Топливо"]
+    expected = (fuel.groupby("Номер карты")["Сумма операции с округлением"].sum() * 0.05).round(2)
+    assert [item["last_digits"] for item in result] == [
+        card[-4:]
+        for card in september.groupby("Номер карты")["Сумма операции с округлением"]
+        .sum()
+        .sort_values(ascending=False)
+        .index
+    ]
+    assert {item["last_digits"]: item["cashback"] for item in result} == {
+        str(card)[-4:]: value for card, value in expected.items()
+    }
@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+from typing import Any, Dict, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Бюджет времени импорта src.main вместе с pandas и requests, секунды.
+IMPORT_TIME_BUDGET = 5.0
+# Бюджет собственного времени импорта модулей проекта (без сторонних библиотек), секунды.
+PROJECT_IMPORT_TIME_BUDGET = 0.2
+
+
+def run_import(module: str, cwd: str) -> Tuple[subprocess.CompletedProcess, Dict[str, Tuple[int, int]]]:
+    """Импорт модуля в отдельном процессе с -X importtime.
+    Возвращает результат процесса и словарь модуль -> (собственное, накопленное время в мкс)."""
+    env = dict(os.environ, PYTHONPATH=ROOT_DIR)
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return process, times
+
+
+def test_import_is_side_effect_free(tmp_path: Any) -> None:
+    """Тест отсутствия побочных эффектов при импорте: нет вывода и созданных файлов."""
+    process, _ = run_import("src.main", str(tmp_path))
+    assert process.returncode == 0, process.stderr
+    assert process.stdout == ""
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_import_time_budget(tmp_path: Any) -> None:
+    """Тест времени импорта src.main в пределах бюджета."""
+    process, times = run_import("src.main", str(tmp_path))
+    assert process.returncode == 0, process.stderr
+
+    assert times["src.main"][1] / 1_000_000 < IMPORT_TIME_BUDGET
+    project_time = sum(self_us for name, (self_us, _) in times.items() if name.startswith("src"))
+    assert project_time / 1_000_000 < PROJECT_IMPORT_TIME_BUDGET
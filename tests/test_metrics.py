@@ -0,0 +1,101 @@
+from typing import Any, List
+
+import pandas as pd
+import pytest
+
+from src.metrics import (
+    LATENCY_BUCKETS,
+    Histogram,
+    MetricsRegistry,
+    count_rows,
+    file_size,
+    first_argument,
+    instrumented,
+)
+
+
+def test_histogram_buckets_and_quantiles() -> None:
+    """Значения попадают в корзины по верхней границе, квантили оцениваются по корзинам."""
+    histogram = Histogram([1, 10, 100])
+    for value in [0.5, 1, 5, 50, 500]:
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 5
+    assert snapshot["sum"] == 556.5
+    assert snapshot["buckets"] == {"1": 2, "10": 3, "100": 4, "+Inf": 5}
+    assert histogram.quantile(0.5) == 10
+    assert histogram.quantile(0.99) == float("inf")
+
+
+def test_measure_records_rows_bytes_and_errors() -> None:
+    """Контекстный менеджер записывает время, строки, байты и ошибки."""
+    registry = MetricsRegistry()
+    with registry.measure("load") as measurement:
+        measurement.rows_in = 10
+        measurement.rows_out = 3
+        measurement.bytes_read = 2048
+    with pytest.raises(ValueError):
+        with registry.measure("load"):
+            raise ValueError("ошибка")
+
+    snapshot = registry.snapshot()["load"]
+    assert snapshot["calls"] == 2
+    assert snapshot["errors"] == 1
+    assert snapshot["seconds"]["count"] == 2
+    assert snapshot["rows_in"]["sum"] == 10
+    assert snapshot["rows_out"]["sum"] == 3
+    assert snapshot["bytes_read"]["sum"] == 2048
+
+
+def test_instrumented_decorator(tmp_path: Any) -> None:
+    """Декоратор считает строки результата и размер прочитанного файла."""
+    registry = MetricsRegistry()
+    path = tmp_path / "data.txt"
+    path.write_text("a\nb\nc\n")
+
+    @instrumented(bytes_read=first_argument(file_size), registry=registry)
+    def read_lines(file_path: str) -> List[str]:
+        with open(file_path) as f:
+            return f.read().splitlines()
+
+    assert read_lines(str(path)) == ["a", "b", "c"]
+    assert read_lines.__name__ == "read_lines"
+    snapshot = registry.snapshot()["read_lines"]
+    assert snapshot["rows_out"]["sum"] == 3
+    assert snapshot["bytes_read"]["sum"] == 6
+
+
+def test_disabled_registry_records_nothing() -> None:
+    """При enabled=False вызовы не измеряются."""
+    registry = MetricsRegistry(enabled=False)
+
+    @instrumented(registry=registry)
+    def identity(value: Any) -> Any:
+        return value
+
+    identity([1, 2])
+    with registry.measure("block"):
+        pass
+    assert registry.snapshot() == {}
+
+
+def test_prometheus_format() -> None:
+    """Текстовый формат: накопленные корзины, сумма, количество и счетчики вызовов."""
+    registry = MetricsRegistry()
+    registry.observe("search", "seconds", 0.002)
+    registry.record("search", 0.2, registry.measure("search").measurement)
+
+    lines = registry.to_prometheus().splitlines()
+    assert "# TYPE bank_app_seconds histogram" in lines
+    assert f'bank_app_seconds_bucket{{function="search",le="{LATENCY_BUCKETS[2]}"}} 1' in lines
+    assert 'bank_app_seconds_bucket{function="search",le="+Inf"} 2' in lines
+    assert 'bank_app_seconds_count{function="search"} 2' in lines
+    assert 'bank_app_calls_total{function="search"} 1' in lines
+
+
+def test_count_rows() -> None:
+    """Число строк определяется для списков и DataFrame."""
+    assert count_rows([{"a": 1}, {"a": 2}]) == 2
+    assert count_rows(pd.DataFrame({"a": [1, 2, 3]})) == 3
+    assert count_rows("[]") is None
@@ -0,0 +1,100 @@
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.query import OperationsQuery
+from src.store import query_for
+
+# Операции по нескольким категориям и картам, даты не упорядочены (фикстура operations из conftest)
+pytestmark = pytest.mark.operations(
+    rows=3000, seed=1, start="2020-01-01", gaps=0.05, missing_dates=0.01, shuffled=True, normalized=True
+)
+
+
+def reference_window(
+    df: pd.DataFrame,
+    start: pd.Timestamp,
+    end: pd.Timestamp,
+    category: Optional[str] = None,
+    card: Optional[str] = None,
+) -> pd.DataFrame:
+    """Отбор операций масками по всему DataFrame."""
+    mask = (df["Дата операции"] >= start) & (df["Дата операции"] <= end)
+    if category is not None:
+        mask &= df["Категория"] == category
+    if card is not None:
+        mask &= df["Номер карты"] == card
+    return df[mask]
+
+
+@pytest.mark.parametrize(
+    "start, end, category, card",
+    [
+        ("2020-03-01", "2020-05-31 23:59:59", None, None),
+        ("2020-02-20 12:00:00", "2020-05-20 12:00:00", "ЖКХ", None),
+        ("2020-06-01", "2020-06-30", None, "*7919"),
+        ("2020-01-01", "2020-12-31 23:59:59", "Транспорт", "*5838"),
+        ("2020-01-01", "2020-12-31", "Нет такой", None),
+        ("2021-01-01", "2021-02-01", "ЖКХ", None),
+    ],
+)
+def test_frame_matches_masks(
+    operations: pd.DataFrame, start: str, end: str, category: Optional[str], card: Optional[str]
+) -> None:
+    """Отбор по индексу совпадает с отбором масками, включая порядок строк."""
+    query = OperationsQuery(operations)
+    start_time, end_time = pd.Timestamp(start), pd.Timestamp(end)
+
+    result = query.frame(start_time, end_time, category=category, card=card)
+
+    pd.testing.assert_frame_equal(result, reference_window(operations, start_time, end_time, category, card))
+
+
+def test_window_is_ordered_by_date(operations: pd.DataFrame) -> None:
+    """Позиции окна упорядочены по дате, граница end может быть исключена."""
+    query = OperationsQuery(operations)
+    positions = query.window("2020-03-01", "2020-04-01", category="ЖКХ", include_end=False)
+    dates = operations["Дата операции"].to_numpy()[positions]
+
+    assert (np.diff(dates) >= np.timedelta64(0)).all()
+    assert dates.max() < np.datetime64("2020-04-01")
+
+
+def test_query_for_reuses_store_query(monkeypatch: Any, operations: pd.DataFrame) -> None:
+    """Для DataFrame хранилища используется индекс хранилища, для чужого — строится новый."""
+    from src import store
+
+    owner = store.TransactionStore("operations.xlsx")
+    monkeypatch.setattr(owner, "get_dataframe", lambda: operations)
+    monkeypatch.setattr(owner, "_df", operations)
+    monkeypatch.setitem(store._stores, "operations.xlsx", owner)
+
+    assert query_for(operations) is owner.get_query()
+    assert query_for(operations.copy()) is not owner.get_query()
+
+
+@pytest.mark.parametrize("start", [0, 1500, 2999])
+def test_extended_matches_rebuilt(operations: pd.DataFrame, start: int) -> None:
+    """Индекс, дополненный новыми строками (в том числе с новыми категориями и картами), совпадает с новым индексом."""
+    operations = operations.assign(
+        **{
+            "Категория": operations["Категория"].cat.add_categories(["Новая"]),
+            "Номер карты": operations["Номер карты"].where(operations.index < 2900, "*9999"),
+        }
+    )
+    operations.loc[2800:, "Категория"] = "Новая"
+    query = OperationsQuery(operations.iloc[:start])
+    query.key_index("Категория")
+    query.key_index("Номер карты")
+
+    extended = query.extended(operations, start)
+
+    rebuilt = OperationsQuery(operations)
+    assert extended.order.tolist() == rebuilt.order.tolist()
+    for category, card in [("ЖКХ", None), ("Новая", None), (None, "*9999"), (None, "*5838"), ("Транспорт", "*7919")]:
+        assert (
+            extended.window("2020-02-01", "2020-11-30", category, card).tolist()
+            == rebuilt.window("2020-02-01", "2020-11-30", category, card).tolist()
+        )
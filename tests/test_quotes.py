@@ -0,0 +1,103 @@
+import time
+from typing import Iterator
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from benchmarks.stub_quotes import StubQuotesServer
+from src.quotes import QuoteFetcher
+from src.utils import get_currency_data, get_price_stock
+
+RATES = {"USD": 90.123, "EUR": 98.456}
+PRICES = {"AAPL": "150.754", "MSFT": "300.25"}
+
+
+@pytest.fixture
+def stub_server() -> Iterator[StubQuotesServer]:
+    """Фикстура с запущенным локальным сервером без задержки."""
+    server = StubQuotesServer(delay=0.0, rates=RATES, prices=PRICES)
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def slow_server() -> Iterator[StubQuotesServer]:
+    """Фикстура с локальным сервером, который отвечает с задержкой 0.3 с."""
+    server = StubQuotesServer(delay=0.3, rates=RATES, prices=PRICES)
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def fetcher(stub_server: StubQuotesServer) -> Iterator[QuoteFetcher]:
+    """Фикстура с отдельным QuoteFetcher, который подставляется вместо общего и ходит на локальный сервер."""
+    quote_fetcher = QuoteFetcher(ttl=60)
+    with (
+        patch("src.utils.get_quote_fetcher", return_value=quote_fetcher),
+        patch("src.quotes.CURRENCY_URL", stub_server.currency_url),
+        patch("src.quotes.STOCK_URL", stub_server.stock_url),
+        patch(
+            "src.utils.load_user_settings", return_value={"user_currencies": ["USD", "EUR"], "user_stocks": ["AAPL"]}
+        ),
+    ):
+        yield quote_fetcher
+
+
+def test_get_currency_data_stub(fetcher: QuoteFetcher) -> None:
+    """Тест получения курсов валют с локального сервера."""
+    assert get_currency_data() == [{"currency": "USD", "rate": 90.12}, {"currency": "EUR", "rate": 98.46}]
+
+
+def test_get_price_stock_stub(fetcher: QuoteFetcher) -> None:
+    """Тест получения цен акций с локального сервера."""
+    assert get_price_stock() == [{"stock": "AAPL", "price": 150.75}]
+
+
+def test_repeated_calls_use_cache(fetcher: QuoteFetcher, stub_server: StubQuotesServer) -> None:
+    """Тест отсутствия сетевых запросов при повторных вызовах в пределах ttl."""
+    get_currency_data()
+    get_price_stock()
+    requests_count = len(stub_server.requests)
+
+    get_currency_data()
+    get_price_stock()
+    assert requests_count == 3
+    assert len(stub_server.requests) == requests_count
+
+
+def test_expired_cache_refetches(stub_server: StubQuotesServer) -> None:
+    """Тест повторного запроса после истечения ttl."""
+    quote_fetcher = QuoteFetcher(ttl=0)
+    url = stub_server.url + "/currency/key/USD"
+    quote_fetcher.fetch_json([url])
+    quote_fetcher.fetch_json([url])
+    assert len(stub_server.requests) == 2
+
+
+def test_requests_run_concurrently(slow_server: StubQuotesServer) -> None:
+    """Тест одновременного выполнения запросов: время близко к одному запросу, а не к их сумме."""
+    quote_fetcher = QuoteFetcher()
+    urls = [f"{slow_server.url}/stock/key/{symbol}" for symbol in ["AAPL", "MSFT"] * 3]
+    start = time.perf_counter()
+    results = quote_fetcher.fetch_json(urls)
+    assert time.perf_counter() - start < 0.3 * len(urls) / 2
+    assert [result["Global Quote"]["05. price"] if result else None for result in results] == [
+        PRICES["AAPL"],
+        PRICES["MSFT"],
+    ] * 3
+
+
+def test_request_timeout(slow_server: StubQuotesServer) -> None:
+    """Тест таймаута запроса."""
+    quote_fetcher = QuoteFetcher(timeout=0.05)
+    with pytest.raises(requests.exceptions.Timeout):
+        quote_fetcher.fetch_json([slow_server.url + "/currency/key/USD"])
+
+
+def test_non_200_response_skipped(stub_server: StubQuotesServer) -> None:
+    """Тест пропуска ответа с кодом не 200 без сохранения в кэш."""
+    quote_fetcher = QuoteFetcher()
+    assert quote_fetcher.fetch_json([stub_server.url + "/unknown"]) == [None]
+    quote_fetcher.fetch_json([stub_server.url + "/unknown"])
+    assert len(stub_server.requests) == 2
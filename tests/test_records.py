@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.records import OperationRecords
+from src.search_index import SearchIndex
+from src.services import find_physical_transfers, iter_physical_transfers, simple_search
+
+
+@pytest.fixture
+def operations() -> pd.DataFrame:
+    """Фикстура с операциями, включая пропуски (NaN, как после read_excel) и нестроковые значения."""
+    return pd.DataFrame(
+        {
+            "Дата операции": pd.to_datetime(["2020-05-20", "2020-05-21", "2020-05-22", "2020-05-23", "2020-05-24"]),
+            "Номер карты": ["*7197", "*5091", np.nan, "*7197", "*5091"],
+            "Категория": pd.Categorical(["Переводы", "Супермаркеты", "Переводы", None, "ЖКХ"]),
+            "Описание": ["Иван С.", "Магнит", "Перевод на карту", 12345, "ЖКУ Квартира"],
+            "Сумма операции": [-100.0, -250.5, np.nan, -10.0, -3000.0],
+        }
+    )
+
+
+def test_rows_match_dataframe(operations: pd.DataFrame) -> None:
+    """Строки OperationRecords совпадают со словарями DataFrame.to_dict("records")."""
+    records = OperationRecords.from_dataframe(operations)
+    expected = operations.to_dict("records")
+
+    assert len(records) == len(operations)
+    assert records[1] == expected[1]
+    pd.testing.assert_frame_equal(pd.DataFrame(list(records)), pd.DataFrame(expected))
+    assert isinstance(records.columns["Номер карты"], pd.Categorical)
+
+
+def test_from_records_round_trip(operations: pd.DataFrame) -> None:
+    """OperationRecords строится и по списку словарей."""
+    records = OperationRecords.from_records(operations.to_dict("records"))
+    assert records.to_dataframe()["Описание"].tolist() == operations["Описание"].tolist()
+
+
+def test_columns_must_have_same_length() -> None:
+    """Столбцы разной длины не принимаются."""
+    with pytest.raises(ValueError):
+        OperationRecords({"a": np.zeros(2), "b": np.zeros(3)})
+
+
+@pytest.mark.parametrize("search_str", ["пере", "МАГ", "квартира", "z", "12345"])
+def test_services_accept_records(operations: pd.DataFrame, search_str: str) -> None:
+    """simple_search дает тот же результат для списка словарей и OperationRecords, с индексом и без."""
+    data_list = operations.to_dict("records")
+    records = OperationRecords.from_dataframe(operations)
+
+    expected = simple_search(search_str, data_list)
+
+    assert simple_search(search_str, records) == expected
+    assert simple_search(search_str, records, SearchIndex.from_dataframe(operations)) == expected
+
+
+def test_physical_transfers_accept_records(operations: pd.DataFrame) -> None:
+    """Поиск переводов физическим лицам по OperationRecords."""
+    records = OperationRecords.from_dataframe(operations)
+
+    assert [row["Описание"] for row in iter_physical_transfers(records)] == ["Иван С."]
+    assert find_physical_transfers(records) == find_physical_transfers(operations.to_dict("records"))
@@ -1,9 +1,17 @@
+import json
+from datetime import datetime
 from typing import Any, Dict, List
 
 import pandas as pd
 import pytest
 
-from src.reports import report_saver, spending_by_category
+from src.reports import (
+    REPORT_DATE_FORMAT,
+    get_report_writer,
+    report_saver,
+    spending_by_categories,
+    spending_by_category,
+)
 
 
 @pytest.fixture
@@ -62,8 +70,121 @@ def test_spending_by_category_date_format(test_dataframe: pd.DataFrame) -> None:
         test_dataframe (pd.DataFrame): тестовые данные операций
 
     Checks:
-        - Дата форматируется в формате ДД.ММ.ГГГГ
+        - Дата форматируется в формате отчета ГГГГ-ММ-ДД ЧЧ:ММ:СС (REPORT_DATE_FORMAT)
     """
     result: List[Dict[str, Any]] = spending_by_category(test_dataframe, "ЖКХ", "20.05.2020")
+    assert result
     for record in result:
-        assert len(record["Дата операции"].split(".")) == 3
+        datetime.strptime(record["Дата операции"], REPORT_DATE_FORMAT)
+
+
+def test_spending_by_categories_matches_single_reports() -> None:
+    """
+    Тестирует сводный отчет по парам (категория, дата).
+
+    Checks:
+        - Число операций и сумма каждого периода совпадают с spending_by_category
+        - Порядок результатов совпадает с порядком пар
+    """
+    df = pd.DataFrame(
+        {
+            "Дата операции": pd.to_datetime(
+                ["20.05.2020", "15.04.2020", "10.03.2020", "05.02.2020", "19.02.2020", "01.06.2020"], dayfirst=True
+            ),
+            "Категория": ["ЖКХ", "ЖКХ", "Продукты", "ЖКХ", "ЖКХ", "Продукты"],
+            "Сумма операции с округлением": [1000.0, 1200.0, 500.0, 1100.0, 300.0, 50.0],
+        }
+    )
+    requests = [("ЖКХ", "20.05.2020"), ("Продукты", "01.06.2020"), ("ЖКХ", "31.03.2020"), ("Такси", "20.05.2020")]
+
+    result: List[Dict[str, Any]] = spending_by_categories(df, requests, include_transactions=True)
+
+    assert [report["category"] for report in result] == ["ЖКХ", "Продукты", "ЖКХ", "Такси"]
+    for report, (category, date) in zip(result, requests):
+        expected = spending_by_category(df, category, date)
+        assert report["transactions_count"] == len(expected)
+        assert report["total_spent"] == round(sum(row["Сумма операции с округлением"] for row in expected), 2)
+        assert len(report["transactions"]) == len(expected)
+    assert result[0]["total_spent"] == 2200.0
+
+
+@pytest.mark.parametrize("fmt", ["json", "ndjson", "csv"])
+def test_report_saver_formats(tmp_path: Any, fmt: str) -> None:
+    """
+    Тестирует запись отчета в разных форматах.
+
+    Checks:
+        - Файл содержит все записи отчета, даты записаны строками при записи файла
+        - Возвращаемый результат не изменяется декоратором
+    """
+    file_path = tmp_path / f"report.{fmt}"
+
+    @report_saver(str(file_path), fmt=fmt)
+    def testing_function() -> List[Dict[str, Any]]:
+        return [{"date": pd.Timestamp("2020-05-20 10:00:00"), "amount": 1.5}, {"date": None, "amount": 2.0}]
+
+    result = testing_function()
+
+    assert result[0]["date"] == pd.Timestamp("2020-05-20 10:00:00")
+    expected = [{"date": "2020-05-20 10:00:00", "amount": 1.5}, {"date": None, "amount": 2.0}]
+    if fmt == "json":
+        assert json.loads(file_path.read_text(encoding="utf-8")) == expected
+    elif fmt == "ndjson":
+        assert [json.loads(line) for line in file_path.read_text(encoding="utf-8").splitlines()] == expected
+    else:
+        written = pd.read_csv(file_path)
+        assert written["date"].tolist()[0] == "2020-05-20 10:00:00"
+        assert written["amount"].tolist() == [1.5, 2.0]
+
+
+def test_report_saver_background(tmp_path: Any) -> None:
+    """
+    Тестирует фоновую запись отчета.
+
+    Checks:
+        - Результат возвращается, файл появляется после flush
+    """
+    file_path = tmp_path / "report.ndjson"
+
+    @report_saver(str(file_path), fmt="ndjson", background=True)
+    def testing_function() -> List[Dict[str, Any]]:
+        return [{"test": "data"}]
+
+    assert testing_function() == [{"test": "data"}]
+    get_report_writer().flush()
+    assert file_path.read_text(encoding="utf-8") == '{"test":"data"}\n'
+
+
+def test_report_saver_unknown_format() -> None:
+    """
+    Тестирует проверку формата отчета.
+
+    Checks:
+        - Неизвестный формат вызывает ValueError
+    """
+    with pytest.raises(ValueError):
+        report_saver("report.xml", fmt="xml")
+
+
+def test_spending_by_category_formats_dates(test_dataframe: pd.DataFrame) -> None:
+    """
+    Тестирует преобразование дат до формирования записей отчета.
+
+    Checks:
+        - Даты операций в результате — строки в формате отчета
+    """
+    df = test_dataframe.assign(**{"Дата операции": pd.to_datetime(test_dataframe["Дата операции"], dayfirst=True)})
+
+    result: List[Dict[str, Any]] = spending_by_category(df, "ЖКХ", "20.05.2020")
+
+    assert [record["Дата операции"] for record in result] == ["2020-05-20 00:00:00", "2020-04-15 00:00:00"]
+
+
+def test_spending_by_category_does_not_modify_frame(test_dataframe: pd.DataFrame) -> None:
+    """Даты разбираются без изменения переданного DataFrame."""
+    original = test_dataframe.copy()
+
+    result = spending_by_category(test_dataframe, "ЖКХ", "20.05.2020")
+
+    assert len(result) == 2
+    pd.testing.assert_frame_equal(test_dataframe, original)
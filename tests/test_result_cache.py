@@ -0,0 +1,138 @@
+import os
+from typing import Any, List
+
+import pandas as pd
+
+from src.reports import REPORT_CACHE, report_saver, spending_by_categories, spending_by_category
+from src.result_cache import ResultCache
+from src.store import get_store
+
+
+def sample_frame(amount: float = 100.0) -> pd.DataFrame:
+    """DataFrame с одной операцией."""
+    return pd.DataFrame({"Категория": ["ЖКХ"], "Сумма": [amount]})
+
+
+def test_hits_misses_and_invalidation(tmp_path: Any) -> None:
+    """Повторный вызов берется из кэша, изменение данных приводит к пересчету."""
+    cache = ResultCache()
+    calls: List[str] = []
+
+    @report_saver(str(tmp_path / "report.json"), cache=cache)
+    def report(df: pd.DataFrame, category: str) -> list:
+        calls.append(category)
+        return df[df["Категория"] == category].to_dict("records")
+
+    first = report(sample_frame(), "ЖКХ")
+    second = report(sample_frame(), "ЖКХ")
+    changed = report(sample_frame(200.0), "ЖКХ")
+
+    assert first == second == [{"Категория": "ЖКХ", "Сумма": 100.0}]
+    assert changed == [{"Категория": "ЖКХ", "Сумма": 200.0}]
+    assert len(calls) == 2
+    assert cache.stats() == {"hits": 1, "disk_hits": 0, "misses": 2, "entries": 2}
+
+
+def test_file_not_rewritten_on_hit(tmp_path: Any) -> None:
+    """Файл с тем же результатом не перезаписывается, удаленный файл записывается заново."""
+    cache = ResultCache()
+    file_path = tmp_path / "report.json"
+
+    @report_saver(str(file_path), cache=cache)
+    def report(value: int) -> dict:
+        return {"value": value}
+
+    report(1)
+    mtime = os.stat(file_path).st_mtime_ns
+    os.utime(file_path, ns=(mtime - 10**9, mtime - 10**9))
+    report(1)
+    assert os.stat(file_path).st_mtime_ns == mtime - 10**9
+
+    os.remove(file_path)
+    report(1)
+    assert file_path.exists()
+
+
+def test_none_arguments_are_not_cached(tmp_path: Any) -> None:
+    """Вызовы с None (значение по умолчанию на момент вызова) не кэшируются."""
+    cache = ResultCache()
+    assert cache.key(test_none_arguments_are_not_cached, (1, None), {}) is None
+    assert cache.key(test_none_arguments_are_not_cached, (1,), {"date": None}) is None
+    assert cache.key(test_none_arguments_are_not_cached, (1,), {}) is not None
+    assert cache.key(test_none_arguments_are_not_cached, ([("ЖКХ", None)],), {}) is None
+    assert cache.key(test_none_arguments_are_not_cached, (1,), {"options": {"date": None}}) is None
+
+
+def test_none_date_in_requests_not_cached(tmp_path: Any, monkeypatch: Any) -> None:
+    """Пара (категория, None) — текущая дата: повторный вызов spending_by_categories не берется из кэша."""
+    operations = pd.DataFrame(
+        {
+            "Дата операции": pd.to_datetime(["2020-05-01 12:00:00", "2020-05-02 13:30:00"]),
+            "Сумма операции с округлением": [100.0, 250.0],
+            "Категория": ["ЖКХ", "ЖКХ"],
+        }
+    )
+    monkeypatch.chdir(tmp_path)
+    REPORT_CACHE.clear()
+
+    spending_by_categories(operations, [("ЖКХ", None)])
+    spending_by_categories(operations, [("ЖКХ", None)])
+
+    assert REPORT_CACHE.stats()["hits"] == 0
+    assert REPORT_CACHE.stats()["entries"] == 0
+
+
+def test_memory_lru_and_disk_tier(tmp_path: Any) -> None:
+    """LRU в памяти вытесняет старые результаты, они читаются с диска; диск ограничен по размеру."""
+    disk_dir = tmp_path / "cache"
+    cache = ResultCache(max_entries=2, disk_dir=str(disk_dir), max_disk_bytes=10_000)
+    keys = [cache.key(test_memory_lru_and_disk_tier, (i,), {}) for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.put(str(key), {"value": i})
+
+    assert cache.stats()["entries"] == 2
+    assert cache.get(str(keys[0])) == (True, {"value": 0})
+    assert cache.stats()["disk_hits"] == 1
+
+    for i in range(100):
+        cache.put(f"big{i}", "x" * 1000)
+    assert sum(entry.stat().st_size for entry in os.scandir(disk_dir)) <= 10_000
+    assert cache.get("big99") == (True, "x" * 1000)
+
+
+def test_errors_are_not_cached(tmp_path: Any) -> None:
+    """Сообщение об ошибке не кэшируется: следующий вызов выполняет отчет заново."""
+    cache = ResultCache()
+    calls: List[int] = []
+
+    @report_saver(str(tmp_path / "report.json"), cache=cache)
+    def report(value: int) -> list:
+        calls.append(value)
+        return [{"error": "временная ошибка"}] if len(calls) == 1 else [{"value": value}]
+
+    assert report(1) == [{"error": "временная ошибка"}]
+    assert report(1) == [{"value": 1}]
+    assert report(1) == [{"value": 1}]
+    assert len(calls) == 2
+
+
+def test_store_path_invalidated_by_append(tmp_path: Any, monkeypatch: Any) -> None:
+    """Отчет по пути к файлу хранилища пересчитывается после добавления операций (файл не меняется)."""
+    path = tmp_path / "operations.xlsx"
+    pd.DataFrame(
+        {
+            "Дата операции": ["01.05.2020 12:00:00", "02.05.2020 13:30:00"],
+            "Сумма операции с округлением": [100.0, 250.0],
+            "Категория": ["ЖКХ", "ЖКХ"],
+        }
+    ).to_excel(path, index=False)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("src.store._stores", {})
+    REPORT_CACHE.clear()
+
+    before = spending_by_category(str(path), "ЖКХ", "31.05.2020")
+    get_store(str(path)).append({"Дата операции": "03.05.2020 10:00:00", "Категория": "ЖКХ"}, persist=False)
+    after = spending_by_category(str(path), "ЖКХ", "31.05.2020")
+
+    assert len(before) == 2
+    assert len(after) == 3
@@ -0,0 +1,121 @@
+import json
+
+import pandas as pd
+import pytest
+
+from src.search_index import FuzzyIndex, SearchIndex, word_trigrams
+from src.services import fuzzy_search, simple_search
+
+
+@pytest.fixture
+def list_data() -> list[dict]:
+    return [
+        {"Категория": "Продукты", "Описание": "Покупка продуктов в магазине"},
+        {"Категория": "Переводы", "Описание": "Иванов И.И. перевод"},
+        {"Категория": "Оплата", "Описание": "Интернет"},
+        {"Категория": float("nan"), "Описание": "ПРОДУКТЫ у дома"},
+        {"Категория": "Переводы", "Описание": None},
+        {"Описание": "Овощи и фрукты"},
+    ]
+
+
+@pytest.mark.parametrize("search_str", ["продукты", "ПЕРЕВОД", "ы", "ин", "нет", "zzz", "и.и", "овощи и"])
+def test_index_matches_linear_search(list_data: list[dict], search_str: str) -> None:
+    """Тест совпадения результатов поиска по индексу и линейного поиска."""
+    index = SearchIndex.from_records(list_data)
+    assert simple_search(search_str, list_data, index) == simple_search(search_str, list_data)
+
+
+def test_index_from_dataframe(list_data: list[dict]) -> None:
+    """Тест построения индекса по DataFrame с категориальным столбцом «Категория»."""
+    df = pd.DataFrame(list_data)
+    df["Категория"] = df["Категория"].astype("category")
+    index = SearchIndex.from_dataframe(df)
+    assert len(index) == len(list_data)
+    assert index.search("продукт").tolist() == [0, 3]
+
+
+def test_index_search_result_is_json(list_data: list[dict]) -> None:
+    """Тест формата результата simple_search при поиске по индексу."""
+    result = simple_search("перевод", list_data, SearchIndex.from_records(list_data))
+    assert [item["Описание"] for item in json.loads(result)] == ["Иванов И.И. перевод", None]
+
+
+def test_extended_index(list_data: list[dict]) -> None:
+    """Индекс, дополненный новыми строками, находит те же строки, что и построенный заново."""
+    df = pd.DataFrame(list_data + [{"Категория": "Такси", "Описание": "Поездка"}, {"Описание": "продукты"}])
+    index = SearchIndex.from_dataframe(df.iloc[:4]).extended(df, 4)
+    rebuilt = SearchIndex.from_dataframe(df)
+
+    assert len(index) == len(df)
+    for search_str in ["продукты", "такси", "поезд", "ы", "нет"]:
+        assert index.search(search_str).tolist() == rebuilt.search(search_str).tolist()
+
+
+@pytest.fixture
+def merchants() -> pd.DataFrame:
+    """Фикстура: операции с повторяющимися описаниями разных магазинов."""
+    descriptions = ["Магнит", "Пятерочка №12", "магнит", "Яндекс Такси", None, "Магнитогорск", "Пятерочка", "МАГНИТ"]
+    return pd.DataFrame({"Категория": "Супермаркеты", "Описание": descriptions})
+
+
+def test_word_trigrams() -> None:
+    """Триграммы слов строятся без учета регистра с пробелами по краям слова."""
+    assert word_trigrams("Ок, ДА") == {"  о", " ок", "ок ", "  д", " да", "да "}
+    assert word_trigrams("...") == set()
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("магнит", ["Магнит", "магнит", "МАГНИТ", "Магнитогорск"]),
+        ("магнт", ["Магнит", "магнит", "МАГНИТ", "Магнитогорск"]),
+        ("пятерочка", ["Пятерочка", "Пятерочка №12"]),
+        ("пятерчка 12", ["Пятерочка №12", "Пятерочка"]),
+        ("такси яндек", ["Яндекс Такси"]),
+        ("zzz", []),
+    ],
+)
+def test_fuzzy_ranking(merchants: pd.DataFrame, query: str, expected: list) -> None:
+    """Опечатки допускаются, ближайшие описания выше, одинаковые без учета регистра — по порядку строк."""
+    positions, scores, complete = FuzzyIndex.from_dataframe(merchants).search(query)
+
+    assert merchants["Описание"].iloc[positions].tolist() == expected
+    assert complete
+    assert list(scores) == sorted(scores, reverse=True)
+
+
+def test_fuzzy_top_k_and_threshold(merchants: pd.DataFrame) -> None:
+    """top_k ограничивает число операций, threshold — наименьшую релевантность."""
+    index = FuzzyIndex.from_dataframe(merchants)
+
+    assert index.search("магнит", top_k=2)[0].tolist() == [0, 2]
+    assert index.search("магнитка", threshold=0.9)[0].tolist() == []
+    assert index.search("магнитка", threshold=0.5)[0].tolist() == [0, 2, 7, 5]
+
+
+def test_fuzzy_budget(merchants: pd.DataFrame) -> None:
+    """При исчерпании времени на запрос результат помечается неполным."""
+    _, _, complete = FuzzyIndex.from_dataframe(merchants).search("магнит", budget=0)
+
+    assert not complete
+
+
+def test_fuzzy_extended_index(merchants: pd.DataFrame) -> None:
+    """Индекс, дополненный новыми строками, совпадает с построенным заново."""
+    index = FuzzyIndex.from_dataframe(merchants.iloc[:5]).extended(merchants, 5)
+    rebuilt = FuzzyIndex.from_dataframe(merchants)
+
+    assert len(index) == len(merchants)
+    for query in ["магнит", "пятерочка", "такси", "горск"]:
+        assert index.search(query, top_k=20)[0].tolist() == rebuilt.search(query, top_k=20)[0].tolist()
+
+
+def test_fuzzy_search_json(merchants: pd.DataFrame) -> None:
+    """fuzzy_search по списку словарей возвращает JSON в порядке релевантности."""
+    records = merchants.to_dict(orient="records")
+
+    result = fuzzy_search("петерочка", records, top_k=1)
+
+    assert [item["Описание"] for item in json.loads(result)] == ["Пятерочка"]
+    assert fuzzy_search("", records) == []
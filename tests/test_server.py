@@ -0,0 +1,190 @@
+import http.client
+import io
+import json
+import threading
+from typing import Any, Iterator
+from unittest.mock import patch
+from urllib.parse import urlparse
+
+import pandas as pd
+import pytest
+import requests
+
+from src.server import ChunkedWriter, make_server
+from src.store import TransactionStore
+
+
+@pytest.fixture
+def base_url(tmp_path: Any, monkeypatch: Any) -> Iterator[str]:
+    """Фикстура: сервис на свободном порту с хранилищем по небольшому Excel-файлу."""
+    path = tmp_path / "operations.xlsx"
+    pd.DataFrame(
+        {
+            "Дата операции": ["01.05.2020 12:00:00", "02.05.2020 13:30:00", "20.05.2020 10:00:00"],
+            "Номер карты": ["*7197", "*5091", "*7197"],
+            "Сумма операции с округлением": [100, 250.5, 3000],
+            "Категория": ["Супермаркеты", "Переводы", "ЖКХ"],
+            "Описание": ["Колхоз", "Иван П.", "ЖКУ Квартира"],
+        }
+    ).to_excel(path, index=False)
+    store = TransactionStore(str(path), use_cache=False)
+    monkeypatch.setattr("src.server.get_store", lambda: store)
+    monkeypatch.chdir(tmp_path)
+
+    server = make_server(port=0)
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_search_and_transfers(base_url: str) -> None:
+    """Поиск и переводы возвращают JSON-массивы найденных операций."""
+    search = requests.get(f"{base_url}/search", params={"q": "колхоз"})
+    transfers = requests.get(f"{base_url}/transfers")
+
+    assert search.status_code == 200
+    assert [row["Описание"] for row in search.json()] == ["Колхоз"]
+    assert [row["Описание"] for row in transfers.json()] == ["Иван П."]
+
+
+def test_fuzzy_search(base_url: str) -> None:
+    """Нечеткий поиск находит описание с опечаткой и возвращает не более limit операций."""
+    response = requests.get(f"{base_url}/search", params={"q": "калхоз", "fuzzy": "1", "limit": "1"})
+
+    assert response.status_code == 200
+    assert [row["Описание"] for row in response.json()] == ["Колхоз"]
+
+
+def test_records_streamed_in_chunks(base_url: str) -> None:
+    """Результаты поиска и переводов отправляются частями (Transfer-Encoding: chunked), без Content-Length."""
+    response = requests.get(f"{base_url}/search", params={"q": "о"})
+
+    assert response.headers["Transfer-Encoding"] == "chunked"
+    assert "Content-Length" not in response.headers
+    assert [row["Описание"] for row in response.json()] == ["Колхоз", "Иван П."]
+
+
+def test_chunked_writer() -> None:
+    """ChunkedWriter отправляет текст частями не меньше chunk_bytes и завершает ответ пустой частью."""
+    wfile = io.BytesIO()
+    writer = ChunkedWriter(wfile, chunk_bytes=4)
+    for text in ["[", "1", ",", "22", ",", "ё", "]"]:
+        writer.write(text)
+    writer.close()
+
+    assert wfile.getvalue() == b"5\r\n[1,22\r\n4\r\n,\xd1\x91]\r\n0\r\n\r\n"
+
+
+def test_spending_report_written_in_background(base_url: str) -> None:
+    """Файл отчета /spending ставится в очередь фоновой записи, а не пишется в обработчике запроса."""
+    with patch("src.reports.get_report_writer") as get_report_writer, patch("src.reports.save_report") as save:
+        response = requests.get(f"{base_url}/spending", params={"category": "Переводы", "date": "31.05.2020"})
+
+    assert response.status_code == 200
+    assert get_report_writer.return_value.submit.call_count == 1
+    save.assert_not_called()
+
+
+def test_spending(base_url: str) -> None:
+    """Траты по категории за 3 месяца до даты."""
+    response = requests.get(f"{base_url}/spending", params={"category": "ЖКХ", "date": "31.05.2020"})
+
+    assert response.status_code == 200
+    assert [row["Сумма операции с округлением"] for row in response.json()] == [3000.0]
+
+
+def test_home(base_url: str) -> None:
+    """Страница «Главная» на переданную дату."""
+    with patch("src.server.home_page", return_value={"greeting": "Добрый день"}) as home_page:
+        response = requests.get(f"{base_url}/home", params={"date": "2020-05-20 12:00:00"})
+
+    assert response.json() == {"greeting": "Добрый день"}
+    assert home_page.call_args.args[0] == pd.Timestamp("2020-05-20 12:00:00")
+
+
+@pytest.mark.parametrize(
+    "path, params, status",
+    [
+        ("/search", {}, 400),
+        ("/search", {"q": "колхоз", "fuzzy": "1", "limit": "много"}, 400),
+        ("/home", {"date": "не дата"}, 400),
+        ("/home", {"date": ""}, 400),
+        ("/home", {"date": "NaT"}, 400),
+        ("/unknown", {}, 404),
+    ],
+)
+def test_errors(base_url: str, path: str, params: dict, status: int) -> None:
+    """Ошибки запроса возвращаются с кодом и сообщением в JSON."""
+    response = requests.get(f"{base_url}{path}", params=params)
+
+    assert response.status_code == status
+    assert "error" in response.json()
+
+
+def test_concurrent_requests(base_url: str) -> None:
+    """Одновременные запросы обрабатываются параллельно и без ошибок."""
+    results = []
+
+    def client() -> None:
+        with requests.Session() as session:
+            for _ in range(10):
+                results.append(session.get(f"{base_url}/search", params={"q": "а"}).status_code)
+
+    threads = [threading.Thread(target=client) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [200] * 80
+
+
+def test_metrics(base_url: str) -> None:
+    """Метрики запросов в JSON и в текстовом формате Prometheus."""
+    requests.get(f"{base_url}/search", params={"q": "жкх"})
+
+    snapshot = requests.get(f"{base_url}/metrics").json()
+    prometheus = requests.get(f"{base_url}/metrics/prometheus")
+
+    assert snapshot["GET /search"]["calls"] >= 1
+    assert prometheus.headers["Content-Type"].startswith("text/plain")
+    assert 'bank_app_seconds_count{function="GET /search"}' in prometheus.text
+
+
+def test_append_operations(base_url: str) -> None:
+    """Добавленная операция сразу видна в поиске и отчете по категории, некорректное тело — ошибка 400."""
+    operation = {
+        "Дата операции": "25.05.2020 09:00:00",
+        "Номер карты": "*5091",
+        "Сумма операции с округлением": 1200,
+        "Категория": "ЖКХ",
+        "Описание": "ЖКУ Дача",
+    }
+
+    response = requests.post(f"{base_url}/operations", json=operation)
+    search = requests.get(f"{base_url}/search", params={"q": "жку"})
+    spending = requests.get(f"{base_url}/spending", params={"category": "ЖКХ", "date": "31.05.2020"})
+    invalid = requests.post(f"{base_url}/operations", data="[1, 2]")
+
+    assert response.json() == {"appended": 1}
+    assert [row["Описание"] for row in search.json()] == ["ЖКУ Квартира", "ЖКУ Дача"]
+    assert [row["Сумма операции с округлением"] for row in spending.json()] == [3000.0, 1200.0]
+    assert invalid.status_code == 400
+
+
+@pytest.mark.parametrize("content_length", ["abc", "-5"])
+def test_invalid_content_length(base_url: str, content_length: str) -> None:
+    """Нечисловой или отрицательный Content-Length — ошибка 400, а не сбой обработчика."""
+    url = urlparse(base_url)
+    connection = http.client.HTTPConnection(str(url.hostname), url.port, timeout=5)
+    try:
+        connection.putrequest("POST", "/operations")
+        connection.putheader("Content-Length", content_length)
+        connection.endheaders()
+        response = connection.getresponse()
+
+        assert response.status == 400
+        assert "Content-Length" in json.loads(response.read())["error"]
+    finally:
+        connection.close()
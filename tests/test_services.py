@@ -1,9 +1,18 @@
+import io
 import json
 import re
 
+import pandas as pd
 import pytest
 
-from src.services import find_physical_transfers, simple_search
+from src.services import (
+    filter_physical_transfers,
+    find_physical_transfers,
+    iter_physical_transfers,
+    iter_simple_search,
+    simple_search,
+    write_json_stream,
+)
 
 
 @pytest.fixture
@@ -88,3 +97,51 @@ def test_test_data_fixture(list_data: list[dict]) -> None:
         assert "Описание" in item
         assert isinstance(item["Категория"], str)
         assert isinstance(item["Описание"], str)
+
+
+def test_find_physical_transfers_dataframe(list_data: list[dict]) -> None:
+    """Тест совпадения результатов поиска переводов по DataFrame и по списку словарей."""
+    df = pd.DataFrame(list_data * 3)
+    df["Категория"] = df["Категория"].astype("category")
+    assert find_physical_transfers(df) == find_physical_transfers(list_data * 3)
+
+
+def test_filter_physical_transfers_skips_missing_description() -> None:
+    """Тест пропуска переводов без описания при векторном поиске."""
+    df = pd.DataFrame({"Категория": ["Переводы", "Переводы"], "Описание": [None, "Анна К."]})
+    assert filter_physical_transfers(df)["Описание"].tolist() == ["Анна К."]
+
+
+def test_find_physical_transfers_empty_dataframe() -> None:
+    """Тест обработки пустого DataFrame."""
+    assert find_physical_transfers(pd.DataFrame(columns=["Категория", "Описание"])) == []
+
+
+def test_write_json_stream_array(list_data: list[dict]) -> None:
+    """Тест потоковой записи результатов поиска в виде JSON-массива."""
+    buffer = io.StringIO()
+    count = write_json_stream(iter_simple_search("продукты", list_data), buffer)
+    assert count == 2
+    assert json.loads(buffer.getvalue()) == json.loads(simple_search("продукты", list_data))
+
+
+def test_write_json_stream_ndjson(list_data: list[dict]) -> None:
+    """Тест потоковой записи переводов в формате NDJSON."""
+    buffer = io.StringIO()
+    count = write_json_stream(iter_physical_transfers(pd.DataFrame(list_data)), buffer, ndjson=True)
+    lines = buffer.getvalue().splitlines()
+    assert count == len(lines) == 2
+    assert [json.loads(line) for line in lines] == json.loads(find_physical_transfers(list_data))
+
+
+def test_write_json_stream_empty() -> None:
+    """Тест потоковой записи пустого результата."""
+    buffer = io.StringIO()
+    assert write_json_stream(iter_simple_search("", []), buffer) == 0
+    assert buffer.getvalue() == "[]"
+
+
+def test_iter_simple_search_invalid_type(list_data: list[dict]) -> None:
+    """Тест проверки типа строки поиска в генераторе."""
+    with pytest.raises(TypeError):
+        iter_simple_search(123, list_data)  # type: ignore[arg-type]
@@ -0,0 +1,88 @@
+import os
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.aggregates import CardDailyAggregates
+from src.services import physical_transfer_positions
+from src.sharding import (
+    DICTIONARIES_FILE,
+    analyze_shard,
+    analyze_shards,
+    cards_for_month,
+    load_dictionaries,
+    load_shard,
+    run_sharded,
+    transfer_codes,
+    write_shards,
+)
+
+# Операции за два года с пропусками карт, дат и сумм (фикстура operations из conftest)
+pytestmark = pytest.mark.operations(
+    rows=5000, seed=5, start="2019-01-01", days=730, cards=4, gaps=0.05, missing_dates=0.01, normalized=True
+)
+
+
+def reference(df: pd.DataFrame) -> pd.DataFrame:
+    """Суммы по месяцам и категориям через groupby по всему DataFrame."""
+    valid = df[df["Дата операции"].notna() & df["Категория"].notna()]
+    grouped = valid.groupby([valid["Дата операции"].dt.to_period("M").dt.to_timestamp(), "Категория"], observed=True)
+    return grouped["Сумма операции с округлением"].agg(["sum", "size"]).reset_index()
+
+
+@pytest.mark.parametrize("by, shards, workers", [("card", 1, 1), ("card", 3, 2), ("month", 5, 2)])
+def test_sharded_results_match_full_computation(operations: pd.DataFrame, by: str, shards: int, workers: int) -> None:
+    """Объединенные результаты частей совпадают с расчетом по всему DataFrame."""
+    result = run_sharded(operations, shards=shards, workers=workers, by=by)
+
+    assert result["transfers"].tolist() == physical_transfer_positions(operations).tolist()
+
+    expected = reference(operations)
+    categories = result["category_month_totals"]
+    assert categories["operations"].tolist() == expected["size"].tolist()
+    assert categories["category"].tolist() == expected["Категория"].tolist()
+    np.testing.assert_allclose(categories["total_spent"], expected["sum"], rtol=0, atol=1e-6)
+
+    aggregates = CardDailyAggregates.from_dataframe(operations)
+    for month in ["2019-03-01", "2020-12-01"]:
+        start = pd.Timestamp(month)
+        totals = aggregates.window_totals(start, start + pd.offsets.MonthBegin(1) - pd.Timedelta(1, "ns"))
+        cards = cards_for_month(result["card_month_totals"], start)
+        assert sorted((item["last_digits"], item["total_spent"]) for item in cards) == sorted(
+            zip(totals["card"].str[-4:], totals["total_spent"].round(2))
+        )
+
+
+def test_shards_are_memory_mapped(tmp_path: Any, operations: pd.DataFrame) -> None:
+    """Части записываются файлами .npy и читаются отображением в память; операции карты — в одной части."""
+    paths = write_shards(operations, str(tmp_path), shards=3, by="card")
+    shards = [load_shard(path) for path in paths]
+
+    assert all(isinstance(shard["amount"], np.memmap) for shard in shards)
+    assert sum(len(shard["row"]) for shard in shards) == len(operations)
+    cards = [set(np.unique(shard["card"][shard["card"] >= 0]).tolist()) for shard in shards]
+    assert not (cards[0] & cards[1]) and not (cards[1] & cards[2])
+
+
+def test_workers_get_only_transfer_codes(tmp_path: Any, operations: pd.DataFrame) -> None:
+    """Процессы пула получают коды переводов при запуске и не читают словари; результат как без пула."""
+    paths = write_shards(operations, str(tmp_path), shards=3, by="month")
+    codes = transfer_codes(load_dictionaries(str(tmp_path)))
+    expected = [analyze_shard(path) for path in paths]
+    os.remove(tmp_path / DICTIONARIES_FILE)
+
+    parts = analyze_shards(paths, codes, workers=2)
+
+    assert codes[0] >= 0 and len(codes[1]) > 0
+    for part, expected_part in zip(parts, expected):
+        assert part.keys() == expected_part.keys()
+        for name, values in part.items():
+            np.testing.assert_array_equal(values, expected_part[name])
+
+
+def test_unknown_shard_key(tmp_path: Any, operations: pd.DataFrame) -> None:
+    """Неизвестный ключ разбиения вызывает ValueError."""
+    with pytest.raises(ValueError):
+        write_shards(operations, str(tmp_path), shards=2, by="category")
@@ -0,0 +1,120 @@
+from typing import Any, Dict, Iterator, List
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from src.aggregates import CardDailyAggregates, MonthlyTopTransactions
+from src.cashback import CashbackRule, CashbackRules
+from src.query import OperationsQuery
+from src.reports import REPORT_CACHE, spending_by_category
+from src.services import find_physical_transfers, simple_search
+from src.sqlite_backend import SqliteOperations
+from src.store import normalize_operations
+from src.utils import information_for_each_card, top_five_transactions, top_n_transactions
+
+DATA_TIMES = ["2021-03-15 12:00:00", "2021-06-30 23:59:59", "2022-01-01 00:00:00"]
+
+# Операции в виде из Excel с пропусками, повторами сумм и переводами (фикстура operations из conftest)
+pytestmark = pytest.mark.operations(rows=2000, seed=3, gaps=0.05)
+
+
+def assert_same_records(result: List[Dict], expected: List[Dict]) -> None:
+    """Списки словарей совпадают с учетом пропусков (NaN != NaN при сравнении словарей)."""
+    assert len(result) == len(expected)
+    pd.testing.assert_frame_equal(pd.DataFrame(result), pd.DataFrame(expected))
+
+
+@pytest.fixture
+def backend(tmp_path: Any, operations: pd.DataFrame) -> Iterator[SqliteOperations]:
+    """Фикстура: база, построенная по операциям пачками по 700 строк."""
+    batches = [operations.iloc[start:].head(700) for start in range(0, len(operations), 700)]
+    backend = SqliteOperations.create(str(tmp_path / "operations.db"), batches)
+    yield backend
+    backend.close()
+
+
+def test_create_from_file(tmp_path: Any, operations: pd.DataFrame) -> None:
+    """База строится по XLSX-файлу пачками, индексы и полнотекстовый индекс созданы."""
+    path = tmp_path / "operations.xlsx"
+    operations.iloc[:300].to_excel(path, index=False)
+
+    backend = SqliteOperations.create(str(tmp_path / "operations.db"), str(path), batch_size=100)
+
+    indexes = {
+        name for (name,) in backend._connection().execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    }
+    assert len(backend) == 300
+    assert {"operations_date", "operations_category_date", "operations_card_date"} <= indexes
+    assert backend.has_fts
+    backend.close()
+
+
+@pytest.mark.parametrize("search_str", ["колхоз", "ИВАН", "п.", "яндекс т", "нет такой", "и"])
+def test_simple_search(backend: SqliteOperations, operations: pd.DataFrame, search_str: str) -> None:
+    """Поиск в базе совпадает с поиском по списку словарей."""
+    records = normalize_operations(operations).to_dict(orient="records")
+
+    assert simple_search(search_str, backend) == simple_search(search_str, records)
+
+
+def test_find_physical_transfers(backend: SqliteOperations, operations: pd.DataFrame) -> None:
+    """Переводы физическим лицам из базы совпадают с переводами по DataFrame."""
+    assert find_physical_transfers(backend) == find_physical_transfers(normalize_operations(operations))
+
+
+@pytest.mark.parametrize("category", ["Супермаркеты", "Переводы", "Нет такой"])
+def test_spending_by_category(
+    monkeypatch: Any, tmp_path: Any, backend: SqliteOperations, operations: pd.DataFrame, category: str
+) -> None:
+    """Траты по категории из базы совпадают с тратами по DataFrame."""
+    monkeypatch.chdir(tmp_path)
+    REPORT_CACHE.clear()
+
+    result = spending_by_category(backend, category, "30.06.2021")
+
+    assert_same_records(result, spending_by_category(normalize_operations(operations), category, "30.06.2021"))
+    assert result or category == "Нет такой"
+
+
+@pytest.mark.parametrize("data_time", DATA_TIMES)
+def test_information_for_each_card(backend: SqliteOperations, operations: pd.DataFrame, data_time: str) -> None:
+    """Траты и кэшбэк по картам из базы совпадают с дневными суммами хранилища (и с правилами кэшбэка)."""
+    df = normalize_operations(operations)
+    rules = CashbackRules([CashbackRule(rate=0.05, category="Транспорт", monthly_cap=300)])
+
+    with patch("src.utils.get_store") as get_store:
+        get_store.return_value.get_card_aggregates.return_value = CardDailyAggregates.from_dataframe(df)
+        get_store.return_value.get_query.return_value = OperationsQuery(df)
+        expected = information_for_each_card(pd.Timestamp(data_time))
+        expected_with_rules = information_for_each_card(pd.Timestamp(data_time), rules)
+
+    assert information_for_each_card(pd.Timestamp(data_time), backend=backend) == expected
+    assert information_for_each_card(pd.Timestamp(data_time), rules, backend=backend) == expected_with_rules
+
+
+@pytest.mark.parametrize("data_time", DATA_TIMES)
+def test_top_transactions(backend: SqliteOperations, operations: pd.DataFrame, data_time: str) -> None:
+    """Топ транзакций из базы совпадает с топом по DataFrame, в том числе при равных суммах."""
+    with patch("src.utils.get_store") as get_store:
+        get_store.return_value.get_top_transactions.return_value = MonthlyTopTransactions(
+            normalize_operations(operations)
+        )
+        expected = top_five_transactions(pd.Timestamp(data_time))
+        expected_year = top_n_transactions(pd.Timestamp(data_time), 20, "Сумма операции", "year")
+
+    assert_same_records(top_five_transactions(pd.Timestamp(data_time), backend), expected)
+    assert_same_records(
+        top_n_transactions(pd.Timestamp(data_time), 20, "Сумма операции", "year", backend=backend), expected_year
+    )
+
+
+def test_append(backend: SqliteOperations, operations: pd.DataFrame) -> None:
+    """Добавленные операции находятся поиском и меняют версию базы."""
+    version = backend.version
+
+    backend.append(pd.DataFrame({"Дата операции": ["01.07.2021 10:00:00"], "Описание": ["Новый магазин"]}))
+
+    assert len(backend) == len(operations) + 1
+    assert backend.version != version
+    assert [row["Описание"] for row in backend.search("новый")] == ["Новый магазин"]
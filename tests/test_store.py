@@ -0,0 +1,211 @@
+import json
+import os
+from typing import Any, List
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.aggregates import CardDailyAggregates
+from src.query import OperationsQuery
+from src.store import TransactionStore, get_store, json_default, normalize_operations, parse_operation_dates
+
+
+@pytest.fixture
+def operations_df() -> pd.DataFrame:
+    """Фикстура с тестовыми операциями в том виде, в котором они лежат в Excel."""
+    return pd.DataFrame(
+        {
+            "Дата операции": ["01.09.2018 12:00:00", "02.09.2018 13:30:00"],
+            "Номер карты": ["*7197", "*5091"],
+            "Сумма операции с округлением": [100, 250.5],
+            "Категория": ["Супермаркеты", "Переводы"],
+            "Описание": ["Колхоз", "Иван П."],
+        }
+    )
+
+
+@pytest.fixture
+def operations_file(tmp_path: Any, operations_df: pd.DataFrame) -> str:
+    """Фикстура с путем к Excel-файлу операций."""
+    path = tmp_path / "operations.xlsx"
+    operations_df.to_excel(path, index=False)
+    return str(path)
+
+
+def test_normalize_operations(operations_df: pd.DataFrame) -> None:
+    """Тест приведения типов столбцов без изменения исходного DataFrame."""
+    result = normalize_operations(operations_df)
+    assert pd.api.types.is_datetime64_any_dtype(result["Дата операции"])
+    assert result["Сумма операции с округлением"].dtype == "float64"
+    assert isinstance(result["Категория"].dtype, pd.CategoricalDtype)
+    assert operations_df["Дата операции"].dtype == object
+
+
+def test_normalize_operations_shares_columns(operations_df: pd.DataFrame) -> None:
+    """Столбцы, которые не требуют приведения, не копируются; даты без времени разбираются как ДД.ММ.ГГГГ."""
+    normalized = normalize_operations(operations_df)
+    again = normalize_operations(normalized)
+    short_dates = normalize_operations(operations_df.assign(**{"Дата операции": ["01.09.2018", "02.09.2018"]}))
+
+    assert normalized["Описание"] is not operations_df["Описание"]
+    assert np.shares_memory(normalized["Описание"].to_numpy(), operations_df["Описание"].to_numpy())
+    assert np.shares_memory(again["Дата операции"].to_numpy(), normalized["Дата операции"].to_numpy())
+    assert np.shares_memory(
+        again["Сумма операции с округлением"].to_numpy(), normalized["Сумма операции с округлением"].to_numpy()
+    )
+    assert short_dates["Дата операции"].tolist() == [pd.Timestamp("2018-09-01"), pd.Timestamp("2018-09-02")]
+
+
+def test_parse_operation_dates() -> None:
+    """Векторный разбор совпадает с pd.to_datetime по формату выгрузки, пропуски становятся NaT."""
+    values = pd.Series(["01.09.2018 12:00:00", "29.02.2020 23:59:59", None, "31.12.2021 00:00:01"])
+
+    result = parse_operation_dates(values)
+
+    expected = pd.to_datetime(values, format="%d.%m.%Y %H:%M:%S")
+    pd.testing.assert_series_equal(result, expected)
+    with pytest.raises(ValueError):
+        parse_operation_dates(pd.Series(["31.02.2020 00:00:00"]))
+
+
+def test_store_reads_file_once(operations_file: str) -> None:
+    """Тест однократного чтения файла при неизменном файле."""
+    store = TransactionStore(operations_file)
+    with patch("pandas.read_excel", wraps=pd.read_excel) as mock_read_excel:
+        first = store.get_dataframe()
+        second = store.get_dataframe()
+        store.get_records()
+    assert mock_read_excel.call_count == 1
+    assert first is second
+
+
+def test_store_reloads_changed_file(operations_file: str, operations_df: pd.DataFrame) -> None:
+    """Тест повторного чтения файла после изменения его размера или времени модификации."""
+    store = TransactionStore(operations_file)
+    assert len(store.get_dataframe()) == 2
+
+    pd.concat([operations_df, operations_df]).to_excel(operations_file, index=False)
+    stat = os.stat(operations_file)
+    os.utime(operations_file, (stat.st_atime, stat.st_mtime + 10))
+
+    assert len(store.get_dataframe()) == 4
+    assert len(store.get_records()) == 4
+
+
+def test_get_store_shared(operations_file: str) -> None:
+    """Тест получения одного и того же хранилища для одного файла."""
+    assert get_store(operations_file) is get_store(operations_file)
+
+
+def test_json_default(operations_file: str) -> None:
+    """Тест сериализации записей с датами в JSON в исходном формате."""
+    records = TransactionStore(operations_file).get_records()
+    data = json.loads(json.dumps(records, ensure_ascii=False, default=json_default))
+    assert data[0]["Дата операции"] == "01.09.2018 12:00:00"
+
+
+def test_append_updates_derived(operations_file: str) -> None:
+    """Добавленная операция видна в DataFrame, поиске, агрегатах по картам и индексе по дате,
+    дополненные структуры совпадают с построенными заново."""
+    store = TransactionStore(operations_file, use_cache=False)
+    store.get_records()
+    store.get_operation_records()
+    store.get_search_index()
+    store.get_card_aggregates()
+    store.get_top_transactions()
+    store.get_query().key_index("Категория")
+    signature = store.signature
+
+    appended = store.append(
+        {
+            "Дата операции": "02.09.2018 09:00:00",
+            "Номер карты": "*7197",
+            "Сумма операции с округлением": "300",
+            "Категория": "Такси",
+            "Описание": "Яндекс Такси",
+        },
+        persist=False,
+    )
+
+    df = store.get_dataframe()
+    data_time = pd.Timestamp("2018-09-30")
+    assert appended == 1
+    assert store.signature != signature
+    assert df["Категория"].tolist() == ["Супермаркеты", "Переводы", "Такси"]
+    assert df["Сумма операции с округлением"].tolist() == [100.0, 250.5, 300.0]
+    assert store.get_search_index().search("такси").tolist() == [2]
+    assert store.get_operation_records()[2]["Описание"] == "Яндекс Такси"
+    assert store.get_records()[2]["Категория"] == "Такси"
+    assert store.get_card_aggregates().month_to_date(data_time) == CardDailyAggregates.from_dataframe(
+        df
+    ).month_to_date(data_time)
+    assert store.get_query().order.tolist() == OperationsQuery(df).order.tolist() == [0, 2, 1]
+    assert store.get_query().window("2018-09-01", "2018-09-30", category="Такси").tolist() == [2]
+    top = store.get_top_transactions().top_positions(
+        data_time.replace(day=1), data_time, 2, "Сумма операции с округлением"
+    )
+    assert top.tolist() == [2, 1]
+
+
+def test_append_persists_journal(operations_file: str) -> None:
+    """Добавленные операции сохраняются в журнал и добавляются при следующей загрузке файла."""
+    store = TransactionStore(operations_file)
+    store.append(
+        pd.DataFrame(
+            {
+                "Дата операции": ["03.09.2018 10:00:00", "04.09.2018 11:00:00"],
+                "Номер карты": ["*5091", np.nan],
+                "Сумма операции с округлением": [10.0, 20.0],
+                "Категория": ["Переводы", "Фастфуд"],
+                "Описание": ["Петр С.", "Бургер"],
+            }
+        )
+    )
+
+    reloaded = TransactionStore(operations_file)
+    loaded = reloaded.get_dataframe()
+
+    pd.testing.assert_frame_equal(loaded, store.get_dataframe())
+    assert len(loaded) == 4
+    assert reloaded.signature == store.signature
+
+
+def test_append_export(operations_file: str, operations_df: pd.DataFrame, tmp_path: Any) -> None:
+    """Из новой выгрузки добавляются только операции, которых нет в хранилище (с учетом повторов)."""
+    store = TransactionStore(operations_file, use_cache=False)
+    store.get_dataframe()
+    new_operation = pd.DataFrame([["05.09.2018 08:00:00", "*7197", 55, "Супермаркеты", "Пятерочка"]])
+    export = pd.concat(
+        [operations_df, operations_df.iloc[[0]], new_operation.set_axis(operations_df.columns, axis=1)],
+        ignore_index=True,
+    )
+    export_path = tmp_path / "export.xlsx"
+    export.to_excel(export_path, index=False)
+
+    assert store.append_export(str(export_path), persist=False) == 2
+    assert store.append_export(str(export_path), persist=False) == 0
+    assert store.get_dataframe()["Описание"].tolist() == ["Колхоз", "Иван П.", "Колхоз", "Пятерочка"]
+
+
+@pytest.mark.parametrize("getter", ["get_search_index", "get_query", "get_records"])
+def test_derived_built_for_current_data(operations_file: str, getter: str) -> None:
+    """Если операции добавлены между чтением DataFrame и построением структуры, структура строится
+    по новым данным, а не сохраняется для новой версии по старым."""
+    store = TransactionStore(operations_file, use_cache=False)
+    get_dataframe = store.get_dataframe
+    calls: List[pd.DataFrame] = []
+
+    def get_dataframe_with_append() -> pd.DataFrame:
+        df = get_dataframe()
+        if not calls:
+            calls.append(df)
+            store.append({"Дата операции": "03.09.2018 10:00:00", "Описание": "Бургер"}, persist=False)
+        return df
+
+    with patch.object(store, "get_dataframe", get_dataframe_with_append):
+        derived = getattr(store, getter)()
+
+    assert len(store.get_dataframe()) == 3
+    assert len(derived.df if getter == "get_query" else derived) == 3
@@ -0,0 +1,75 @@
+from typing import Any
+
+import pandas as pd
+import pytest
+
+from src.aggregates import CardDailyAggregates, MonthlyTopTransactions
+from src.reports import format_datetimes, report_date
+from src.store import normalize_operations
+from src.streaming import (
+    CardSpendingAccumulator,
+    CategorySpendingAccumulator,
+    TopNAccumulator,
+    consume,
+    iter_operation_batches,
+)
+from src.utils import transactions_summary
+
+DATA_TIME = pd.Timestamp("2018-09-29 00:00:00")
+
+# Операции в виде из Excel (даты строками) за 2018 год (фикстура operations из conftest)
+pytestmark = pytest.mark.operations(rows=3000, seed=3, start="2018-01-01", gaps=0.05)
+
+
+@pytest.fixture(scope="module", params=["xlsx", "csv"])
+def operations_file(request: Any, tmp_path_factory: Any, operations: pd.DataFrame) -> str:
+    """Файл операций в формате XLSX или CSV."""
+    path = tmp_path_factory.mktemp("operations") / f"operations.{request.param}"
+    if request.param == "xlsx":
+        operations.to_excel(path, index=False)
+    else:
+        operations.to_csv(path, index=False)
+    return str(path)
+
+
+def test_batches_have_types_and_size(operations_file: str, operations: pd.DataFrame) -> None:
+    """Пачки не больше batch_size, даты и суммы приведены к типам, все строки прочитаны."""
+    batches = list(iter_operation_batches(operations_file, batch_size=700))
+
+    assert [len(batch) for batch in batches] == [700, 700, 700, 700, 200]
+    assert all(pd.api.types.is_datetime64_any_dtype(batch["Дата операции"]) for batch in batches)
+    assert all(batch["Сумма операции"].dtype == "float64" for batch in batches)
+    assert sum(len(batch) for batch in batches) == len(operations)
+
+
+def test_accumulators_match_full_dataframe(operations_file: str, operations: pd.DataFrame) -> None:
+    """Результаты накопителей совпадают с расчетом по всему DataFrame."""
+    df = normalize_operations(operations)
+    cards = CardSpendingAccumulator(DATA_TIME)
+    category = CategorySpendingAccumulator("ЖКХ", "29.09.2018")
+    top = TopNAccumulator(DATA_TIME, n=10, window=365)
+
+    consume(iter_operation_batches(operations_file, batch_size=500), [cards, category, top])
+
+    assert cards.result() == CardDailyAggregates.from_dataframe(df).month_to_date(DATA_TIME)
+
+    end = report_date("29.09.2018")
+    expected = df[(df["Категория"] == "ЖКХ") & (df["Дата операции"] >= end - pd.Timedelta(days=90))]
+    expected = expected[expected["Дата операции"] <= end]
+    result = category.result()
+    assert len(result) == len(expected) > 0
+    assert [row["Дата операции"] for row in result] == format_datetimes(expected)["Дата операции"].tolist()
+
+    selector = MonthlyTopTransactions(df)
+    start = DATA_TIME - pd.Timedelta(days=365)
+    expected_top = transactions_summary(
+        df.iloc[selector.top_positions(start, DATA_TIME, 10, "Сумма операции с округлением")]
+    )
+    # пропуски в описаниях (None из XLSX, NaN из DataFrame) приводятся к пустой строке
+    pd.testing.assert_frame_equal(pd.DataFrame(top.result()).fillna(""), pd.DataFrame(expected_top).fillna(""))
+
+
+def test_unsupported_extension(tmp_path: Any) -> None:
+    """Неподдерживаемое расширение файла вызывает ValueError."""
+    with pytest.raises(ValueError):
+        iter_operation_batches(str(tmp_path / "operations.json"))
@@ -4,12 +4,17 @@ from unittest.mock import Mock, patch
 import pandas as pd
 import pytest
 
+from src.aggregates import CardDailyAggregates, MonthlyTopTransactions
+from src.cashback import CashbackRule, CashbackRules
+from src.query import OperationsQuery
+from src.store import normalize_operations
 from src.utils import (
     get_currency_data,
     get_price_stock,
     information_for_each_card,
     read_excel,
     top_five_transactions,
+    top_n_transactions,
     welcome_function,
 )
 
@@ -64,8 +69,8 @@ def test_day_time_now() -> None:
         assert greeting == "Добрый день"
 
 
-@patch("pandas.read_excel")
-def test_information_for_each_card_success(mock_read_excel: Any) -> None:
+@patch("src.utils.get_store")
+def test_information_for_each_card_success(mock_get_store: Any) -> None:
     """Тест успешной работы функции information_for_each_card. Проверяет корректность
     обработки данных по картам."""
     test_info_card = pd.DataFrame(
@@ -76,7 +81,9 @@ def test_information_for_each_card_success(mock_read_excel: Any) -> None:
         }
     )
 
-    mock_read_excel.return_value = test_info_card
+    mock_get_store.return_value.get_card_aggregates.return_value = CardDailyAggregates.from_dataframe(
+        normalize_operations(test_info_card)
+    )
 
     result = information_for_each_card(pd.to_datetime("29-09-2018 00:00:00", dayfirst=True))
 
@@ -85,10 +92,35 @@ def test_information_for_each_card_success(mock_read_excel: Any) -> None:
     assert result == expected
 
 
+@patch("src.utils.get_store")
+def test_information_for_each_card_with_rules(mock_get_store: Any) -> None:
+    """Тест расчета кэшбэка по правилам: категория с повышенным кэшбэком и ограничение за месяц."""
+    operations = normalize_operations(
+        pd.DataFrame(
+            {
+                "Дата операции": ["01.09.2018 00:00:00", "02.09.2018 00:00:00", "03.09.2018 00:00:00"],
+                "Номер карты": ["1234567890123456", "1234567890123456", "1234567890120000"],
+                "Категория": ["Топливо", "Супермаркеты", "Топливо"],
+                "Сумма операции с округлением": [1000, 2000, 5000],
+            }
+        )
+    )
+    mock_get_store.return_value.get_query.return_value = OperationsQuery(operations)
+    rules = CashbackRules([CashbackRule(rate=0.05, category="Топливо", monthly_cap=100)])
+
+    result = information_for_each_card(pd.to_datetime("29-09-2018 00:00:00", dayfirst=True), rules)
+
+    assert result == [
+        {"last_digits": "0000", "total_spent": 5000.00, "cashback": 100.00},
+        {"last_digits": "3456", "total_spent": 3000.00, "cashback": 70.00},
+    ]
+
+
 def test_information_for_each_card_exception() -> None:
     """Тест проверки обработки исключений в функции information_for_each_card. Проверяет корректность
     логирования ошибки, возврат строкового сообщения с текстом исключения."""
-    with patch("pandas.read_excel", side_effect=Exception("Test exception")):
+    with patch("src.utils.get_store") as mock_get_store:
+        mock_get_store.return_value.get_card_aggregates.side_effect = Exception("Test exception")
         with patch("logging.Logger.error") as mock_logger:
             result = information_for_each_card(pd.to_datetime("29-09-2018 00:00:00", dayfirst=True))
             mock_logger.assert_called()
@@ -115,16 +147,14 @@ test_data_for_operation_cards = {
 def mock_excel_data() -> Any:
     """Фикстура для создания тестового DataFrame с данными Excel.
     Возвращает: DataFrame с преобразованными датами."""
-    df = pd.DataFrame(test_data_for_operation_cards)
-    df["Дата операции"] = pd.to_datetime(df["Дата операции"], format="%d.%m.%Y %H:%M:%S")
-    return df
+    return normalize_operations(pd.DataFrame(test_data_for_operation_cards))
 
 
-@patch("pandas.read_excel")
-def test_top_five_transactions(mock_read_excel: Any, mock_excel_data: Any) -> None:
-    """Тестирует функцию получения топ-5 транзакций. Параметры: mock_read_excel (Mock):
-    Мок для pandas.read_excel mock_excel_data (pd.DataFrame): Фиктивные данные Excel."""
-    mock_read_excel.return_value = mock_excel_data
+@patch("src.utils.get_store")
+def test_top_five_transactions(mock_get_store: Any, mock_excel_data: Any) -> None:
+    """Тестирует функцию получения топ-5 транзакций. Параметры: mock_get_store (Mock):
+    Мок для хранилища операций mock_excel_data (pd.DataFrame): Фиктивные данные Excel."""
+    mock_get_store.return_value.get_top_transactions.return_value = MonthlyTopTransactions(mock_excel_data)
 
     test_date = pd.Timestamp("2025-06-30")
 
@@ -141,6 +171,16 @@ def test_top_five_transactions(mock_read_excel: Any, mock_excel_data: Any) -> No
     assert result == expected_result
 
 
+@patch("src.utils.get_store")
+def test_top_n_transactions_window(mock_get_store: Any, mock_excel_data: Any) -> None:
+    """Тестирует топ-N транзакций за произвольное число дней."""
+    mock_get_store.return_value.get_top_transactions.return_value = MonthlyTopTransactions(mock_excel_data)
+
+    result = top_n_transactions(pd.Timestamp("2025-06-04 23:00:00"), 2, window=2)
+
+    assert [item["description"] for item in result] == ["Тест3", "Тест4"]
+
+
 TEST_USER_SETTINGS = {"user_currencies": ["USD", "EUR"]}
 
 TEST_API_RESPONSE = {"conversion_rates": {"RUB": 75.00}}
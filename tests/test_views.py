@@ -1,7 +1,12 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator, List, Tuple
+from unittest.mock import patch
+
 import pandas as pd
 import pytest
 
-from src.views import home_page
+from src.views import SECTION_BUDGETS, SECTION_TIMEOUT_MARKER, home_page
 
 
 def test_json_validation() -> None:
@@ -20,3 +25,66 @@ def test_error_handling() -> None:
     """Тест проверяет корректную обработку ошибок."""
     with pytest.raises(ValueError):
         home_page(pd.Timestamp("некорректный формат"))
+
+
+def _slow(result: Any, delay: float) -> Any:
+    """Функция-заглушка раздела, которая отвечает с задержкой."""
+
+    def section(*args: Any) -> Any:
+        time.sleep(delay)
+        return result
+
+    return section
+
+
+@pytest.fixture
+def slow_sections() -> Iterator[None]:
+    """Фикстура с разделами страницы, каждый из которых выполняется 0.2 с."""
+    with (
+        patch("src.views.welcome_function", _slow("Добрый день", 0.2)),
+        patch("src.views.information_for_each_card", _slow([], 0.2)),
+        patch("src.views.top_five_transactions", _slow([], 0.2)),
+        patch("src.views.get_currency_data", _slow([{"currency": "USD", "rate": 90.0}], 0.2)),
+        patch("src.views.get_price_stock", _slow([], 0.2)),
+    ):
+        yield
+
+
+def test_home_page_sections_in_parallel(slow_sections: None) -> None:
+    """Тест параллельной сборки разделов: время страницы близко к самому медленному разделу."""
+    start = time.perf_counter()
+    response = home_page(pd.Timestamp("2025-06-30 00:00:00"))
+    assert time.perf_counter() - start < 0.6
+    assert response["currency_rates"] == [{"currency": "USD", "rate": 90.0}]
+    assert set(response["meta"]["timings"]) == set(SECTION_BUDGETS)
+    assert response["meta"]["timed_out"] == []
+
+
+def test_home_page_section_timeout(slow_sections: None) -> None:
+    """Тест частичного результата, если раздел не уложился в бюджет времени."""
+    start = time.perf_counter()
+    response = home_page(pd.Timestamp("2025-06-30 00:00:00"), budgets={"stock_prices": 0.05})
+    assert time.perf_counter() - start < 0.6
+    assert response["stock_prices"] == SECTION_TIMEOUT_MARKER
+    assert response["meta"]["timed_out"] == ["stock_prices"]
+    assert response["greeting"] == "Добрый день"
+
+
+def test_home_page_budget_starts_when_section_runs(slow_sections: None) -> None:
+    """Бюджет раздела отсчитывается с начала его выполнения, а не с постановки в очередь пула;
+    раздел, который за бюджет не начал выполняться, снимается с очереди."""
+    calls: List[Tuple[Any, ...]] = []
+    executor = ThreadPoolExecutor(max_workers=1)
+    budgets = {"greeting": 1.0, "cards": 0.35, "top_transactions": 0.1, "currency_rates": 1.0, "stock_prices": 1.0}
+
+    with (
+        patch("src.views._get_executor", lambda: executor),
+        patch("src.views.top_five_transactions", lambda *args: calls.append(args)),
+    ):
+        response = home_page(pd.Timestamp("2025-06-30 00:00:00"), budgets=budgets)
+    executor.shutdown()
+
+    assert response["cards"] == []
+    assert response["top_transactions"] == SECTION_TIMEOUT_MARKER
+    assert calls == []
+    assert response["meta"]["timed_out"] == ["top_transactions"]